@@ -0,0 +1,74 @@
+"""Bases de datos sembradas para las pruebas de rendimiento.
+
+Cada tamaño se genera una sola vez con ``task.seeding`` en
+``BENCHMARK_DATA_DIR`` y se reutiliza en las siguientes ejecuciones.
+"""
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from task.seeding import seed_workload
+
+# Fecha fija para que el mismo tamaño y semilla den siempre los mismos datos
+REFERENCE_DATE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def data_dir():
+    return Path(getattr(settings, 'BENCHMARK_DATA_DIR', settings.BASE_DIR / 'benchmarks' / 'data'))
+
+
+def default_users(tasks):
+    """Un usuario por cada 100 tareas, con un mínimo para tener todos los roles"""
+    return max(50, tasks // 100)
+
+
+@contextmanager
+def use_database(path):
+    """Apunta todos los alias al fichero indicado mientras dura el bloque"""
+    saved = {}
+    for alias in connections:
+        connections[alias].close()
+        saved[alias] = connections[alias].settings_dict['NAME']
+        connections[alias].settings_dict['NAME'] = str(path)
+    try:
+        yield
+    finally:
+        for alias, name in saved.items():
+            connections[alias].close()
+            connections[alias].settings_dict['NAME'] = name
+
+
+def ensure_dataset(tasks, users=None, seed=0, log=None):
+    """Ruta de la base de datos con ``tasks`` tareas, generándola si no existe"""
+    users = users or default_users(tasks)
+    directory = data_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'tasks-{tasks}-users-{users}-seed-{seed}.sqlite3'
+    if path.exists():
+        # Una base de datos generada con una versión anterior del esquema
+        with use_database(path):
+            call_command('migrate', verbosity=0)
+        return path
+
+    # Se genera en un fichero temporal para no reutilizar una carga a medias
+    partial = path.with_suffix('.partial')
+    for leftover in directory.glob(partial.name + '*'):
+        leftover.unlink()
+    with use_database(partial):
+        call_command('migrate', verbosity=0)
+        seed_workload(users=users, tasks=tasks, seed=seed, now=REFERENCE_DATE, log=log)
+
+    # Con todas las conexiones cerradas, integrar el WAL en el fichero
+    # principal para poder renombrarlo y copiarlo como un único fichero
+    conn = sqlite3.connect(partial)
+    try:
+        conn.execute('ANALYZE')
+        conn.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        conn.close()
+    partial.rename(path)
+    return path
@@ -0,0 +1,86 @@
+"""Invariantes del flujo de asignación que deben cumplirse tras cualquier carga."""
+from django.contrib.auth.models import User
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from login.models import UserProfile
+from task.models import Task, TaskAssignment, ArchivedTaskAssignment
+from task.services import ACTIVE_ASSIGNMENT_STATUSES
+
+
+def over_capacity_workers():
+    """Trabajadores con más asignaciones abiertas que su max_tasks"""
+    return list(User.objects.annotate(
+        active=Count('task_assignments', filter=Q(task_assignments__status__in=ACTIVE_ASSIGNMENT_STATUSES))
+    ).filter(active__gt=F('userprofile__max_tasks')).values_list('id', flat=True))
+
+
+def orphan_assignments():
+    """Asignaciones abiertas que no corresponden al asignado ni al estado de su tarea"""
+    return list(TaskAssignment.objects.filter(
+        status__in=ACTIVE_ASSIGNMENT_STATUSES
+    ).filter(
+        Q(task__assigned_to__isnull=True) |
+        ~Q(task__assigned_to=F('assigned_to')) |
+        ~Q(task__status__in=ACTIVE_ASSIGNMENT_STATUSES)
+    ).values_list('id', flat=True))
+
+
+def unbacked_tasks():
+    """Tareas asignadas sin una asignación abierta para su asignado"""
+    active = TaskAssignment.objects.filter(
+        task=OuterRef('pk'),
+        assigned_to=OuterRef('assigned_to'),
+        status__in=ACTIVE_ASSIGNMENT_STATUSES
+    )
+    return list(Task.objects.filter(
+        status__in=ACTIVE_ASSIGNMENT_STATUSES
+    ).filter(~Exists(active)).values_list('id', flat=True))
+
+
+def duplicated_assignments():
+    """Tareas con más de una asignación abierta"""
+    return list(TaskAssignment.objects.filter(
+        status__in=ACTIVE_ASSIGNMENT_STATUSES
+    ).values('task').annotate(n=Count('id')).filter(n__gt=1).values_list('task', flat=True))
+
+
+def _archived_count(**filters):
+    """Asignaciones archivadas del usuario del perfil, como subconsulta"""
+    return Coalesce(Subquery(
+        ArchivedTaskAssignment.objects.filter(assigned_to=OuterRef('user'), **filters)
+        .values('assigned_to').annotate(n=Count('id')).values('n'),
+        output_field=IntegerField()
+    ), Value(0))
+
+
+def counter_drift():
+    """Perfiles cuyos contadores no coinciden con sus asignaciones, activas o archivadas"""
+    return list(UserProfile.objects.annotate(
+        assigned=Count('user__task_assignments') + _archived_count(),
+        rejected=(
+            Count('user__task_assignments', filter=Q(user__task_assignments__status='rejected'))
+            + _archived_count(status='rejected')
+        ),
+        approved=(
+            Count('user__task_assignments', filter=Q(user__task_assignments__status='approved'))
+            + _archived_count(status='approved')
+        ),
+    ).exclude(
+        tasks_assigned=F('assigned'),
+        tasks_rejected=F('rejected'),
+        tasks_completed=F('approved'),
+    ).values_list('user_id', flat=True))
+
+
+CHECKS = {
+    'over_capacity_workers': over_capacity_workers,
+    'orphan_assignments': orphan_assignments,
+    'unbacked_tasks': unbacked_tasks,
+    'duplicated_assignments': duplicated_assignments,
+    'counter_drift': counter_drift,
+}
+
+
+def check_invariants():
+    """{nombre: ids que lo incumplen} para cada invariante"""
+    return {name: check() for name, check in CHECKS.items()}
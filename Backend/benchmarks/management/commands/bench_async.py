@@ -0,0 +1,139 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import path
+from rest_framework_simplejwt.tokens import RefreshToken
+from benchmarks.datasets import ensure_dataset, use_database
+from benchmarks.server import ASGIClient, benchmark_environment, server_timing_queries
+from benchmarks.stats import summarize
+from login import views as login_views
+from task import views as task_views
+from task.models import Task
+
+# (nombre de URL, ruta, vista síncrona, vista asíncrona)
+ROUTES = (
+    ('current-user', 'api/auth/me/', login_views.CurrentUserView, login_views.AsyncCurrentUserView),
+    ('task-list', 'api/tasks/', task_views.TaskListView, task_views.AsyncTaskListView),
+    ('task-detail', 'api/tasks/<int:task_id>/', task_views.TaskDetailView, task_views.AsyncTaskDetailView),
+    ('notification-list', 'api/tasks/notifications/',
+     task_views.NotificationListView, task_views.AsyncNotificationListView),
+    ('statistics', 'api/tasks/statistics/', task_views.StatisticsView, task_views.AsyncStatisticsView),
+)
+ENDPOINTS = tuple(name for name, _, _, _ in ROUTES)
+MODES = ('sync', 'async')
+
+
+class BenchmarkUrls:
+    """URLconf con las vistas de lectura en una de sus dos versiones"""
+
+    def __init__(self, mode):
+        self.urlpatterns = [
+            path(route, (async_view if mode == 'async' else sync_view).as_view(), name=name)
+            for name, route, sync_view, async_view in ROUTES
+        ]
+
+
+class Command(BaseCommand):
+    help = ('Compara bajo ASGI las vistas de lectura síncronas con sus versiones asíncronas '
+            'con muchas peticiones concurrentes')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000, help='Tareas de la base de datos')
+        parser.add_argument('--users', type=int, help='Usuarios de la base de datos')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS))
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16, 64],
+                            help='Peticiones simultáneas')
+        parser.add_argument('--requests', type=int, default=200, help='Peticiones por endpoint y nivel')
+        parser.add_argument('--output', help='Fichero JSON donde guardar los resultados')
+
+    def handle(self, *args, **options):
+        database = ensure_dataset(options['tasks'], options['users'], options['seed'], log=self.stdout.write)
+        with use_database(database), benchmark_environment():
+            requests = self.build_requests(options['endpoints'])
+            results = []
+            for mode in MODES:
+                with override_settings(ROOT_URLCONF=BenchmarkUrls(mode)):
+                    results.extend(asyncio.run(self.run_mode(mode, requests, options)))
+
+        self.print_comparison(results)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps({'tasks': options['tasks'], 'results': results}, indent=2) + '\n')
+
+    def build_requests(self, endpoints):
+        """(token, ruta) por endpoint: un trabajador con tareas y un administrador para las estadísticas"""
+        admin = User.objects.filter(userprofile__role='admin').order_by('id').first()
+        task = Task.objects.filter(status='assigned').order_by('id').first()
+        worker = task.assigned_to
+        tokens = {user.id: str(RefreshToken.for_user(user).access_token) for user in (admin, worker)}
+        requests = {
+            'current-user': (tokens[worker.id], '/api/auth/me/'),
+            'task-list': (tokens[worker.id], '/api/tasks/'),
+            'task-detail': (tokens[worker.id], f'/api/tasks/{task.id}/'),
+            'notification-list': (tokens[worker.id], '/api/tasks/notifications/'),
+            'statistics': (tokens[admin.id], '/api/tasks/statistics/'),
+        }
+        return {name: requests[name] for name in endpoints}
+
+    async def run_mode(self, mode, requests, options):
+        # Un manejador por modo: carga la cadena de middlewares en modo asíncrono
+        client = ASGIClient()
+        results = []
+        for name, (token, url) in requests.items():
+            # Calentamiento: conexiones, compilación de consultas y caché de URLs
+            await client.request('get', url, token=token)
+            for concurrency in options['concurrency']:
+                results.append(await self.measure(client, mode, name, url, token, concurrency, options['requests']))
+        return results
+
+    async def measure(self, client, mode, name, url, token, concurrency, total):
+        latencies, statuses, queries = [], [], []
+        pending = iter(range(total))
+
+        async def user():
+            for _ in pending:
+                start = time.perf_counter()
+                status_code, headers, _ = await client.request('get', url, token=token)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses.append(status_code)
+                queries.append(server_timing_queries(headers))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        result = {
+            'mode': mode,
+            'endpoint': name,
+            'concurrency': concurrency,
+            **summarize(latencies),
+            'throughput_per_s': round(len(latencies) / elapsed, 2),
+            'errors': sum(status >= 400 for status in statuses),
+            'queries': max((q for q in queries if q is not None), default=None),
+        }
+        self.stdout.write(
+            f"{mode:5s} {name:18s} x{concurrency:<4d} {result['throughput_per_s']:9.2f}/s  "
+            f"p50 {result['p50_ms']:9.2f}  p95 {result['p95_ms']:9.2f}  p99 {result['p99_ms']:9.2f} ms  "
+            f"{result['queries']} consultas  errores {result['errors']}"
+        )
+        return result
+
+    def print_comparison(self, results):
+        by_key = {(r['mode'], r['endpoint'], r['concurrency']): r for r in results}
+        self.stdout.write('Asíncrona frente a síncrona (rendimiento y p95):')
+        for (mode, name, concurrency), sync_result in by_key.items():
+            async_result = by_key.get(('async', name, concurrency))
+            if mode != 'sync' or async_result is None:
+                continue
+            speedup = (async_result['throughput_per_s'] / sync_result['throughput_per_s']
+                       if sync_result['throughput_per_s'] else float('inf'))
+            self.stdout.write(
+                f"{name:18s} x{concurrency:<4d} {sync_result['throughput_per_s']:9.2f} -> "
+                f"{async_result['throughput_per_s']:9.2f}/s (x{speedup:.2f})  "
+                f"p95 {sync_result['p95_ms']:.2f} -> {async_result['p95_ms']:.2f} ms"
+            )
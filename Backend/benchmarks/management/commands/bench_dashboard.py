@@ -0,0 +1,86 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import RefreshToken
+from benchmarks.datasets import ensure_dataset, use_database
+from benchmarks.server import LiveServer, benchmark_environment, server_timing_queries
+from benchmarks.stats import summarize
+from task.models import Task
+
+# Peticiones que hacía el frontend al arrancar, por rol
+SEPARATE_CALLS = {
+    'admin': ('/api/auth/me/', '/api/tasks/', '/api/tasks/notifications/',
+              '/api/tasks/statistics/', '/api/tasks/reports/'),
+    'worker': ('/api/auth/me/', '/api/tasks/', '/api/tasks/notifications/'),
+}
+MODES = ('separate', 'parallel', 'dashboard')
+
+
+class Command(BaseCommand):
+    help = ('Compara la carga inicial del panel con /api/dashboard/ frente a las peticiones '
+            'separadas, en serie y en paralelo como haría el navegador')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000, help='Tareas de la base de datos')
+        parser.add_argument('--users', type=int, help='Usuarios de la base de datos')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--iterations', type=int, default=20, help='Cargas del panel por rol y modo')
+        parser.add_argument('--output', help='Fichero JSON donde guardar los resultados')
+
+    def handle(self, *args, **options):
+        database = ensure_dataset(options['tasks'], options['users'], options['seed'], log=self.stdout.write)
+        results = []
+        with use_database(database), benchmark_environment(), LiveServer() as server:
+            admin = User.objects.filter(userprofile__role='admin').order_by('id').first()
+            worker = Task.objects.filter(status='assigned').order_by('id').first().assigned_to
+            for role, user in (('admin', admin), ('worker', worker)):
+                token = str(RefreshToken.for_user(user).access_token)
+                for mode in MODES:
+                    results.append(self.measure(server, role, mode, token, options['iterations']))
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps({'tasks': options['tasks'], 'results': results}, indent=2) + '\n')
+
+    def load(self, server, role, mode, token, pool):
+        """Una carga del panel; devuelve (consultas, bytes, errores)"""
+        paths = ('/api/dashboard/',) if mode == 'dashboard' else SEPARATE_CALLS[role]
+
+        def call(path):
+            status_code, headers, payload = server.request('get', path, token=token, timeout=3600)
+            return status_code, server_timing_queries(headers), len(json.dumps(payload))
+
+        responses = list(pool.map(call, paths)) if mode == 'parallel' else [call(path) for path in paths]
+        return (
+            sum(queries or 0 for _, queries, _ in responses),
+            sum(size for _, _, size in responses),
+            sum(status_code >= 400 for status_code, _, _ in responses),
+        )
+
+    def measure(self, server, role, mode, token, iterations):
+        latencies = []
+        with ThreadPoolExecutor(max_workers=len(SEPARATE_CALLS[role])) as pool:
+            # Calentamiento: conexiones y compilación de consultas
+            queries, size, errors = self.load(server, role, mode, token, pool)
+            for _ in range(iterations):
+                start = time.perf_counter()
+                queries, size, errors = self.load(server, role, mode, token, pool)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        result = {
+            'role': role,
+            'mode': mode,
+            'requests': 1 if mode == 'dashboard' else len(SEPARATE_CALLS[role]),
+            **summarize(latencies),
+            'queries': queries,
+            'bytes': size,
+            'errors': errors,
+        }
+        self.stdout.write(
+            f"{role:6s} {mode:9s} {result['requests']} peticiones  p50 {result['p50_ms']:9.2f}  "
+            f"p95 {result['p95_ms']:9.2f} ms  {queries} consultas  {size} bytes  errores {errors}"
+        )
+        return result
@@ -0,0 +1,112 @@
+import json
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from benchmarks.datasets import ensure_dataset, use_database
+from benchmarks.stats import RssSampler
+from monitoring.middleware import QueryRecorder
+from task.deletion import DELETE_BATCH_SIZE, purge_user, user_graph_size
+from task.models import Task
+
+METHODS = ('django', 'batched')
+
+
+def _copy_database(source, target):
+    """Copia consistente de la base de datos, incluido lo que quede en el WAL"""
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+def _row_counts():
+    return {
+        model._meta.label: model._base_manager.count()
+        for model in apps.get_models() if model._meta.app_label in ('auth', 'login', 'task')
+    }
+
+
+class Command(BaseCommand):
+    help = ('Compara memoria, tiempo y consultas del borrado en cascada de Django con el borrado '
+            'por lotes al eliminar un usuario con mucho historial')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000, help='Tareas de la base de datos')
+        parser.add_argument('--users', type=int, help='Usuarios de la base de datos')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--user', type=int,
+                            help='Usuario a borrar (por defecto el administrador que más tareas creó)')
+        parser.add_argument('--batch-size', type=int, default=DELETE_BATCH_SIZE)
+        parser.add_argument('--output', help='Fichero JSON donde guardar los resultados')
+
+    def handle(self, *args, **options):
+        database = ensure_dataset(options['tasks'], options['users'], options['seed'], log=self.stdout.write)
+        results, remaining = [], {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for method in METHODS:
+                # Cada método borra sobre su propia copia de la base de datos
+                copy = Path(tmp) / f'{method}.sqlite3'
+                _copy_database(database, copy)
+                with use_database(copy):
+                    result, remaining[method] = self.measure(method, options)
+                results.append(result)
+                copy.unlink()
+
+        if remaining['django'] != remaining['batched']:
+            differences = {
+                label: (remaining['django'][label], remaining['batched'][label])
+                for label in remaining['django'] if remaining['django'][label] != remaining['batched'][label]
+            }
+            self.stderr.write(f'Los dos métodos no dejan las mismas filas (django, lotes): {differences}')
+        if options['output']:
+            Path(options['output']).write_text(json.dumps({'tasks': options['tasks'], 'results': results}, indent=2) + '\n')
+
+    def pick_user(self, options):
+        if options['user']:
+            return User.objects.get(id=options['user'])
+        creator = (Task.all_objects.values('created_by').order_by('created_by')
+                   .annotate(n=Count('id')).order_by('-n').values_list('created_by', flat=True).first())
+        return User.objects.get(id=creator)
+
+    def measure(self, method, options):
+        user = self.pick_user(options)
+        user_id, size = user.id, user_graph_size(user)
+        recorder = QueryRecorder()
+        tracemalloc.start()
+        with RssSampler() as rss, recorder.record():
+            start_rss = rss.peak
+            start = time.perf_counter()
+            if method == 'django':
+                with transaction.atomic():
+                    user.delete()
+            else:
+                purge_user(user, batch_size=options['batch_size'])
+            elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result = {
+            'method': method,
+            'user_id': user_id,
+            'graph_rows': size,
+            'seconds': round(elapsed, 3),
+            'queries': recorder.count,
+            'peak_python_mb': round(peak / 2 ** 20, 1),
+            'rss_growth_mb': round((rss.peak - start_rss) / 2 ** 20, 1),
+        }
+        self.stdout.write(
+            f"{method:8s} usuario {user_id} ({size} filas)  {result['seconds']:8.3f}s  "
+            f"{result['queries']:6d} consultas  pico Python {result['peak_python_mb']} MB  "
+            f"RSS +{result['rss_growth_mb']} MB"
+        )
+        return result, _row_counts()
@@ -0,0 +1,230 @@
+import json
+import platform
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from benchmarks.datasets import ensure_dataset, use_database
+from benchmarks.server import LiveServer, benchmark_environment, server_timing_queries
+from benchmarks.stats import RssSampler, summarize
+from monitoring.middleware import QueryRecorder
+from task.models import Task
+from task.services import auto_assign_task
+
+HTTP_ENDPOINTS = ('task-list', 'statistics', 'report-list', 'notification-list')
+ENDPOINTS = HTTP_ENDPOINTS + ('auto-assign',)
+TRANSPORTS = ('client', 'wsgi')
+
+# Diferencias por debajo de este umbral se consideran ruido
+NOISE_FLOOR_MS = 1.0
+
+
+def results_dir():
+    return settings.BASE_DIR / 'benchmarks' / 'results'
+
+
+class Command(BaseCommand):
+    help = 'Mide latencia, consultas y memoria de los endpoints con bases de datos de distinto tamaño'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                            help='Número de tareas de cada base de datos')
+        parser.add_argument('--users', type=int, help='Usuarios por base de datos (por defecto 1 por cada 100 tareas)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS))
+        parser.add_argument('--transports', nargs='+', choices=TRANSPORTS, default=list(TRANSPORTS))
+        parser.add_argument('--iterations', type=int, default=30, help='Peticiones por endpoint')
+        parser.add_argument('--max-seconds', type=float, default=60.0,
+                            help='Tiempo máximo por endpoint; siempre se hace al menos una petición. '
+                                 'Los listados sin paginar tardan minutos por petición con 1M de tareas')
+        parser.add_argument('--output', default=str(results_dir() / 'latest.json'))
+        parser.add_argument('--baseline', default=str(results_dir() / 'baseline.json'))
+        parser.add_argument('--save-baseline', action='store_true', help='Guardar los resultados como nueva referencia')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Aumento relativo de p95 a partir del cual se considera regresión')
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        results = []
+        with benchmark_environment():
+            for size in options['sizes']:
+                self.stdout.write(f'Preparando base de datos con {size} tareas...')
+                path = ensure_dataset(size, options['users'], options['seed'], log=self.stdout.write)
+                with use_database(path):
+                    results.extend(self.run_size(size, options))
+
+        document = {
+            'meta': {
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'machine': platform.machine(),
+                'seed': options['seed'],
+                'iterations': options['iterations'],
+            },
+            'results': results,
+        }
+        self.write_json(options['output'], document)
+        self.stdout.write(f'Resultados guardados en {options["output"]}')
+
+        baseline = Path(options['baseline'])
+        if options['save_baseline']:
+            self.write_json(baseline, document)
+            self.stdout.write(f'Referencia guardada en {baseline}')
+        elif baseline.exists():
+            regressions = self.compare(json.loads(baseline.read_text())['results'], results, options['tolerance'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f'{regressions} regresión(es) respecto a {baseline}')
+        else:
+            self.stdout.write(f'Sin referencia en {baseline}; use --save-baseline para crearla')
+
+    # -- Escenarios ------------------------------------------------------------
+
+    def run_size(self, size, options):
+        admin = User.objects.filter(userprofile__role='admin').order_by('id').first()
+        worker = User.objects.filter(userprofile__role='regular').order_by('id').first()
+        requests = {
+            'task-list': (admin, '/api/tasks/'),
+            'statistics': (admin, '/api/tasks/statistics/'),
+            'report-list': (admin, '/api/tasks/reports/'),
+            'notification-list': (worker, '/api/tasks/notifications/'),
+        }
+        tokens = {user.id: str(RefreshToken.for_user(user).access_token) for user in (admin, worker)}
+        endpoints = [name for name in options['endpoints'] if name in HTTP_ENDPOINTS]
+        results = []
+
+        if 'client' in options['transports']:
+            client = APIClient()
+            for name in endpoints:
+                user, path = requests[name]
+
+                def call(path=path, token=tokens[user.id]):
+                    response = client.get(path, HTTP_AUTHORIZATION=f'Bearer {token}')
+                    return response.status_code, server_timing_queries(response)
+
+                results.append(self.measure(size, 'client', name, call, options))
+
+        if 'wsgi' in options['transports']:
+            with LiveServer() as server:
+                for name in endpoints:
+                    user, path = requests[name]
+
+                    def call(path=path, token=tokens[user.id]):
+                        status_code, headers, _ = server.request('get', path, token=token, timeout=3600)
+                        return status_code, server_timing_queries(headers)
+
+                    results.append(self.measure(size, 'wsgi', name, call, options))
+
+        if 'auto-assign' in options['endpoints']:
+            results.append(self.measure(size, 'service', 'auto-assign', self.auto_assign_call(admin), options))
+
+        return results
+
+    def auto_assign_call(self, admin):
+        """Búsqueda y asignación de trabajador para una tarea nueva, deshecha al terminar"""
+        difficulties = [value for value, _ in Task.DIFFICULTY_LEVELS]
+        counter = iter(range(10 ** 9))
+
+        def call():
+            n = next(counter)
+            recorder = QueryRecorder()
+            with transaction.atomic():
+                task = Task.objects.create(
+                    title=f'Benchmark {n}', description='Benchmark',
+                    difficulty=difficulties[n % len(difficulties)], created_by=admin
+                )
+                with recorder.record():
+                    auto_assign_task(task)
+                transaction.set_rollback(True)
+            return 200, recorder.count
+
+        return call
+
+    def measure(self, size, transport, endpoint, call, options):
+        latencies, queries = [], []
+        errors = 0
+        with RssSampler() as rss:
+            start_rss = rss.peak
+            # Una petición de calentamiento (cachés, compilación de consultas);
+            # si ya agota el tiempo disponible se usa como única muestra
+            start = time.perf_counter()
+            status_code, query_count = call()
+            elapsed = time.perf_counter() - start
+            if elapsed > options['max_seconds']:
+                latencies.append(elapsed * 1000)
+                errors += status_code >= 400
+                if query_count is not None:
+                    queries.append(query_count)
+            deadline = time.perf_counter() + options['max_seconds']
+            for _ in range(options['iterations'] if not latencies else 0):
+                start = time.perf_counter()
+                status_code, query_count = call()
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += status_code >= 400
+                if query_count is not None:
+                    queries.append(query_count)
+                if time.perf_counter() > deadline:
+                    break
+
+        result = {
+            'tasks': size,
+            'transport': transport,
+            'endpoint': endpoint,
+            **summarize(latencies),
+            'queries': max(queries) if queries else None,
+            'errors': errors,
+            'peak_rss_mb': round(rss.peak / 2 ** 20, 1),
+            'rss_growth_mb': round((rss.peak - start_rss) / 2 ** 20, 1),
+        }
+        self.stdout.write(
+            f"{size:>9} {transport:8s} {endpoint:18s} p50 {result['p50_ms']:9.2f}  p95 {result['p95_ms']:9.2f}  "
+            f"p99 {result['p99_ms']:9.2f} ms  {result['queries']} consultas  "
+            f"pico {result['peak_rss_mb']} MB  (n={result['count']}, errores={errors})"
+        )
+        return result
+
+    # -- Resultados ------------------------------------------------------------
+
+    def write_json(self, path, document):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(document, indent=2) + '\n')
+
+    def compare(self, baseline, results, tolerance):
+        """Muestra las diferencias con la referencia y devuelve el número de regresiones"""
+        previous = {(r['tasks'], r['transport'], r['endpoint']): r for r in baseline}
+        regressions = 0
+        self.stdout.write('Comparación con la referencia:')
+        for result in results:
+            key = (result['tasks'], result['transport'], result['endpoint'])
+            base = previous.get(key)
+            if base is None:
+                continue
+            slower = (
+                result['p95_ms'] > base['p95_ms'] * (1 + tolerance)
+                and result['p95_ms'] - base['p95_ms'] > NOISE_FLOOR_MS
+            )
+            more_queries = (
+                result['queries'] is not None and base['queries'] is not None
+                and result['queries'] > base['queries']
+            )
+            ratio = result['p95_ms'] / base['p95_ms'] if base['p95_ms'] else float('inf')
+            line = (
+                f"{key[0]:>9} {key[1]:8s} {key[2]:18s} p95 {base['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms "
+                f"(x{ratio:.2f}), consultas {base['queries']} -> {result['queries']}"
+            )
+            if slower or more_queries:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(line + '  REGRESIÓN'))
+            else:
+                self.stdout.write(line)
+        return regressions
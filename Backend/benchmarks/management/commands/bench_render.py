@@ -0,0 +1,93 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from benchmarks.datasets import ensure_dataset, use_database
+from benchmarks.stats import RssSampler
+from monitoring.middleware import QueryRecorder
+from task.models import RenderedFragment, TaskReport
+from task.rendering import RENDERERS, json_array, render_rows, with_fragments
+
+MODES = ('serializer', 'cold', 'warm')
+
+
+def approved_reports():
+    # La consulta de ReportReviewView con ?status=approved, sin paginar
+    return TaskReport.objects.filter(status='approved', task_assignment__task__is_archived=False)
+
+
+def render_with_serializer(reports):
+    """Como antes de la caché: todo el listado por el serializador"""
+    renderer = RENDERERS['report']
+    queryset = reports.select_related(*renderer.related)
+    return JSONRenderer().render(renderer.serializer_class(queryset, many=True).data)
+
+
+def render_with_cache(reports):
+    return json_array(render_rows(list(with_fragments(reports, 'report')), reports, 'report'))
+
+
+class Command(BaseCommand):
+    help = ('Compara el listado de reportes aprobados serializado fila a fila con el que intercala '
+            'los fragmentos de la caché de representación')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=200000,
+                            help='Tareas de la base de datos (con la semilla, ~la mitad acaban con reporte aprobado)')
+        parser.add_argument('--users', type=int, help='Usuarios de la base de datos')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--iterations', type=int, default=3, help='Repeticiones en caliente y del serializador')
+        parser.add_argument('--output', help='Fichero JSON donde guardar los resultados')
+
+    def handle(self, *args, **options):
+        database = ensure_dataset(options['tasks'], options['users'], options['seed'], log=self.stdout.write)
+        with use_database(database):
+            reports = approved_reports()
+            count = reports.count()
+            self.stdout.write(f'{count} reportes aprobados')
+
+            # La primera pasada en frío rellena la caché; se parte siempre de vacía
+            RenderedFragment.objects.filter(kind='report').delete()
+            results, outputs = [], {}
+            for mode in MODES:
+                call = render_with_serializer if mode == 'serializer' else render_with_cache
+                iterations = 1 if mode == 'cold' else options['iterations']
+                result, outputs[mode] = self.measure(mode, call, reports, iterations)
+                results.append({'reports': count, **result})
+            RenderedFragment.objects.filter(kind='report').delete()
+
+        # La caché debe producir exactamente el mismo documento
+        expected = json.loads(outputs['serializer'])
+        for mode in ('cold', 'warm'):
+            if json.loads(outputs[mode]) != expected:
+                raise CommandError(f'El listado {mode} no coincide con el del serializador')
+        self.stdout.write('Los tres listados coinciden')
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps({'tasks': options['tasks'], 'results': results}, indent=2) + '\n')
+
+    def measure(self, mode, call, reports, iterations):
+        timings, recorder = [], QueryRecorder()
+        with RssSampler() as rss:
+            start_rss = rss.peak
+            for _ in range(iterations):
+                recorder = QueryRecorder()
+                start = time.perf_counter()
+                with recorder.record():
+                    output = call(reports)
+                timings.append(time.perf_counter() - start)
+
+        result = {
+            'mode': mode,
+            'seconds': round(min(timings), 3),
+            'queries': recorder.count,
+            'bytes': len(output),
+            'rss_growth_mb': round((rss.peak - start_rss) / 2 ** 20, 1),
+        }
+        self.stdout.write(
+            f"{mode:10s} {result['seconds']:8.3f}s  {result['queries']:4d} consultas  "
+            f"{result['bytes']} bytes  RSS +{result['rss_growth_mb']} MB"
+        )
+        return result, output
@@ -0,0 +1,149 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from benchmarks.stats import summarize
+from django_crud_api.sqlite.base import DEFAULT_PRAGMAS
+
+STATUSES = ('pending', 'assigned', 'completed', 'rejected')
+
+
+def _setup(path, rows):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE task (
+            id INTEGER PRIMARY KEY, title TEXT, status TEXT,
+            assigned_to INTEGER, created_at REAL
+        );
+        CREATE INDEX task_status ON task(status);
+    ''')
+    rnd = random.Random(0)
+    conn.executemany(
+        'INSERT INTO task (title, status, assigned_to, created_at) VALUES (?, ?, ?, ?)',
+        ((f'Tarea {i}', rnd.choice(STATUSES), rnd.randint(1, 200), time.time()) for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+class Mode:
+    """Configuración de conexión a comparar"""
+
+    def __init__(self, name, persistent, pragmas, immediate):
+        self.name = name
+        self.persistent = persistent
+        self.pragmas = pragmas
+        self.immediate = immediate
+
+    def connect(self, path, read_only=False):
+        # timeout=5 es el valor por defecto que usa Django
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        if read_only and self.pragmas:
+            conn.execute('PRAGMA query_only = ON')
+        return conn
+
+
+MODES = (
+    # Configuración anterior: journal de rollback, conexión nueva por petición
+    Mode('default', persistent=False, pragmas={}, immediate=False),
+    Mode('tuned', persistent=True, pragmas=DEFAULT_PRAGMAS, immediate=True),
+)
+
+
+class Command(BaseCommand):
+    help = 'Compara la configuración SQLite por defecto con la ajustada bajo lecturas y escrituras concurrentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        for mode in MODES:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'bench.sqlite3')
+                _setup(path, options['rows'])
+                result = self.run_mode(mode, path, options)
+            self.report(mode, result, options['seconds'])
+
+    def run_mode(self, mode, path, options):
+        stop = threading.Event()
+        lock = threading.Lock()
+        result = {'read': [], 'write': [], 'errors': 0}
+
+        def worker(kind, seed):
+            rnd = random.Random(seed)
+            conn = mode.connect(path, read_only=kind == 'read') if mode.persistent else None
+            latencies = []
+            errors = 0
+            while not stop.is_set():
+                c = conn or mode.connect(path, read_only=kind == 'read')
+                start = time.perf_counter()
+                try:
+                    if kind == 'read':
+                        self.dashboard_read(c)
+                    else:
+                        self.workflow_write(c, rnd, mode.immediate)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                except sqlite3.OperationalError:
+                    # "database is locked"
+                    errors += 1
+                    if c.in_transaction:
+                        c.execute('ROLLBACK')
+                finally:
+                    if conn is None:
+                        c.close()
+            if conn is not None:
+                conn.close()
+            with lock:
+                result[kind].extend(latencies)
+                result['errors'] += errors
+
+        threads = [
+            threading.Thread(target=worker, args=('read', i)) for i in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=('write', 1000 + i)) for i in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return result
+
+    def dashboard_read(self, conn):
+        # Equivalente a StatisticsView + la primera página de TaskListView
+        conn.execute('SELECT status, COUNT(*) FROM task GROUP BY status').fetchall()
+        conn.execute('SELECT * FROM task ORDER BY created_at DESC LIMIT 50').fetchall()
+
+    def workflow_write(self, conn, rnd, immediate):
+        # Lectura seguida de escritura, como una transición de estado
+        conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+        task_id = conn.execute(
+            'SELECT id FROM task WHERE status = ? LIMIT 1 OFFSET ?',
+            (rnd.choice(STATUSES), rnd.randint(0, 100))
+        ).fetchone()
+        if task_id:
+            conn.execute('UPDATE task SET status = ? WHERE id = ?', (rnd.choice(STATUSES), task_id[0]))
+        conn.execute(
+            'INSERT INTO task (title, status, assigned_to, created_at) VALUES (?, ?, ?, ?)',
+            ('Nueva', 'pending', rnd.randint(1, 200), time.time())
+        )
+        conn.execute('COMMIT')
+
+    def report(self, mode, result, seconds):
+        reads = summarize(result['read'])
+        writes = summarize(result['write'])
+        self.stdout.write(
+            f"{mode.name:8s} lecturas {reads['count'] / seconds:9.1f}/s (p95 {reads['p95_ms']} ms)  "
+            f"escrituras {writes['count'] / seconds:8.1f}/s (p95 {writes['p95_ms']} ms)  "
+            f"errores de bloqueo {result['errors']}"
+        )
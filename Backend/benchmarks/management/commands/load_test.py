@@ -0,0 +1,250 @@
+import json
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import got_request_exception
+from django.db import OperationalError, connection
+from rest_framework_simplejwt.tokens import RefreshToken
+from benchmarks.datasets import ensure_dataset, use_database
+from benchmarks.invariants import check_invariants
+from benchmarks.server import LiveServer, benchmark_environment
+from benchmarks.stats import summarize
+from jobs.models import Job
+from jobs.queue import claim_jobs, run_job
+from task.models import Task
+
+
+def _is_lock_error(exc):
+    return isinstance(exc, OperationalError) and 'locked' in str(exc)
+
+
+class LoadStats:
+    """Resultados compartidos por todos los hilos de la prueba"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.server_errors = Counter()
+
+    def record(self, operation, elapsed, status):
+        with self.lock:
+            self.latencies[operation].append(elapsed * 1000)
+            self.statuses[operation][status] += 1
+
+    def on_exception(self, sender, request=None, **kwargs):
+        # Se llama dentro del bloque except del manejador de Django
+        exc = sys.exc_info()[1]
+        with self.lock:
+            self.server_errors['sqlite_locked' if _is_lock_error(exc) else type(exc).__name__] += 1
+
+
+class Command(BaseCommand):
+    help = ('Prueba de carga concurrente: administradores que crean tareas y trabajadores que las '
+            'rechazan o completan contra un servidor local, con la cola de trabajos en proceso')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=2000, help='Tareas de la base de datos inicial')
+        parser.add_argument('--users', type=int, help='Usuarios de la base de datos inicial')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--admins', type=int, default=2, help='Hilos que crean tareas')
+        parser.add_argument('--workers', type=int, default=16, help='Hilos que rechazan o completan tareas')
+        parser.add_argument('--job-threads', type=int, default=2, help='Hilos del trabajador de la cola')
+        parser.add_argument('--seconds', type=float, default=30.0)
+        parser.add_argument('--reject-rate', type=float, default=0.3,
+                            help='Probabilidad de rechazar en lugar de completar una tarea')
+        parser.add_argument('--output', help='Fichero JSON donde guardar los resultados')
+        parser.add_argument('--fail-on-violation', action='store_true')
+
+    def handle(self, *args, **options):
+        source = ensure_dataset(options['tasks'], options['users'], options['seed'], log=self.stdout.write)
+        stats = LoadStats()
+
+        # Se trabaja sobre una copia para no modificar la base de datos cacheada
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / source.name
+            shutil.copy(source, path)
+            with use_database(path), benchmark_environment():
+                got_request_exception.connect(stats.on_exception)
+                try:
+                    report = self.run_load(stats, options)
+                finally:
+                    got_request_exception.disconnect(stats.on_exception)
+
+        self.print_report(report)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+        violations = sum(len(ids) for ids in report['invariants'].values())
+        if violations and options['fail_on_violation']:
+            raise CommandError(f'{violations} violación(es) de invariantes')
+
+    def run_load(self, stats, options):
+        admins = list(User.objects.filter(userprofile__role__in=['admin', 'superuser']).order_by('id'))
+        workers = list(User.objects.filter(
+            userprofile__role__in=[value for value, _ in Task.DIFFICULTY_LEVELS],
+            userprofile__is_active_worker=True
+        ).order_by('id')[:options['workers']])
+        if not admins or not workers:
+            raise CommandError('La base de datos no tiene administradores o trabajadores activos')
+        tokens = {user.id: str(RefreshToken.for_user(user).access_token) for user in admins + workers}
+        last_job_id = Job.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        connection.close()
+
+        stop_load = threading.Event()
+        stop_jobs = threading.Event()
+        job_errors = Counter()
+
+        with LiveServer() as server:
+            job_threads = [
+                threading.Thread(target=self.job_worker, args=(f'load-test:{i}', stop_jobs, job_errors))
+                for i in range(options['job_threads'])
+            ]
+            for thread in job_threads:
+                thread.start()
+
+            actors = [
+                (self.admin_actor, admins[i % len(admins)], i) for i in range(options['admins'])
+            ] + [
+                (self.worker_actor, worker, 1000 + i) for i, worker in enumerate(workers)
+            ]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=len(actors)) as pool:
+                futures = [
+                    pool.submit(actor, server, user, tokens[user.id], seed, stop_load, stats, options)
+                    for actor, user, seed in actors
+                ]
+                time.sleep(options['seconds'])
+                stop_load.set()
+                for future in futures:
+                    future.result()
+            elapsed = time.perf_counter() - start
+
+            # Dejar que la cola termine lo pendiente antes de comprobar invariantes
+            stop_jobs.set()
+            for thread in job_threads:
+                thread.join()
+
+        jobs = list(Job.objects.filter(id__gt=last_job_id))
+        job_summary = Counter(job.status for job in jobs)
+        job_summary['retried'] = sum(1 for job in jobs if job.attempts)
+        job_summary['sqlite_locked'] = sum(1 for job in jobs if 'locked' in job.last_error)
+
+        operations = {}
+        for operation, latencies in stats.latencies.items():
+            statuses = stats.statuses[operation]
+            failed = sum(count for status, count in statuses.items() if not 200 <= status < 300)
+            operations[operation] = {
+                **summarize(latencies),
+                'throughput_per_s': round(len(latencies) / elapsed, 2),
+                'error_rate': round(failed / len(latencies), 4),
+                'statuses': {str(status): count for status, count in sorted(statuses.items())},
+            }
+
+        return {
+            'seconds': round(elapsed, 2),
+            'admins': options['admins'],
+            'workers': len(workers),
+            'operations': operations,
+            'server_exceptions': dict(stats.server_errors),
+            'jobs': dict(job_summary),
+            'job_worker_errors': dict(job_errors),
+            'invariants': check_invariants(),
+        }
+
+    # -- Actores ---------------------------------------------------------------
+
+    def timed(self, stats, operation, server, method, path, data=None, token=None):
+        start = time.perf_counter()
+        try:
+            status_code, _, body = server.request(method, path, data, token=token)
+        except (OSError, socket.timeout):
+            status_code, body = 0, None
+        stats.record(operation, time.perf_counter() - start, status_code)
+        return status_code, body
+
+    def admin_actor(self, server, user, token, seed, stop, stats, options):
+        rnd = random.Random(seed)
+        difficulties = [value for value, _ in Task.DIFFICULTY_LEVELS]
+        n = 0
+        while not stop.is_set():
+            n += 1
+            self.timed(stats, 'create', server, 'post', '/api/tasks/create/', {
+                'title': f'Carga {seed}-{n}',
+                'description': 'Tarea creada por la prueba de carga',
+                'difficulty': rnd.choice(difficulties),
+                'priority': rnd.randint(1, 5),
+                'estimated_hours': rnd.randint(1, 8),
+            }, token)
+
+    def worker_actor(self, server, user, token, seed, stop, stats, options):
+        rnd = random.Random(seed)
+        while not stop.is_set():
+            status_code, tasks = self.timed(stats, 'list', server, 'get', '/api/tasks/', token=token)
+            open_tasks = [
+                task for task in (tasks if status_code == 200 else [])
+                if task['status'] == 'assigned' and task['assigned_to'] == user.id
+            ]
+            if not open_tasks:
+                # Esperar a que la cola le asigne algo
+                stop.wait(0.2)
+                continue
+
+            task = rnd.choice(open_tasks)
+            if rnd.random() < options['reject_rate']:
+                self.timed(stats, 'reject', server, 'post', f'/api/tasks/{task["id"]}/reject/', {
+                    'reason': 'Sin disponibilidad'
+                }, token)
+            else:
+                self.timed(stats, 'complete', server, 'post', f'/api/tasks/{task["id"]}/complete/', {
+                    'report_text': 'Completada durante la prueba de carga',
+                    'hours_worked': rnd.randint(1, 8),
+                }, token)
+
+    def job_worker(self, worker_id, stop, errors):
+        """Trabajador de la cola en proceso; al parar, vacía lo pendiente y sale"""
+        try:
+            while True:
+                try:
+                    jobs = claim_jobs(worker_id, 20)
+                    for job in jobs:
+                        run_job(job)
+                except OperationalError as exc:
+                    errors['sqlite_locked' if _is_lock_error(exc) else 'operational'] += 1
+                    continue
+                if not jobs:
+                    if stop.is_set():
+                        break
+                    time.sleep(0.05)
+        finally:
+            connection.close()
+
+    # -- Informe ---------------------------------------------------------------
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"{report['seconds']}s con {report['admins']} administradores y {report['workers']} trabajadores"
+        )
+        for operation, result in sorted(report['operations'].items()):
+            self.stdout.write(
+                f"{operation:9s} {result['throughput_per_s']:8.2f}/s  p50 {result['p50_ms']:8.2f}  "
+                f"p95 {result['p95_ms']:8.2f}  p99 {result['p99_ms']:8.2f}  max {result['max_ms']:8.2f} ms  "
+                f"errores {result['error_rate']:.2%}  {result['statuses']}"
+            )
+        self.stdout.write(f"Excepciones en el servidor: {report['server_exceptions'] or 'ninguna'}")
+        self.stdout.write(f"Trabajos: {report['jobs']}  errores del trabajador: {report['job_worker_errors'] or 'ninguno'}")
+        for name, ids in report['invariants'].items():
+            line = f'{name:24s} {len(ids)}'
+            if ids:
+                self.stdout.write(self.style.ERROR(f'{line}  (p. ej. {ids[:10]})'))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
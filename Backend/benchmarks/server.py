@@ -0,0 +1,167 @@
+"""Servidores en proceso para medir: WSGI a través de HTTP real y ASGI en el bucle de eventos."""
+import asyncio
+import http.client
+import json
+import logging
+import re
+import threading
+from contextlib import contextmanager
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.test.utils import override_settings
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def server_timing_queries(headers):
+    """Consultas SQL declaradas en la cabecera Server-Timing, o None"""
+    match = SERVER_TIMING_QUERIES.search(headers.get('Server-Timing', ''))
+    return int(match.group(1)) if match else None
+
+
+@contextmanager
+def benchmark_environment():
+    """Configuración para medir: sin DEBUG (guarda cada consulta), log por petición ni limitación"""
+    request_logger = logging.getLogger('monitoring.requests')
+    old_level = request_logger.level
+    # Las peticiones sobre grandes volúmenes superan los presupuestos de consultas
+    request_logger.setLevel(logging.ERROR)
+    try:
+        with override_settings(
+            DEBUG=False, REQUEST_METRICS_LOG=False, REQUEST_THROTTLING=False,
+            ALLOWED_HOSTS=['testserver', '127.0.0.1', 'localhost']
+        ):
+            yield
+    finally:
+        request_logger.setLevel(old_level)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class LiveServer:
+    """Arranca la aplicación en un puerto libre de 127.0.0.1 en un hilo aparte"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.address = (host, port)
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def host(self):
+        return self.httpd.server_address[0]
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def __enter__(self):
+        # ThreadedWSGIServer cierra la conexión a la base de datos de cada hilo
+        self.httpd = ThreadedWSGIServer(self.address, QuietRequestHandler, allow_reuse_address=True)
+        self.httpd.set_app(WSGIHandler())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def request(self, method, path, data=None, token=None, timeout=60):
+        """Hace una petición y devuelve (código, cabeceras, cuerpo decodificado o None)"""
+        headers = {'Host': self.host}
+        body = None
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        if data is not None:
+            body = json.dumps(data)
+            headers['Content-Type'] = 'application/json'
+
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        try:
+            conn.request(method.upper(), path, body=body, headers=headers)
+            response = conn.getresponse()
+            raw = response.read()
+        finally:
+            conn.close()
+
+        try:
+            payload = json.loads(raw) if raw else None
+        except ValueError:
+            payload = None
+        return response.status, dict(response.getheaders()), payload
+
+
+class ASGIClient:
+    """Llama directamente a la aplicación ASGI, sin servidor ni sockets.
+
+    Debe usarse dentro de un bucle de eventos; las peticiones concurrentes se
+    lanzan con ``asyncio.gather``.
+    """
+
+    def __init__(self):
+        self.app = ASGIHandler()
+
+    async def request(self, method, path, data=None, token=None):
+        """Devuelve (código, cabeceras, cuerpo decodificado o None)"""
+        headers = [(b'host', b'testserver')]
+        body = b''
+        if token:
+            headers.append((b'authorization', f'Bearer {token}'.encode()))
+        if data is not None:
+            body = json.dumps(data).encode()
+            headers.append((b'content-type', b'application/json'))
+        path, _, query = path.partition('?')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method.upper(),
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'root_path': '',
+            'headers': headers,
+            'client': ('127.0.0.1', 0),
+            'server': ('testserver', 80),
+        }
+
+        received = False
+        disconnect = asyncio.Event()
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            # Django escucha la desconexión mientras atiende la petición
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        start, chunks = None, []
+
+        async def send(message):
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                start = message
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            disconnect.set()
+
+        raw = b''.join(chunks)
+        try:
+            payload = json.loads(raw) if raw else None
+        except ValueError:
+            payload = None
+        response_headers = {key.decode('latin-1'): value.decode('latin-1') for key, value in start['headers']}
+        return start['status'], response_headers, payload
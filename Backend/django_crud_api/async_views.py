@@ -0,0 +1,61 @@
+"""Base para vistas de DRF con manejadores asíncronos.
+
+DRF despacha siempre de forma síncrona; bajo ASGI eso obliga a pasar cada
+petición por el puente de hilos de ``sync_to_async``. ``AsyncAPIView``
+despacha con ``async def`` y solo salta a un hilo para las fases de DRF que
+pueden consultar la base de datos (autenticación, permisos, throttling).
+
+Dentro de los manejadores no se puede tocar una relación sin cargar: el ORM
+lanza ``SynchronousOnlyOperation``. Las consultas deben usar la API
+asíncrona (``aget``, ``acount``, ``aiterator``...) y cargar de antemano las
+relaciones que vaya a leer el serializador.
+"""
+import inspect
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+from login.models import UserProfile
+
+
+class AsyncAPIView(APIView):
+    """APIView cuyos manejadores (get, post...) son corrutinas"""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers  # deprecate?
+
+        try:
+            # Autenticación JWT, permisos y throttling hacen consultas síncronas
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(),
+                                  self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            # options() y http_method_not_allowed() siguen siendo síncronos
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+async def aget_profile(user):
+    """Perfil del usuario, dejándolo en la caché de ``user.userprofile``"""
+    profile = await UserProfile.objects.aget(user=user)
+    user.userprofile = profile
+    return profile
+
+
+async def alist(queryset, chunk_size=2000):
+    """Evalúa el queryset por bloques sin bloquear el bucle de eventos"""
+    return [obj async for obj in queryset.aiterator(chunk_size=chunk_size)]
@@ -0,0 +1,169 @@
+"""Varias llamadas a la API en una sola petición HTTP.
+
+``POST /api/batch/`` recibe una lista ordenada de subpeticiones a rutas de
+login/urls.py y task/urls.py y las ejecuta en el mismo proceso a través del
+resolvedor de URLs, con el usuario ya autenticado por la petición principal
+(el token no se vuelve a validar en cada una)::
+
+    {"atomic": true, "requests": [
+        {"method": "POST", "path": "/api/auth/users/create/", "body": {...}},
+        {"method": "PUT", "path": "/api/auth/users/update/7/", "body": {...},
+         "headers": {"Idempotency-Key": "..."}}
+    ]}
+
+Devuelve ``{"responses": [{"status": 201, "body": {...}, "headers": {...}}, ...]}``
+en el mismo orden.
+
+- Sin ``atomic`` cada subpetición es independiente: un fallo no detiene las demás.
+- Con ``atomic`` todas van en una transacción; la primera respuesta >= 400
+  la deshace, y las subpeticiones que quedaban no se ejecutan (424).
+
+Las subpeticiones no pasan por los middlewares: sus lecturas van al primario
+aunque sean GET, así que ven las escrituras anteriores del mismo lote.
+"""
+import io
+import json
+import logging
+from importlib import import_module
+
+from asgiref.sync import async_to_sync
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_REQUESTS = 50
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+BATCH_URLCONFS = ('login.urls', 'task.urls')
+# Rutas a las que no tiene sentido llamar con un usuario ya autenticado
+BATCH_EXCLUDED_ROUTES = ('login',)
+# Cabeceras de las subrespuestas que se devuelven al cliente
+BATCH_RESPONSE_HEADERS = ('Retry-After', 'Idempotent-Replayed', 'Location')
+
+
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=BATCH_METHODS)
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False)
+    headers = serializers.DictField(child=serializers.CharField(max_length=1000), required=False)
+
+    def validate_path(self, value):
+        if not value.startswith('/'):
+            raise serializers.ValidationError('La ruta debe ser absoluta, p. ej. /api/tasks/')
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False, max_length=BATCH_MAX_REQUESTS)
+    atomic = serializers.BooleanField(default=False)
+
+
+def batch_routes():
+    """Nombres de las rutas que admite el lote"""
+    return {
+        pattern.name
+        for module in BATCH_URLCONFS
+        for pattern in import_module(module).urlpatterns
+        if pattern.name and pattern.name not in BATCH_EXCLUDED_ROUTES
+    }
+
+
+def build_subrequest(parent, method, path, body=None, headers=None):
+    """WSGIRequest para la subpetición, con el usuario de la petición principal"""
+    path, _, query = path.partition('?')
+    content = json.dumps(body).encode() if body is not None else b''
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': parent.META.get('SERVER_NAME', 'localhost'),
+        'SERVER_PORT': parent.META.get('SERVER_PORT', '80'),
+        'REMOTE_ADDR': parent.META.get('REMOTE_ADDR', ''),
+        'HTTP_HOST': parent.get_host(),
+        'wsgi.url_scheme': parent.scheme,
+        'wsgi.input': io.BytesIO(content),
+        'CONTENT_LENGTH': str(len(content)),
+        'CONTENT_TYPE': 'application/json',
+    }
+    for name, value in (headers or {}).items():
+        key = 'HTTP_' + name.upper().replace('-', '_')
+        if key != 'HTTP_AUTHORIZATION':
+            environ[key] = value
+    request = WSGIRequest(environ)
+    # DRF usa ForcedAuthentication cuando la petición trae estos atributos
+    request._force_auth_user = parent.user
+    request._force_auth_token = parent.auth
+    return request
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def _sub_response(status_code, body, headers=None):
+    return {'status': status_code, 'body': body, 'headers': headers or {}}
+
+
+def run_subrequest(parent, allowed, item):
+    """Ejecuta una subpetición y devuelve su respuesta serializable"""
+    path = item['path'].partition('?')[0]
+    try:
+        match = resolve(path)
+    except Resolver404:
+        match = None
+    if match is None or match.url_name not in allowed:
+        return _sub_response(status.HTTP_404_NOT_FOUND, {'error': 'Ruta no disponible en un lote'})
+
+    request = build_subrequest(parent, item['method'], item['path'], item.get('body'), item.get('headers'))
+    # Los cubos de TokenBucketThrottle van por nombre de ruta: el lote no los salta
+    request.resolver_match = match
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+        # Las vistas asíncronas (ASYNC_READ_VIEWS) devuelven una corrutina
+        if hasattr(response, '__await__'):
+            response = async_to_sync(_await)(response)
+    except Exception:
+        logger.exception('Error en la subpetición %s %s', item['method'], item['path'])
+        return _sub_response(status.HTTP_500_INTERNAL_SERVER_ERROR, {'error': 'Error interno del servidor'})
+
+    if hasattr(response, 'data'):
+        body = response.data
+    else:
+        body = json.loads(response.content) if response.content else None
+    headers = {name: response[name] for name in BATCH_RESPONSE_HEADERS if response.has_header(name)}
+    return _sub_response(response.status_code, body, headers)
+
+
+class BatchView(APIView):
+    cost_class = 'expensive'
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items = serializer.validated_data['requests']
+        allowed = batch_routes()
+
+        if not serializer.validated_data['atomic']:
+            return Response({'responses': [run_subrequest(request, allowed, item) for item in items]})
+
+        responses = []
+        with transaction.atomic():
+            for item in items:
+                responses.append(run_subrequest(request, allowed, item))
+                if responses[-1]['status'] >= 400:
+                    # Se deshace todo el lote; lo que quedaba no se ejecuta
+                    transaction.set_rollback(True)
+                    break
+
+        rolled_back = responses[-1]['status'] >= 400
+        skipped = _sub_response(status.HTTP_424_FAILED_DEPENDENCY, {'error': 'No ejecutada: el lote se deshizo'})
+        responses += [skipped] * (len(items) - len(responses))
+        return Response({'responses': responses, 'rolled_back': rolled_back})
@@ -0,0 +1,27 @@
+"""Paginación por ``?page=`` y ``?page_size=`` compartida entre aplicaciones.
+
+Las páginas no cuentan el total: se pide una fila de más para saber si hay
+otra página, así el coste no crece con la tabla.
+"""
+
+
+def positive_int(value, default):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
+def page_params(request, page_size, max_page_size):
+    """(página, tamaño de página, desplazamiento) de la petición"""
+    page = positive_int(request.GET.get('page'), 1)
+    page_size = min(positive_int(request.GET.get('page_size'), page_size), max_page_size)
+    return page, page_size, (page - 1) * page_size
+
+
+def paginate(queryset, request, page_size, max_page_size):
+    """Página de ``queryset`` y su envoltorio ``{page, page_size, has_next}``"""
+    page, page_size, offset = page_params(request, page_size, max_page_size)
+    rows = list(queryset[offset:offset + page_size + 1])
+    return rows[:page_size], {'page': page, 'page_size': page_size, 'has_next': len(rows) > page_size}
@@ -0,0 +1,14 @@
+"""Expresiones de consulta compartidas entre aplicaciones."""
+from django.db.models import F, Func, IntegerField, Subquery
+
+
+def count_subquery(queryset):
+    """COUNT del queryset como subconsulta escalar.
+
+    Permite reunir varios recuentos de tablas distintas en una sola consulta,
+    p. ej. ``User.objects.filter(pk=...).values(a=count_subquery(...), ...)``.
+    """
+    return Subquery(
+        queryset.order_by().annotate(n=Func(F('pk'), function='COUNT')).values('n'),
+        output_field=IntegerField()
+    )
@@ -0,0 +1,151 @@
+"""Enrutado de lecturas y escrituras entre conexiones de base de datos.
+
+- 'default': escrituras y lecturas fuera de las vistas de solo lectura.
+- 'read': misma base de datos, conexión separada para peticiones GET.
+- 'replica' (opcional): réplica de lectura para los listados y estadísticas
+  que usan ``ReplicaReadMixin``. Tras una escritura de un usuario, sus
+  lecturas vuelven al primario durante ``READ_REPLICA_STICKY_SECONDS``
+  para que vea sus propios cambios aunque la réplica vaya con retraso.
+  La marca viaja en una cookie firmada, no en la caché de cada proceso,
+  así la respeta cualquier proceso que atienda la siguiente lectura.
+"""
+import sqlite3
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+# Activo mientras se atiende una petición de solo lectura (GET/HEAD/OPTIONS)
+_read_only_request = ContextVar('read_only_request', default=False)
+# Activo cuando la vista permite leer de la réplica
+_use_replica = ContextVar('use_replica', default=False)
+
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+STICKY_COOKIE = 'read_primary'
+_STICKY_SALT = 'django_crud_api.routers.sticky'
+
+
+def _sticky_seconds():
+    return getattr(settings, 'READ_REPLICA_STICKY_SECONDS', 5)
+
+
+def mark_recent_write(response, user):
+    """Fija las lecturas del usuario al primario durante la ventana configurada"""
+    if user is not None and user.is_authenticated:
+        response.set_signed_cookie(
+            STICKY_COOKIE, str(user.pk), salt=_STICKY_SALT, max_age=_sticky_seconds(),
+            httponly=True, samesite='Lax'
+        )
+
+
+def has_recent_write(request, user):
+    if user is None or not user.is_authenticated:
+        return False
+    # La firma lleva la hora: la ventana se comprueba aquí aunque el navegador guarde la cookie
+    value = request.get_signed_cookie(
+        STICKY_COOKIE, default=None, salt=_STICKY_SALT, max_age=_sticky_seconds()
+    )
+    return value == str(user.pk)
+
+
+def sync_replica(source='default', replica='replica'):
+    """Copia la base de datos primaria sobre la réplica (SQLite, para pruebas y desarrollo)"""
+    source_conn = connections[source]
+    source_conn.ensure_connection()
+    # La conexión de Django a la réplica es query_only; se copia con una propia
+    target = sqlite3.connect(connections[replica].settings_dict['NAME'])
+    try:
+        source_conn.connection.backup(target)
+    finally:
+        target.close()
+    connections[replica].close()
+
+
+class ReadWriteRouter:
+    """Envía las lecturas de las vistas de solo lectura a 'read' o a la réplica"""
+
+    read_alias = 'read'
+    replica_alias = 'replica'
+
+    def db_for_read(self, model, **hints):
+        if not _read_only_request.get():
+            return 'default'
+        # Dentro de una transacción de escritura se lee de la misma conexión
+        if connections['default'].in_atomic_block:
+            return 'default'
+        if _use_replica.get() and self.replica_alias in settings.DATABASES:
+            return self.replica_alias
+        if self.read_alias in settings.DATABASES:
+            return self.read_alias
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Todos los alias contienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaReadMixin:
+    """Mixin para APIView: las lecturas GET de la vista pueden ir a la réplica.
+
+    Se decide después de autenticar, para respetar la ventana de
+    read-your-writes del usuario.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in READ_ONLY_METHODS and not has_recent_write(request, request.user):
+            _use_replica.set(True)
+
+
+class ReadOnlyRequestMiddleware:
+    """Marca las peticiones de solo lectura y registra las escrituras de cada usuario"""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        read_only = request.method in READ_ONLY_METHODS
+        read_token = _read_only_request.set(read_only)
+        replica_token = _use_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(replica_token)
+            _read_only_request.reset(read_token)
+
+        # DRF deja en request.user el usuario autenticado por JWT
+        if not read_only and response.status_code < 400:
+            mark_recent_write(response, getattr(request, 'user', None))
+        return response
+
+    async def __acall__(self, request):
+        # sync_to_async copia el contexto, así que el router ve estas marcas
+        # desde el hilo donde se ejecutan las consultas
+        read_only = request.method in READ_ONLY_METHODS
+        read_token = _read_only_request.set(read_only)
+        replica_token = _use_replica.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(replica_token)
+            _read_only_request.reset(read_token)
+
+        if not read_only and response.status_code < 400:
+            await sync_to_async(mark_recent_write)(response, getattr(request, 'user', None))
+        return response
@@ -1,5 +1,8 @@
+import os
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -34,17 +37,25 @@ INSTALLED_APPS = [
 
     'login',
     'task',
+    'jobs',
+    'benchmarks',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.RequestMetricsMiddleware',
+    'monitoring.middleware.QueryTimingMiddleware',
+    'monitoring.profiling.ProfilingMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
+    'django_crud_api.routers.ReadOnlyRequestMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'django_crud_api.throttling.LoadSheddingMiddleware',
 ]
 
 ROOT_URLCONF = 'django_crud_api.urls'
@@ -66,17 +77,67 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'django_crud_api.wsgi.application'
 
+# Al servir con ASGI (django_crud_api.asgi), las lecturas más frecuentes usan
+# vistas asíncronas. Con WSGI conviene dejarlo desactivado: cada vista
+# asíncrona necesitaría un bucle de eventos propio por petición
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', '').lower() in ('1', 'true', 'yes')
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# django_crud_api.sqlite aplica los PRAGMA de producción (WAL, busy_timeout,
+# mmap, cache) a cada conexión; ver django_crud_api/sqlite/base.py
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'django_crud_api.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Tomar el bloqueo de escritura al empezar la transacción; con
+            # DEFERRED la promoción lectura->escritura falla sin esperar
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    # Misma base de datos, conexión separada para las vistas de solo lectura
+    'read': {
+        'ENGINE': 'django_crud_api.sqlite',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pragmas': {'query_only': 'ON'},
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+# Réplica de lectura opcional para listados y estadísticas (ReplicaReadMixin).
+# En local se puede probar con un segundo fichero SQLite sincronizado con
+# django_crud_api.routers.sync_replica(), como hace django_crud_api/tests.py.
+if os.environ.get('DATABASE_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django_crud_api.sqlite',
+        'NAME': os.environ['DATABASE_REPLICA_NAME'],
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pragmas': {'query_only': 'ON'},
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+
+DATABASE_ROUTERS = ['django_crud_api.routers.ReadWriteRouter']
+
+# Segundos durante los que un usuario lee del primario tras una escritura propia
+# (cookie firmada 'read_primary'; el frontend la envía con credentials: 'include')
+READ_REPLICA_STICKY_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -123,10 +184,15 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'django_crud_api.throttling.TokenBucketThrottle',
+    ),
 }
 
 CORS_ORIGIN_WHITELIST = ['http://localhost:5173']
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed', 'Retry-After']
 
 
 
@@ -135,3 +201,81 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
+
+# Cola de trabajos en segundo plano (manage.py run_jobs)
+JOBS_RUN_EAGERLY = False  # True: ejecutar los trabajos al confirmar la transacción, sin trabajador
+JOBS_LEASE_SECONDS = 60
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BACKOFF = 5  # segundos base del reintento exponencial
+
+# Cabecera Idempotency-Key en los POST del flujo de trabajo: la respuesta se
+# guarda este tiempo; una petición sin terminar bloquea la clave como mucho
+# IDEMPOTENCY_PENDING_SECONDS (p. ej. si el proceso murió a medias)
+IDEMPOTENCY_KEY_TTL_SECONDS = 24 * 3600
+IDEMPOTENCY_PENDING_SECONDS = 60
+
+# Al desactivar, eliminar o reducir la capacidad de un trabajador sus tareas
+# abiertas se reparten en la misma petición hasta este número; por encima,
+# el reparto se encola
+REBALANCE_SYNC_LIMIT = 25
+
+# Borrado de usuarios: con más filas relacionadas que este límite se borran
+# por lotes en segundo plano (login.purge_user), unos lotes por trabajo
+USER_DELETE_SYNC_LIMIT = 5000
+USER_PURGE_BATCHES_PER_JOB = 10
+
+# La matriz de carga de trabajo (/api/tasks/workload/) se guarda en la caché
+# este tiempo: recorre todos los perfiles con sus asignaciones
+WORKLOAD_CACHE_SECONDS = 30
+
+# Limitación por clase de coste de cada vista (``cost_class``); ver
+# django_crud_api/throttling.py. Solo con REQUEST_THROTTLING=1: los cubos van
+# en la caché 'default', que con varios procesos debe ser compartida (p. ej.
+# DatabaseCache, creando su tabla con ``manage.py createcachetable``); sin
+# CACHES es la de cada proceso y ``manage.py check`` avisa (throttling.W001).
+# ``user`` y ``endpoint`` son (fichas por segundo, capacidad) del cubo de cada
+# usuario en cada ruta y del de la ruta para todos. 'expensive' incluye el
+# listado de tareas, que el frontend vuelve a pedir tras cada alta, edición,
+# borrado, finalización o rechazo: una recarga por segundo y ráfagas de 20
+# por usuario; la ruta admite 20 por segundo entre todos.
+# ``max_in_flight`` es por proceso; por encima, 503
+REQUEST_THROTTLING = os.environ.get('REQUEST_THROTTLING', '').lower() in ('1', 'true', 'yes')
+REQUEST_COST_CLASSES = {
+    'cheap': {'user': (5, 60), 'endpoint': None, 'max_in_flight': None},
+    'standard': {'user': (1, 30), 'endpoint': None, 'max_in_flight': None},
+    'expensive': {'user': (1, 20), 'endpoint': (20, 100), 'max_in_flight': 4},
+}
+LOAD_SHEDDING_RETRY_AFTER = 1  # segundos
+
+# Métricas por petición (consultas SQL, tiempo de SQL y de vista); ver
+# monitoring/middleware.py y los presupuestos en monitoring/budgets.py.
+# Una línea JSON por petición solo con REQUEST_METRICS_LOG=1; las que
+# superan su presupuesto se registran siempre
+REQUEST_METRICS_LOG = os.environ.get('REQUEST_METRICS_LOG', '').lower() in ('1', 'true', 'yes')
+
+# Métricas Prometheus en /api/metrics/ (solo administradores). Con varios
+# procesos, definir un fichero SQLite compartido donde se agregan.
+METRICS_MULTIPROCESS_DB = os.environ.get('METRICS_MULTIPROCESS_DB')
+METRICS_FLUSH_INTERVAL = 5  # segundos
+
+# Perfilado de peticiones bajo demanda (se activa en /api/profiling/);
+# informe con manage.py profile_report
+PROFILING_DIR = BASE_DIR / 'profiles'
+PROFILING_MAX_BYTES = 100 * 1024 * 1024
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'monitoring': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,34 @@
+"""Backend SQLite con los PRAGMA de producción aplicados a cada conexión.
+
+Uso en ``DATABASES``::
+
+    'ENGINE': 'django_crud_api.sqlite',
+    'OPTIONS': {'pragmas': {'query_only': 'ON'}},  # se suman a DEFAULT_PRAGMAS
+"""
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    # WAL permite lectores concurrentes mientras hay un escritor
+    'journal_mode': 'WAL',
+    # Con WAL, NORMAL solo sincroniza en los checkpoints
+    'synchronous': 'NORMAL',
+    # Esperar al bloqueo en lugar de fallar con "database is locked"
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Valor negativo: tamaño en KiB (64 MiB)
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = {**DEFAULT_PRAGMAS, **kwargs.pop('pragmas', {})}
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
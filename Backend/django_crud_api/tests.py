@@ -0,0 +1,293 @@
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import OperationalError, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from task.models import Task
+from task.tests import make_user
+from .routers import STICKY_COOKIE, sync_replica
+from .throttling import LIMITER, check_shared_cache, take_token
+
+
+@override_settings(REQUEST_THROTTLING=False)
+class ReadAliasTests(TransactionTestCase):
+    """Las vistas GET leen por la conexión 'read', que no puede escribir.
+
+    En pruebas 'read' es espejo de 'default' y hereda sus opciones; aquí se
+    le devuelven las de settings para que tenga query_only como en producción.
+    """
+
+    databases = {'default', 'read'}
+
+    def setUp(self):
+        cache.clear()
+        read = connections['read']
+        read.close()
+        original = read.settings_dict
+        read.settings_dict = {**original, 'OPTIONS': settings.DATABASES['read']['OPTIONS']}
+
+        def restore():
+            read.close()
+            read.settings_dict = original
+        self.addCleanup(restore)
+        self.admin = make_user('admin', 'admin')
+
+    def test_get_reads_through_read_alias(self):
+        Task.objects.create(title='Tarea', description='Descripción', difficulty='regular', created_by=self.admin)
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connections['read']) as read_queries:
+            response = client.get('/api/tasks/')
+        self.assertEqual([task['title'] for task in response.json()], ['Tarea'])
+        self.assertTrue(any('"task_task"' in query['sql'] for query in read_queries.captured_queries))
+
+    def test_read_alias_rejects_writes(self):
+        with self.assertRaises(OperationalError):
+            Task.objects.using('read').create(
+                title='Tarea', description='Descripción', difficulty='regular', created_by=self.admin
+            )
+        self.assertFalse(Task.objects.exists())
+
+
+@override_settings(REQUEST_THROTTLING=False)
+class ReplicaRoutingTests(TransactionTestCase):
+    """Réplica local: un segundo fichero SQLite copiado del primario antes de cada prueba.
+
+    TransactionTestCase porque la copia no avanza mientras el primario tiene
+    una transacción de escritura abierta. Como espejo de 'default' la réplica
+    no se vacía entre pruebas: la vuelve a escribir ``sync_replica``.
+    """
+
+    # 'read' es la conexión de solo lectura al primario
+    databases = {'default', 'read'}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.replica_dir = tempfile.mkdtemp()
+        settings.DATABASES['replica'] = {
+            **settings.DATABASES['read'],
+            'NAME': str(Path(cls.replica_dir) / 'replica.sqlite3'),
+            'TEST': {'MIRROR': 'default'},
+        }
+        connections.settings = connections.configure_settings(settings.DATABASES)
+        cls.databases = cls.databases | {'replica'}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        # connections.settings es el mismo diccionario que settings.DATABASES
+        del settings.DATABASES['replica']
+        shutil.rmtree(cls.replica_dir)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user('admin', 'admin')
+        self.create_task('Sincronizada')
+        sync_replica()
+        # Escrita en el primario después de sincronizar: la réplica va con retraso
+        self.create_task('Solo en el primario')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_task(self, title):
+        return Task.objects.create(
+            title=title, description='Descripción', difficulty='regular', created_by=self.admin
+        )
+
+    def listed_titles(self):
+        response = self.client.get('/api/tasks/')
+        self.assertEqual(response.status_code, 200)
+        return {task['title'] for task in response.json()}
+
+    def test_get_reads_from_replica(self):
+        self.assertEqual(self.listed_titles(), {'Sincronizada'})
+
+    def test_writes_go_to_default(self):
+        response = self.client.post('/api/tasks/create/', {
+            'title': 'Nueva', 'description': 'Descripción', 'difficulty': 'regular'
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Task.objects.using('default').filter(title='Nueva').exists())
+        self.assertFalse(Task.objects.using('replica').filter(title='Nueva').exists())
+
+    def write(self):
+        return self.client.post('/api/tasks/create/', {
+            'title': 'Nueva', 'description': 'Descripción', 'difficulty': 'regular'
+        }, format='json')
+
+    def test_own_write_sticks_reads_to_default(self):
+        self.write()
+        self.assertEqual(self.listed_titles(), {'Sincronizada', 'Solo en el primario', 'Nueva'})
+
+        # Pasada la ventana el navegador ya no envía la cookie
+        del self.client.cookies[STICKY_COOKIE]
+        self.assertEqual(self.listed_titles(), {'Sincronizada'})
+
+    def test_mark_does_not_depend_on_the_cache(self):
+        # Otro proceso: su caché local no tiene nada de esta escritura
+        self.write()
+        cache.clear()
+        other_process = APIClient()
+        other_process.force_authenticate(self.admin)
+        other_process.cookies = self.client.cookies
+        response = other_process.get('/api/tasks/')
+        self.assertIn('Nueva', {task['title'] for task in response.json()})
+
+    def test_mark_is_per_user(self):
+        self.write()
+        other = APIClient()
+        other.force_authenticate(make_user('otro', 'admin'))
+        other.cookies = self.client.cookies
+        self.assertEqual({task['title'] for task in other.get('/api/tasks/').json()}, {'Sincronizada'})
+
+    @override_settings(READ_REPLICA_STICKY_SECONDS=1)
+    def test_mark_expires_even_if_the_cookie_is_kept(self):
+        self.write()
+        with mock.patch('django.core.signing.time.time', return_value=time.time() + 2):
+            self.assertEqual(self.listed_titles(), {'Sincronizada'})
+
+
+@override_settings(REQUEST_THROTTLING=False)
+class BatchTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user('admin', 'admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def batch(self, requests, atomic=True):
+        response = self.client.post('/api/batch/', {'atomic': atomic, 'requests': requests}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def failing_batch(self):
+        return [
+            {'method': 'POST', 'path': '/api/tasks/create/', 'body': {
+                'title': 'Nueva', 'description': 'Descripción', 'difficulty': 'regular'
+            }},
+            {'method': 'GET', 'path': '/api/tasks/'},
+            {'method': 'POST', 'path': '/api/tasks/create/', 'body': {'title': 'Sin dificultad'}},
+            {'method': 'GET', 'path': '/api/tasks/'},
+        ]
+
+    def test_atomic_rolls_back_on_first_error(self):
+        result = self.batch(self.failing_batch())
+        self.assertEqual([response['status'] for response in result['responses']], [201, 200, 400, 424])
+        self.assertTrue(result['rolled_back'])
+        # La segunda subpetición vio la tarea creada por la primera
+        self.assertEqual([task['title'] for task in result['responses'][1]['body']], ['Nueva'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_non_atomic_keeps_successful_requests(self):
+        result = self.batch(self.failing_batch(), atomic=False)
+        self.assertEqual([response['status'] for response in result['responses']], [201, 200, 400, 200])
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['Nueva'])
+
+    def test_rejects_routes_outside_batch(self):
+        result = self.batch([
+            {'method': 'POST', 'path': '/api/batch/', 'body': {'requests': []}},
+            {'method': 'POST', 'path': '/api/auth/login/', 'body': {'username': 'admin', 'password': 'secreto'}},
+            {'method': 'GET', 'path': '/api/metrics/'},
+        ], atomic=False)
+        self.assertEqual([response['status'] for response in result['responses']], [404, 404, 404])
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+
+    @override_settings(REQUEST_THROTTLING=True)
+    def test_warns_with_per_process_cache(self):
+        self.assertEqual([warning.id for warning in check_shared_cache(None)], ['throttling.W001'])
+
+    @override_settings(REQUEST_THROTTLING=True, CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'
+    }})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(REQUEST_THROTTLING=False)
+    def test_throttling_off_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+
+@override_settings(REQUEST_THROTTLING=True, REQUEST_COST_CLASSES={
+    'cheap': {'user': (5, 60), 'endpoint': None, 'max_in_flight': None},
+    'standard': {'user': (1, 30), 'endpoint': None, 'max_in_flight': None},
+    'expensive': {'user': (0.5, 2), 'endpoint': None, 'max_in_flight': 1},
+})
+class ThrottlingTests(TestCase):
+    """Cubos de fichas (429) y descarte por peticiones en curso (503) de /api/tasks/, clase 'expensive'"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user('admin', 'admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.now = time.time()
+
+    def list_tasks(self, client=None, after=0):
+        with mock.patch('django_crud_api.throttling.time.time', return_value=self.now + after):
+            return (client or self.client).get('/api/tasks/')
+
+    def test_empty_bucket_answers_429_with_retry_after(self):
+        self.assertEqual([self.list_tasks().status_code for _ in range(2)], [200, 200])
+
+        response = self.list_tasks()
+        self.assertEqual(response.status_code, 429)
+        # Media ficha por segundo: la siguiente en 2 s
+        self.assertEqual(response['Retry-After'], '2')
+
+        # El cubo es de cada usuario
+        other = APIClient()
+        other.force_authenticate(make_user('other', 'admin'))
+        self.assertEqual(self.list_tasks(other).status_code, 200)
+
+    def test_bucket_refills_over_time(self):
+        for _ in range(2):
+            self.list_tasks()
+        self.assertEqual(self.list_tasks(after=1).status_code, 429)
+
+        self.assertEqual(self.list_tasks(after=2).status_code, 200)
+        self.assertEqual(self.list_tasks(after=2).status_code, 429)
+        # Nunca pasa de la capacidad por mucho que espere
+        self.assertEqual([self.list_tasks(after=60).status_code for _ in range(3)], [200, 200, 429])
+
+    def test_sheds_at_max_in_flight(self):
+        # Otra petición cara ocupa el único hueco del proceso
+        self.assertTrue(LIMITER.acquire('expensive', 1))
+        try:
+            response = self.list_tasks()
+        finally:
+            LIMITER.release('expensive')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], str(settings.LOAD_SHEDDING_RETRY_AFTER))
+
+        # Al terminar la petición su hueco queda libre
+        self.assertEqual([self.list_tasks().status_code for _ in range(2)], [200, 200])
+        self.assertEqual(LIMITER.in_flight['expensive'], 0)
+
+    def test_concurrent_requests_do_not_share_tokens(self):
+        get = LocMemCache.get
+
+        def slow_get(cache, *args, **kwargs):
+            # Ensancha el hueco entre leer el cubo y reescribirlo
+            value = get(cache, *args, **kwargs)
+            time.sleep(0.005)
+            return value
+
+        with mock.patch.object(LocMemCache, 'get', slow_get), ThreadPoolExecutor(8) as pool:
+            waits = list(pool.map(lambda _: take_token('throttle:test', 0.001, 5, now=self.now), range(20)))
+
+        self.assertEqual(waits.count(0), 5)
@@ -0,0 +1,213 @@
+"""Limitación de peticiones por clase de coste y descarte de carga.
+
+Unos paneles abiertos consultando sin pausa bastan para ocupar todos los
+procesos con las vistas caras (estadísticas, listado completo de tareas).
+Cada vista declara ``cost_class`` ('cheap', 'standard' o 'expensive'; por
+defecto 'standard') y ``REQUEST_COST_CLASSES`` fija para cada clase:
+
+- ``user``: (fichas por segundo, capacidad) del cubo de cada usuario en
+  cada ruta; los anónimos se identifican por IP
+- ``endpoint``: el cubo de la ruta compartido por todos los usuarios, o None
+- ``max_in_flight``: peticiones de la clase en curso a la vez en cada
+  proceso, o None
+
+Todo ello solo con ``REQUEST_THROTTLING`` (desactivado por defecto).
+
+``TokenBucketThrottle`` es el throttle de DRF (``DEFAULT_THROTTLE_CLASSES``):
+guarda los cubos en la caché 'default' y, sin fichas, DRF responde 429 con
+Retry-After. Leer y reescribir el cubo no es atómico, así que se hace con un
+cerrojo tomado con ``cache.add`` (atómico en las cachés de Django): sin él
+dos peticiones simultáneas gastarían la misma ficha. Con una caché de cada
+proceso (LocMemCache, la de Django sin CACHES) cada proceso tiene sus cubos
+y los límites se multiplican por el número de procesos; la comprobación
+``throttling.W001`` lo avisa.
+
+``LoadSheddingMiddleware`` responde 503 con Retry-After cuando la clase ya
+tiene ``max_in_flight`` peticiones en curso en el proceso. El límite es por
+proceso porque lo que se agota son sus hilos y conexiones, y un contador en
+la caché se quedaría alto si un proceso muere con peticiones a medias.
+
+Lo descartado por una u otra vía se cuenta en ``requests_shed``.
+"""
+import math
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.http import JsonResponse
+from rest_framework.throttling import BaseThrottle
+from monitoring.metrics import Counter
+
+DEFAULT_COST_CLASS = 'standard'
+# Segundos que dura el cerrojo de un cubo si quien lo tiene no lo suelta, y
+# que se espera como mucho a conseguirlo
+BUCKET_LOCK_TIMEOUT = 1
+BUCKET_LOCK_WAIT = 2
+
+REQUESTS_SHED = Counter(
+    'requests_shed', 'Peticiones descartadas por limitación (429) o sobrecarga (503)',
+    labelnames=('url_name', 'cost_class', 'reason')
+)
+
+
+# Backends de caché que no comparten los datos entre procesos
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES['default']['BACKEND']
+    if not settings.REQUEST_THROTTLING or backend not in PER_PROCESS_CACHES:
+        return []
+    return [checks.Warning(
+        f'REQUEST_THROTTLING guarda los cubos de fichas en {backend}, que no se comparte entre procesos',
+        hint=(
+            'Con varios procesos cada uno tiene sus cubos y los límites se multiplican por el número '
+            'de procesos. Configure en CACHES una caché compartida (p. ej. DatabaseCache o Redis) o, '
+            'con un solo proceso, silencie el aviso en SILENCED_SYSTEM_CHECKS.'
+        ),
+        id='throttling.W001',
+    )]
+
+
+def cost_class_of(view_class):
+    return getattr(view_class, 'cost_class', DEFAULT_COST_CLASS)
+
+
+def cost_config(cost_class):
+    return settings.REQUEST_COST_CLASSES[cost_class]
+
+
+def _lock_bucket(key):
+    """Toma el cerrojo del cubo ``key``; False si no se consiguió a tiempo"""
+    deadline = time.monotonic() + BUCKET_LOCK_WAIT
+    while not cache.add(f'{key}:lock', 1, timeout=BUCKET_LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+def take_token(key, rate, capacity, now=None):
+    """Gasta una ficha del cubo ``key``; devuelve 0 o los segundos hasta la siguiente"""
+    # Si el cerrojo no llega (caché muy lenta) se sigue sin él: como mucho se
+    # gasta dos veces alguna ficha, en lugar de rechazar la petición
+    locked = _lock_bucket(key)
+    try:
+        now = time.time() if now is None else now
+        tokens, updated = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + max(now - updated, 0) * rate)
+        if tokens < 1:
+            return (1 - tokens) / rate
+        # Pasado el tiempo de rellenarse entero, un cubo lleno y uno sin guardar son lo mismo
+        cache.set(key, (tokens - 1, now), timeout=math.ceil(capacity / rate) + 1)
+        return 0
+    finally:
+        if locked:
+            cache.delete(f'{key}:lock')
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Cubo de fichas por usuario y ruta, y opcionalmente por ruta, según la clase de coste"""
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        if not settings.REQUEST_THROTTLING:
+            return True
+
+        cost_class = cost_class_of(type(view))
+        config = cost_config(cost_class)
+        url_name = getattr(request.resolver_match, 'url_name', None) or type(view).__name__
+        ident = request.user.pk if request.user and request.user.is_authenticated else self.get_ident(request)
+
+        buckets = [(f'throttle:{url_name}:user:{ident}', config['user'])]
+        if config.get('endpoint'):
+            buckets.append((f'throttle:{url_name}:endpoint', config['endpoint']))
+        for key, (rate, capacity) in buckets:
+            wait = take_token(key, rate, capacity)
+            if wait:
+                self.retry_after = wait
+                REQUESTS_SHED.inc(url_name=url_name, cost_class=cost_class, reason='throttled')
+                return False
+        return True
+
+    def wait(self):
+        # DRF escribe Retry-After en segundos enteros
+        return math.ceil(self.retry_after) if self.retry_after else None
+
+
+class InFlightLimiter:
+    """Peticiones en curso de cada clase de coste en este proceso"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+
+    def acquire(self, cost_class, limit):
+        with self.lock:
+            if self.in_flight.get(cost_class, 0) >= limit:
+                return False
+            self.in_flight[cost_class] = self.in_flight.get(cost_class, 0) + 1
+            return True
+
+    def release(self, cost_class):
+        with self.lock:
+            self.in_flight[cost_class] -= 1
+
+
+LIMITER = InFlightLimiter()
+
+
+class LoadSheddingMiddleware:
+    """Responde 503 a las peticiones de una clase de coste que ya está al límite"""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        try:
+            return self.get_response(request)
+        finally:
+            self.release(request)
+
+    async def __acall__(self, request):
+        try:
+            return await self.get_response(request)
+        finally:
+            self.release(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not settings.REQUEST_THROTTLING:
+            return None
+        cost_class = cost_class_of(getattr(view_func, 'view_class', None))
+        limit = cost_config(cost_class).get('max_in_flight')
+        if limit is None:
+            return None
+        if LIMITER.acquire(cost_class, limit):
+            request._cost_class_slot = cost_class
+            return None
+
+        REQUESTS_SHED.inc(url_name=request.resolver_match.url_name, cost_class=cost_class, reason='overloaded')
+        return JsonResponse(
+            {'error': 'El servidor está ocupado, vuelve a intentarlo en unos segundos'},
+            status=503, headers={'Retry-After': str(settings.LOAD_SHEDDING_RETRY_AFTER)}
+        )
+
+    def release(self, request):
+        cost_class = getattr(request, '_cost_class_slot', None)
+        if cost_class is not None:
+            del request._cost_class_slot
+            LIMITER.release(cost_class)
@@ -17,11 +17,17 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 from django.urls import include
+from monitoring.views import MetricsView, ProfilingConfigView
+from .batch import BatchView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('login.urls')),
     path('api/tasks/', include('task.urls')),
+    path('api/dashboard/', include('task.dashboard_urls')),
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
+    path('api/profiling/', ProfilingConfigView.as_view(), name='profiling-config'),
 ]
 
 
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_after', 'locked_by', 'created_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'last_error')
+    readonly_fields = ('created_at', 'finished_at')
+    actions = ['requeue']
+
+    @admin.action(description='Reencolar los trabajos seleccionados')
+    def requeue(self, request, queryset):
+        queryset.exclude(status='running').update(
+            status='queued', attempts=0, run_after=timezone.now(),
+            locked_until=None, locked_by='', last_error=''
+        )
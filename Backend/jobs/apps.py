@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+    verbose_name = 'Cola de Trabajos'
+
+    def ready(self):
+        # Registrar los manejadores definidos en <app>/jobs.py
+        autodiscover_modules('jobs')
@@ -0,0 +1,47 @@
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from jobs.queue import claim_jobs, run_job
+from monitoring.metrics import REGISTRY
+
+
+def _run(job):
+    try:
+        return run_job(job)
+    finally:
+        # Cada hilo usa su propia conexión; cerrarla evita que se acumulen
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos en segundo plano de la cola'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4, help='Hilos del pool de ejecución')
+        parser.add_argument('--batch', type=int, default=20, help='Trabajos reclamados por iteración')
+        parser.add_argument('--poll', type=float, default=1.0, help='Segundos de espera si la cola está vacía')
+        parser.add_argument('--once', action='store_true', help='Procesar lo pendiente y salir')
+
+    def handle(self, *args, **options):
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stdout.write(f'Trabajador {worker_id} iniciado con {options["threads"]} hilos')
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            while True:
+                close_old_connections()
+                # Las métricas de los trabajos se agregan con las del servidor web
+                REGISTRY.maybe_flush()
+                jobs = claim_jobs(worker_id, options['batch'])
+                if jobs:
+                    results = list(pool.map(_run, jobs))
+                    self.stdout.write(
+                        f'{results.count(True)} trabajos completados, {results.count(False)} fallidos'
+                    )
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll'])
@@ -0,0 +1,37 @@
+from django.db import models
+
+class Job(models.Model):
+    STATUS_CHOICES = (
+        ('queued', 'En Cola'),
+        ('running', 'En Ejecución'),
+        ('done', 'Terminado'),
+        ('dead', 'Descartado'),
+    )
+    
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    
+    # Reintentos
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+    
+    # Planificación y arrendamiento (lease) del trabajador que lo ejecuta
+    run_after = models.DateTimeField()
+    locked_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['run_after', 'id']
+        verbose_name = 'Trabajo'
+        verbose_name_plural = 'Trabajos'
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_claim_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} #{self.id} - {self.status}"
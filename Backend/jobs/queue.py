@@ -0,0 +1,208 @@
+"""Cola de trabajos en segundo plano respaldada por la base de datos.
+
+Los trabajos se insertan en la misma transacción que el cambio de estado que
+los origina, así que el trabajador solo los ve cuando ese cambio se confirma.
+Para reclamar trabajos se usa ``SELECT ... FOR UPDATE SKIP LOCKED`` cuando el
+motor lo soporta y, en SQLite, un arrendamiento (``locked_until``) adquirido
+con un UPDATE condicional.
+
+Un trabajo cuyo arrendamiento vence se da por fallido: al reclamarlo otro
+trabajador cuenta un intento y, agotados ``max_attempts``, pasa a 'dead' en
+lugar de volver a ejecutarse. Los manejadores largos lo evitan así:
+
+- ``register(name, lease=...)``: arrendamiento propio, fijado al empezar
+- ``register(name, atomic=False)``: el manejador confirma sus lotes por su
+  cuenta y llama a ``renew_lease()`` entre uno y otro
+"""
+import logging
+import traceback
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, When
+from django.utils import timezone
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+# Trabajo que se está ejecutando en este hilo (para renew_lease)
+_current_job = ContextVar('current_job', default=None)
+
+
+class LeaseLost(Exception):
+    """Otro trabajador reclamó el trabajo tras vencer el arrendamiento"""
+
+
+def register(name, lease=None, atomic=True):
+    """Decorador que registra un manejador de trabajos con el nombre dado.
+
+    ``lease`` son los segundos de arrendamiento si el trabajo puede tardar
+    más que JOBS_LEASE_SECONDS. Con ``atomic=False`` el manejador no se
+    ejecuta en la transacción de la marca de terminado: confirma cada lote
+    y llama a ``renew_lease()`` entre lotes.
+    """
+    def decorator(func):
+        func.job_lease = lease
+        func.job_atomic = atomic
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name):
+    return _handlers[name]
+
+
+def _lease_seconds(handler):
+    return handler.job_lease or getattr(settings, 'JOBS_LEASE_SECONDS', 60)
+
+
+def _run_eagerly(name, payload):
+    handler = get_handler(name)
+    if handler.job_atomic:
+        with transaction.atomic():
+            handler(payload)
+    else:
+        handler(payload)
+
+
+def enqueue(name, payload=None, delay=None, max_attempts=None):
+    """Encola un trabajo; en modo JOBS_RUN_EAGERLY se ejecuta al confirmar la transacción"""
+    payload = payload or {}
+    if getattr(settings, 'JOBS_RUN_EAGERLY', False):
+        # Fuera de on_commit no hay transacción; select_for_update la necesita
+        transaction.on_commit(lambda: _run_eagerly(name, payload))
+        return None
+
+    run_after = timezone.now()
+    if delay:
+        run_after += timedelta(seconds=delay)
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        run_after=run_after,
+        max_attempts=max_attempts or getattr(settings, 'JOBS_MAX_ATTEMPTS', 5)
+    )
+
+
+def _claimable(now):
+    # En cola y listos, o en ejecución con el arrendamiento vencido (trabajador caído
+    # o ejecución más larga que el arrendamiento)
+    return Job.objects.filter(
+        Q(status='queued', run_after__lte=now) |
+        Q(status='running', locked_until__lt=now)
+    )
+
+
+def _dead_letter_expired(now):
+    """Descarta los trabajos con el arrendamiento vencido que ya no tienen intentos"""
+    dead = Job.objects.filter(
+        status='running', locked_until__lt=now, attempts__gte=F('max_attempts') - 1
+    ).update(
+        status='dead', finished_at=now, attempts=F('attempts') + 1, locked_by='', locked_until=None,
+        last_error='El arrendamiento venció antes de terminar'
+    )
+    if dead:
+        logger.error('%s trabajo(s) descartados: el arrendamiento venció en todos sus intentos', dead)
+
+
+def claim_jobs(worker_id, limit):
+    """Reclama hasta ``limit`` trabajos para ``worker_id`` y los devuelve"""
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, 'JOBS_LEASE_SECONDS', 60))
+    claim = dict(
+        status='running', locked_by=worker_id, locked_until=now + lease,
+        # Reclamar un trabajo en ejecución es que el intento anterior no terminó
+        attempts=Case(
+            When(status='running', then=F('attempts') + 1),
+            default=F('attempts'), output_field=PositiveIntegerField()
+        ),
+    )
+    _dead_letter_expired(now)
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                _claimable(now).select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:limit]
+            )
+            Job.objects.filter(id__in=ids).update(**claim)
+        return list(Job.objects.filter(id__in=ids))
+
+    # SQLite: cada UPDATE condicional es atómico; si otro trabajador ganó la
+    # carrera la fila ya no cumple el filtro y no se actualiza
+    claimed = []
+    for job_id in _claimable(now).values_list('id', flat=True)[:limit]:
+        if _claimable(now).filter(id=job_id).update(**claim):
+            claimed.append(job_id)
+    return list(Job.objects.filter(id__in=claimed))
+
+
+def _release(job, **changes):
+    """Escribe el resultado solo si ``job`` sigue reclamado por este trabajador"""
+    return Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        locked_by='', locked_until=None, **changes
+    )
+
+
+def renew_lease(seconds=None):
+    """Prolonga el arrendamiento del trabajo en curso; LeaseLost si ya es de otro trabajador.
+
+    Fuera de un trabajo (modo JOBS_RUN_EAGERLY o llamada directa) no hace nada.
+    """
+    job = _current_job.get()
+    if job is None:
+        return
+    seconds = seconds or _lease_seconds(get_handler(job.name))
+    if not Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        locked_until=timezone.now() + timedelta(seconds=seconds)
+    ):
+        raise LeaseLost
+
+
+def run_job(job):
+    """Ejecuta un trabajo reclamado y registra el resultado"""
+    token = _current_job.set(job)
+    try:
+        handler = get_handler(job.name)
+        if handler.job_lease:
+            renew_lease()
+        if handler.job_atomic:
+            # El manejador y la marca de terminado se confirman juntos, así un
+            # trabajo que ya aplicó sus efectos no se vuelve a ejecutar. Si el
+            # arrendamiento venció y otro trabajador lo reclamó, se deshacen los
+            # efectos: solo cuenta la ejecución de quien tiene el trabajo
+            with transaction.atomic():
+                handler(job.payload)
+                if not _release(job, status='done', finished_at=timezone.now()):
+                    raise LeaseLost
+        else:
+            # Los lotes ya confirmados no se deshacen; el manejador los
+            # repite sin efecto si otro trabajador retoma el trabajo
+            handler(job.payload)
+            if not _release(job, status='done', finished_at=timezone.now()):
+                raise LeaseLost
+    except LeaseLost:
+        # El intento ya lo contó quien reclamó el trabajo
+        logger.warning('Trabajo %s #%s reclamado por otro trabajador; se descarta esta ejecución', job.name, job.id)
+        return False
+    except Exception:
+        job.attempts += 1
+        changes = {'attempts': job.attempts, 'last_error': traceback.format_exc()}
+        if job.attempts >= job.max_attempts:
+            # Dead-letter: queda registrado para revisión manual
+            changes.update(status='dead', finished_at=timezone.now())
+            logger.error('Trabajo %s #%s descartado tras %s intentos', job.name, job.id, job.attempts)
+        else:
+            backoff = min(2 ** job.attempts * getattr(settings, 'JOBS_RETRY_BACKOFF', 5), 3600)
+            changes.update(status='queued', run_after=timezone.now() + timedelta(seconds=backoff))
+            logger.warning('Trabajo %s #%s falló (intento %s)', job.name, job.id, job.attempts)
+        _release(job, **changes)
+        return False
+    finally:
+        _current_job.reset(token)
+
+    return True
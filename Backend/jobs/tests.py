@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from login.models import UserProfile
+from .models import Job
+from .queue import claim_jobs, enqueue, register, renew_lease, run_job
+
+
+def expire_lease(job):
+    """Como si hubiera pasado el arrendamiento sin que el trabajo terminara"""
+    Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+
+@register('tests.batched', atomic=False)
+def batched(payload):
+    for _ in range(payload['batches']):
+        # Cada lote tarda más que el arrendamiento, que se renueva entre lotes
+        expire_lease(Job.objects.get(name='tests.batched'))
+        renew_lease()
+        Job.objects.filter(name='tests.batched').update(payload={**payload, 'done': True})
+
+
+@register('tests.slow', lease=600)
+def slow(payload):
+    Job.objects.filter(name='tests.slow').update(last_error=str(Job.objects.get(name='tests.slow').locked_until))
+
+
+class LeaseTests(TestCase):
+    """Un trabajo reclamado de nuevo tras vencer el arrendamiento solo se aplica una vez"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='worker', password='secreto')
+        enqueue('task.increment_counter', {'user_id': self.user.id, 'field': 'tasks_completed'})
+
+    def tasks_completed(self):
+        return UserProfile.objects.get(user=self.user).tasks_completed
+
+    def test_expired_lease_run_is_rolled_back(self):
+        [slow] = claim_jobs('slow', 1)
+        # El arrendamiento de "slow" vence y "fast" reclama el trabajo
+        Job.objects.filter(pk=slow.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        [fast] = claim_jobs('fast', 1)
+
+        self.assertTrue(run_job(fast))
+        self.assertFalse(run_job(slow))
+        self.assertEqual(self.tasks_completed(), 1)
+        job = Job.objects.get(pk=slow.pk)
+        self.assertEqual(job.status, 'done')
+        # La ejecución que perdió el arrendamiento cuenta como un intento
+        self.assertEqual(job.attempts, 1)
+
+    def test_lease_lost_before_finishing(self):
+        [slow] = claim_jobs('slow', 1)
+        Job.objects.filter(pk=slow.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        [fast] = claim_jobs('fast', 1)
+
+        # "slow" termina primero pero ya no tiene el trabajo: no cuenta ni lo toca
+        self.assertFalse(run_job(slow))
+        self.assertEqual(self.tasks_completed(), 0)
+        self.assertEqual(Job.objects.get(pk=slow.pk).locked_by, 'fast')
+
+        self.assertTrue(run_job(fast))
+        self.assertEqual(self.tasks_completed(), 1)
+
+    def test_expired_lease_counts_toward_max_attempts(self):
+        Job.objects.update(max_attempts=2)
+        for worker_id in ('first', 'second'):
+            [job] = claim_jobs(worker_id, 1)
+            expire_lease(job)
+
+        # Dos arrendamientos vencidos agotan los intentos: no se vuelve a reclamar
+        self.assertEqual(claim_jobs('third', 1), [])
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), ('dead', 2))
+        self.assertEqual(self.tasks_completed(), 0)
+
+
+class LongJobTests(TestCase):
+    """Trabajos que tardan más que JOBS_LEASE_SECONDS"""
+
+    def test_batched_job_renews_its_lease(self):
+        enqueue('tests.batched', {'batches': 3})
+        [job] = claim_jobs('worker', 1)
+        self.assertTrue(run_job(job))
+
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), ('done', 0))
+        self.assertTrue(job.payload['done'])
+
+    def test_renewal_fails_once_reclaimed(self):
+        enqueue('tests.batched', {'batches': 1})
+        [job] = claim_jobs('worker', 1)
+        expire_lease(job)
+        claim_jobs('other', 1)
+
+        self.assertFalse(run_job(job))
+        self.assertEqual(Job.objects.get().locked_by, 'other')
+
+    def test_declared_lease_is_taken_before_running(self):
+        enqueue('tests.slow')
+        [job] = claim_jobs('worker', 1)
+        self.assertTrue(run_job(job))
+        locked_until = Job.objects.values_list('last_error', flat=True).get()
+        self.assertGreater(locked_until, str(timezone.now() + timedelta(seconds=500)))
@@ -0,0 +1,46 @@
+"""Manejadores de trabajos en segundo plano de la gestión de usuarios."""
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from jobs.queue import enqueue, register, renew_lease
+from task.deletion import purge_batches
+from .models import UserDeletion
+
+
+# Sin la transacción de run_job: cada lote se confirma con su progreso
+@register('login.purge_user', atomic=False)
+def purge_user(payload):
+    """Avanza unos lotes del borrado y se vuelve a encolar hasta terminar.
+
+    Cada lote se confirma en su propia transacción junto con el progreso, así
+    que este se ve a medida que avanza y una ejecución interrumpida se reanuda
+    desde el último lote confirmado. Entre lotes se prolonga el arrendamiento.
+    """
+    deletion = UserDeletion.objects.filter(id=payload['deletion_id']).first()
+    if deletion is None or deletion.status == 'done':
+        return
+    user = User.objects.filter(id=deletion.user_id).first()
+
+    processed = Counter(deletion.processed)
+    finished = user is None
+    if user is not None:
+        batches = purge_batches(user)
+        for _ in range(getattr(settings, 'USER_PURGE_BATCHES_PER_JOB', 10)):
+            with transaction.atomic():
+                counts = next(batches, None)
+                if counts is None:
+                    finished = True
+                    break
+                processed.update(counts)
+                UserDeletion.objects.filter(id=deletion.id).update(processed=dict(processed), status='running')
+            renew_lease()
+
+    if finished:
+        UserDeletion.objects.filter(id=deletion.id).update(
+            processed=dict(processed), status='done', finished_at=timezone.now()
+        )
+    else:
+        enqueue('login.purge_user', payload)
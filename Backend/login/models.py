@@ -32,6 +32,9 @@ class UserProfile(models.Model):
     
     @property
     def current_task_count(self):
+        # Las vistas que ya lo contaron en su consulta lo dejan en open_task_count
+        if hasattr(self, 'open_task_count'):
+            return self.open_task_count
         from task.models import TaskAssignment
         return TaskAssignment.objects.filter(
             assigned_to=self.user, 
@@ -42,17 +45,44 @@ class UserProfile(models.Model):
     def can_accept_more_tasks(self):
         return self.current_task_count < self.max_tasks and self.is_active_worker
 
+class UserDeletion(models.Model):
+    """Progreso del borrado por lotes de un usuario con mucho historial"""
+    STATUS_CHOICES = (
+        ('queued', 'En Cola'),
+        ('running', 'En Ejecución'),
+        ('done', 'Terminado'),
+    )
+    
+    # Sin clave foránea: el usuario desaparece al terminar
+    user_id = models.BigIntegerField()
+    username = models.CharField(max_length=150)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    
+    # Filas estimadas al encolar y filas borradas o desvinculadas hasta ahora, por tipo
+    total_rows = models.PositiveIntegerField(default=0)
+    processed = models.JSONField(default=dict)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Borrado de {self.username} - {self.status}"
+    
+    @property
+    def progress(self):
+        if self.status == 'done':
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return min(sum(self.processed.values()) / self.total_rows, 1.0)
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         # Asignar rol por defecto basado en si es staff o no
-        default_role = 'admin' if instance.is_staff else 'adiestrado'
-        UserProfile.objects.create(user=instance, role=default_role)
-
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, 'userprofile'):
-        instance.userprofile.save()
-    else:
         default_role = 'admin' if instance.is_staff else 'adiestrado'
         UserProfile.objects.create(user=instance, role=default_role)
\ No newline at end of file
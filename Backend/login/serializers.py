@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from .models import UserProfile
+from django.db import transaction
+from task.services import release_worker_tasks, reassign_released_tasks
+from .models import UserProfile, UserDeletion
 
 class LoginSerializer(serializers.Serializer):
     username = serializers.CharField()
@@ -53,13 +55,14 @@ class UserCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         role = validated_data.pop('role', 'adiestrado')
         password = validated_data.pop('password')
-        user = User.objects.create(**validated_data)
+        user = User(**validated_data)
         user.set_password(password)
         user.save()
         
-        # Actualizar el perfil con el rol
-        user.userprofile.role = role
-        user.userprofile.save()
+        # Actualizar el perfil con el rol (creado por la señal post_save)
+        if user.userprofile.role != role:
+            user.userprofile.role = role
+            user.userprofile.save(update_fields=['role', 'updated_at'])
         
         return user
 
@@ -77,19 +80,54 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         is_active_worker = validated_data.pop('is_active_worker', None)
         max_tasks = validated_data.pop('max_tasks', None)
         
-        # Actualizar campos básicos del usuario
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+        with transaction.atomic():
+            # Actualizar campos básicos del usuario
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            if validated_data:
+                instance.save(update_fields=list(validated_data))
+            
+            profile = instance.userprofile
+            keep = self._tasks_to_keep(profile, role, is_active_worker, max_tasks)
+            self._update_profile(profile, role, is_active_worker, max_tasks)
+            
+            # Repartir las tareas abiertas que el trabajador ya no puede atender
+            self.rebalance = None
+            if keep is not None:
+                self.rebalance = reassign_released_tasks(release_worker_tasks(instance, keep))
         
+        return instance
+    
+    def _tasks_to_keep(self, profile, role, is_active_worker, max_tasks):
+        """Tareas abiertas que conserva el trabajador tras el cambio, o None si no cambia nada"""
+        if is_active_worker is False and profile.is_active_worker:
+            return 0
+        if role is not None and role != profile.role:
+            # Sus tareas abiertas ya no corresponden a su nivel
+            return 0
+        if max_tasks is not None and max_tasks < profile.max_tasks:
+            return max_tasks
+        return None
+    
+    def _update_profile(self, profile, role, is_active_worker, max_tasks):
         # Actualizar perfil si se proporciona
-        profile = instance.userprofile
+        profile_fields = []
         if role is not None:
             profile.role = role
+            profile_fields.append('role')
         if is_active_worker is not None:
             profile.is_active_worker = is_active_worker
+            profile_fields.append('is_active_worker')
         if max_tasks is not None:
             profile.max_tasks = max_tasks
-        profile.save()
-        
-        return instance
\ No newline at end of file
+            profile_fields.append('max_tasks')
+        if profile_fields:
+            profile.save(update_fields=profile_fields + ['updated_at'])
+
+class UserDeletionSerializer(serializers.ModelSerializer):
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = UserDeletion
+        fields = ('id', 'user_id', 'username', 'status', 'total_rows', 'processed', 'progress',
+                  'created_at', 'finished_at')
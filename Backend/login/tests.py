@@ -1,3 +1,261 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from jobs.queue import claim_jobs, run_job
+from login.models import UserDeletion, UserProfile
+from task.models import StaleCounter, Task, TaskAssignment, TaskReport
+from task.services import ACTIVE_ASSIGNMENT_STATUSES, assign_task_to_user, complete_task, review_report
+from task.tests import drain_jobs, make_user
 
-# Create your tests here.
+
+@override_settings(REQUEST_THROTTLING=False)
+class RebalanceTests(TestCase):
+    """Tareas abiertas de un trabajador que deja de poder atenderlas.
+
+    ``worker`` tiene tres tareas abiertas; ``other``, del mismo nivel, está
+    libre con capacidad para dos.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user('admin', 'admin')
+        self.worker = make_user('worker', 'regular')
+        self.other = make_user('other', 'regular')
+        UserProfile.objects.filter(user=self.other).update(max_tasks=2)
+        self.tasks = []
+        for number in range(3):
+            task = Task.objects.create(
+                title=f'Tarea {number}', description='Descripción', difficulty='regular', created_by=self.admin
+            )
+            assign_task_to_user(task, self.worker, self.admin)
+            self.tasks.append(task)
+        drain_jobs()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def update_worker(self, data):
+        response = self.client.put(f'/api/auth/users/update/{self.worker.id}/', data, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['rebalance']
+
+    def open_task_ids(self, user):
+        return set(TaskAssignment.objects.filter(
+            assigned_to=user, status__in=ACTIVE_ASSIGNMENT_STATUSES
+        ).values_list('task_id', flat=True))
+
+    def assertConsistent(self):
+        # Cada tarea asignada tiene una asignación abierta de su trabajador,
+        # y tasks_assigned cuenta todas las asignaciones recibidas
+        for task in Task.objects.all():
+            if task.status == 'pending':
+                self.assertIsNone(task.assigned_to_id)
+                self.assertFalse(task.assignments.filter(status__in=ACTIVE_ASSIGNMENT_STATUSES).exists())
+            else:
+                self.assertEqual(
+                    list(task.assignments.filter(status__in=ACTIVE_ASSIGNMENT_STATUSES)
+                         .values_list('assigned_to_id', flat=True)),
+                    [task.assigned_to_id]
+                )
+        for profile in UserProfile.objects.all():
+            self.assertEqual(
+                profile.tasks_assigned, TaskAssignment.objects.filter(assigned_to_id=profile.user_id).count()
+            )
+            self.assertLessEqual(len(self.open_task_ids(profile.user_id)), profile.max_tasks)
+
+    def test_shrunk_worker_keeps_oldest_tasks(self):
+        rebalance = self.update_worker({'max_tasks': 1})
+
+        self.assertEqual(rebalance['released'], 2)
+        self.assertFalse(rebalance['queued'])
+        self.assertEqual(self.open_task_ids(self.worker), {self.tasks[0].id})
+        self.assertEqual(self.open_task_ids(self.other), {self.tasks[1].id, self.tasks[2].id})
+        self.assertConsistent()
+
+    def test_released_tasks_respect_recipient_capacity(self):
+        UserProfile.objects.filter(user=self.other).update(max_tasks=1)
+        rebalance = self.update_worker({'is_active_worker': False})
+
+        self.assertEqual(rebalance['released'], 3)
+        self.assertEqual(len(rebalance['moved']), 1)
+        self.assertEqual(len(rebalance['unassigned']), 2)
+        self.assertEqual(self.open_task_ids(self.worker), set())
+        self.assertEqual(Task.objects.filter(status='pending').count(), 2)
+        self.assertConsistent()
+
+    def test_deactivated_worker_releases_everything(self):
+        UserProfile.objects.filter(user=self.other).update(max_tasks=5)
+        rebalance = self.update_worker({'is_active_worker': False})
+
+        self.assertEqual(rebalance['released'], 3)
+        self.assertEqual(self.open_task_ids(self.worker), set())
+        self.assertEqual(self.open_task_ids(self.other), {task.id for task in self.tasks})
+        self.assertConsistent()
+
+    def test_deleted_worker_tasks_are_reassigned(self):
+        response = self.client.delete(f'/api/auth/users/delete/{self.worker.id}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['rebalance']['released'], 3)
+        self.assertFalse(User.objects.filter(pk=self.worker.id).exists())
+        self.assertEqual(self.open_task_ids(self.other), {self.tasks[0].id, self.tasks[1].id})
+        self.assertEqual(Task.objects.get(pk=self.tasks[2].id).status, 'pending')
+        self.assertConsistent()
+
+    @override_settings(REBALANCE_SYNC_LIMIT=1)
+    def test_many_released_tasks_are_rebalanced_in_background(self):
+        rebalance = self.update_worker({'max_tasks': 1})
+
+        self.assertTrue(rebalance['queued'])
+        self.assertEqual(rebalance['moved'], [])
+        self.assertEqual(Task.objects.filter(status='pending').count(), 2)
+
+        drain_jobs()
+        self.assertEqual(self.open_task_ids(self.worker), {self.tasks[0].id})
+        self.assertEqual(self.open_task_ids(self.other), {self.tasks[1].id, self.tasks[2].id})
+        self.assertConsistent()
+
+
+@override_settings(REQUEST_THROTTLING=False, USER_DELETE_SYNC_LIMIT=0)
+class UserPurgeTests(TestCase):
+    """Borrado en segundo plano de un usuario: por lotes y reanudable"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user('admin', 'admin')
+        self.doomed = make_user('doomed', 'admin')
+        self.worker = make_user('worker', 'regular')
+
+        # Una tarea suya, con asignación y reporte, que desaparece con él
+        self.own_task = self.create_task(self.doomed)
+        self.own_report = self.complete(self.own_task, self.doomed)
+        # Una tarea de otro que revisó: se conserva sin su nombre
+        self.other_task = self.create_task(self.admin)
+        self.reviewed = review_report(self.complete(self.other_task, self.admin), self.doomed, 'approve')
+        drain_jobs()
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_task(self, creator):
+        return Task.objects.create(
+            title=f'De {creator.username}', description='Descripción', difficulty='regular', created_by=creator
+        )
+
+    def complete(self, task, assigned_by):
+        assign_task_to_user(task, self.worker, assigned_by)
+        assignment = TaskAssignment.objects.get(task=task)
+        return complete_task(task, assignment, self.worker, {'report_text': 'Hecho', 'hours_worked': 2})
+
+    def delete(self):
+        response = self.client.delete(f'/api/auth/users/delete/{self.doomed.id}/')
+        self.assertEqual(response.status_code, 202)
+        return UserDeletion.objects.get(pk=response.json()['deletion']['id'])
+
+    def assertPurged(self, deletion):
+        deletion.refresh_from_db()
+        self.assertEqual(deletion.status, 'done')
+        self.assertEqual(deletion.processed['users'], 1)
+        self.assertFalse(User.objects.filter(pk=self.doomed.id).exists())
+        self.assertFalse(Task.all_objects.filter(pk=self.own_task.id).exists())
+        self.assertFalse(TaskAssignment.objects.filter(task_id=self.own_task.id).exists())
+        self.assertFalse(TaskReport.objects.filter(pk=self.own_report.id).exists())
+
+        # Las referencias SET_NULL quedan a NULL en lugar de borrar la fila
+        report = TaskReport.objects.select_related('task_assignment').get(pk=self.reviewed.id)
+        self.assertIsNone(report.reviewed_by_id)
+        self.assertIsNone(report.task_assignment.approved_by_id)
+        self.assertEqual(report.task_assignment.task_id, self.other_task.id)
+        # El trabajador perdió una asignación: su contador queda por revisar
+        self.assertTrue(StaleCounter.objects.filter(user=self.worker).exists())
+
+    def test_purge_deletes_graph_and_nulls_references(self):
+        deletion = self.delete()
+        self.assertFalse(User.objects.get(pk=self.doomed.id).is_active)
+
+        drain_jobs()
+        self.assertPurged(deletion)
+
+    @override_settings(USER_PURGE_BATCHES_PER_JOB=1)
+    def test_purge_resumes_after_partial_run(self):
+        deletion = self.delete()
+
+        # Una ejecución: un lote confirmado y el trabajo de nuevo en cola
+        job, = claim_jobs('tests', 1)
+        self.assertTrue(run_job(job))
+        deletion.refresh_from_db()
+        self.assertEqual(deletion.status, 'running')
+        self.assertEqual(deletion.processed, {'tasks': 1, 'assignments': 1, 'reports': 1, 'notifications': 2})
+        self.assertFalse(Task.all_objects.filter(pk=self.own_task.id).exists())
+        self.assertTrue(User.objects.filter(pk=self.doomed.id).exists())
+
+        drain_jobs()
+        self.assertPurged(deletion)
+
+
+@override_settings(REQUEST_THROTTLING=False)
+class UserListTests(TestCase):
+    """Listado de usuarios filtrado y paginado en el servidor"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user('admin', 'admin')
+        # Sin hueco: una tarea abierta y capacidad para una
+        self.full = make_user('full', 'regular')
+        UserProfile.objects.filter(user=self.full).update(max_tasks=1)
+        task = Task.objects.create(title='Tarea', description='Descripción', difficulty='regular', created_by=self.admin)
+        assign_task_to_user(task, self.full, self.admin)
+        self.free = make_user('free', 'regular')
+        self.idle = make_user('idle', 'regular')
+        UserProfile.objects.filter(user=self.idle).update(is_active_worker=False)
+        self.trainee = make_user('trainee', 'adiestrado')
+        drain_jobs()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def list_users(self, query=''):
+        response = self.client.get(f'/api/auth/users/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def ids(self, query=''):
+        return [user['id'] for user in self.list_users(query)['results']]
+
+    def test_filters(self):
+        self.assertEqual(self.ids('?role=regular'), [self.full.id, self.free.id, self.idle.id])
+        self.assertEqual(self.ids('?role=regular&available=true'), [self.free.id])
+        self.assertEqual(self.ids('?available=false'), [self.full.id, self.idle.id])
+        self.assertEqual(self.client.get('/api/auth/users/?role=jefe').status_code, 400)
+        self.assertEqual(self.client.get('/api/auth/users/?available=si').status_code, 400)
+
+    def test_pages(self):
+        first = self.list_users('?page_size=2')
+        last = self.list_users('?page_size=2&page=3')
+
+        self.assertEqual(
+            {key: first[key] for key in ('page', 'page_size', 'has_next')},
+            {'page': 1, 'page_size': 2, 'has_next': True}
+        )
+        self.assertEqual([user['id'] for user in first['results']], [self.admin.id, self.full.id])
+        self.assertFalse(last['has_next'])
+        self.assertEqual([user['id'] for user in last['results']], [self.trainee.id])
+        self.assertEqual(self.list_users('?page_size=1000')['page_size'], 200)
+
+    def test_open_tasks_are_counted_in_the_list_query(self):
+        with CaptureQueriesContext(connection) as small:
+            self.list_users('?page_size=1')
+        with CaptureQueriesContext(connection) as large:
+            users = self.list_users()['results']
+
+        # Una sola consulta de usuarios, con el recuento de tareas abiertas, sea
+        # cual sea el tamaño de la página
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        listed = [query['sql'] for query in large.captured_queries if 'FROM "auth_user"' in query['sql']]
+        self.assertEqual(len(listed), 1)
+        self.assertIn('task_taskassignment', listed[0])
+        profiles = {user['id']: user['profile'] for user in users}
+        self.assertEqual(profiles[self.full.id]['current_task_count'], 1)
+        self.assertFalse(profiles[self.full.id]['can_accept_more_tasks'])
+        self.assertTrue(profiles[self.free.id]['can_accept_more_tasks'])
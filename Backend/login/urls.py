@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.urls import path
-from .views import LoginView, UserListView, CreateUserView, CurrentUserView, UpdateUserView, DeleteUserView
+from .views import (
+    LoginView, UserListView, CreateUserView, CurrentUserView, UpdateUserView, DeleteUserView,
+    UserDeletionView, AsyncCurrentUserView
+)
 
 urlpatterns = [
     path('login/', LoginView.as_view(), name='login'),
@@ -7,5 +11,6 @@ urlpatterns = [
     path('users/create/', CreateUserView.as_view(), name='user-create'),
     path('users/update/<int:user_id>/', UpdateUserView.as_view(), name='user-update'),
     path('users/delete/<int:user_id>/', DeleteUserView.as_view(), name='user-delete'),
-    path('me/', CurrentUserView.as_view(), name='current-user'),
+    path('users/deletions/<int:deletion_id>/', UserDeletionView.as_view(), name='user-deletion-progress'),
+    path('me/', (AsyncCurrentUserView if settings.ASYNC_READ_VIEWS else CurrentUserView).as_view(), name='current-user'),
 ]
\ No newline at end of file
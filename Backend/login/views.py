@@ -1,13 +1,29 @@
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
 from django.contrib.auth.models import User
-from .serializers import LoginSerializer, UserSerializer, UserCreateSerializer, UserUpdateSerializer
-from .models import UserProfile
+from django.db import transaction
+from django.db.models import F, OuterRef, Q
+from django_crud_api.async_views import AsyncAPIView
+from django_crud_api.pagination import paginate
+from django_crud_api.queries import count_subquery
+from django_crud_api.routers import ReplicaReadMixin
+from jobs.queue import enqueue
+from task.deletion import user_graph_size
+from task.models import TaskAssignment
+from task.services import ACTIVE_ASSIGNMENT_STATUSES, release_worker_tasks, reassign_released_tasks
+from .serializers import (
+    LoginSerializer, UserSerializer, UserCreateSerializer, UserUpdateSerializer, UserDeletionSerializer
+)
+from .models import UserProfile, UserDeletion
 
 class LoginView(APIView):
+    cost_class = 'standard'
+
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -27,7 +43,20 @@ class LoginView(APIView):
             'user': user_data
         }, status=status.HTTP_200_OK)
 
-class UserListView(APIView):
+USER_PAGE_SIZE = 50
+USER_MAX_PAGE_SIZE = 200
+
+def user_list():
+    """Usuarios con su perfil y el recuento de asignaciones abiertas en una consulta"""
+    return User.objects.select_related('userprofile').annotate(
+        open_task_count=count_subquery(TaskAssignment.objects.filter(
+            assigned_to=OuterRef('pk'),
+            status__in=ACTIVE_ASSIGNMENT_STATUSES
+        ))
+    ).order_by('id')
+
+class UserListView(ReplicaReadMixin, APIView):
+    cost_class = 'standard'
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -36,11 +65,32 @@ class UserListView(APIView):
         if not (request.user.is_superuser or user_profile.role in ['superuser', 'admin']):
             return Response({'error': 'No tienes permisos para realizar esta acción'}, status=status.HTTP_403_FORBIDDEN)
         
-        users = User.objects.all()
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        users = user_list()
+        role = request.GET.get('role')
+        if role:
+            if role not in dict(UserProfile.ROLE_CHOICES):
+                return Response({'error': 'Rol no válido'}, status=status.HTTP_400_BAD_REQUEST)
+            users = users.filter(userprofile__role=role)
+        available = request.GET.get('available')
+        if available:
+            if available not in ('true', 'false'):
+                return Response(
+                    {'error': 'Disponibilidad no válida. Use "true" o "false"'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # Lo mismo que can_accept_more_tasks, calculado en la consulta
+            can_accept = Q(userprofile__is_active_worker=True, open_task_count__lt=F('userprofile__max_tasks'))
+            users = users.filter(can_accept if available == 'true' else ~can_accept)
+        
+        users, page = paginate(users, request, USER_PAGE_SIZE, USER_MAX_PAGE_SIZE)
+        for user in users:
+            # current_task_count y can_accept_more_tasks leen el recuento ya hecho
+            if hasattr(user, 'userprofile'):
+                user.userprofile.open_task_count = user.open_task_count
+        return Response({**page, 'results': UserSerializer(users, many=True).data})
 
 class CreateUserView(APIView):
+    cost_class = 'standard'
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
@@ -56,6 +106,7 @@ class CreateUserView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class UpdateUserView(APIView):
+    cost_class = 'standard'
     permission_classes = [IsAuthenticated]
 
     def put(self, request, user_id):
@@ -72,10 +123,14 @@ class UpdateUserView(APIView):
         serializer = UserUpdateSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            return Response(UserSerializer(user).data, status=status.HTTP_200_OK)
+            data = UserSerializer(user).data
+            if serializer.rebalance is not None:
+                data['rebalance'] = serializer.rebalance
+            return Response(data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class DeleteUserView(APIView):
+    cost_class = 'expensive'
     permission_classes = [IsAuthenticated]
 
     def delete(self, request, user_id):
@@ -93,10 +148,67 @@ class DeleteUserView(APIView):
         if user == request.user:
             return Response({'error': 'No puedes eliminar tu propio usuario'}, status=status.HTTP_400_BAD_REQUEST)
 
-        user.delete()
-        return Response({'message': 'Usuario eliminado correctamente'}, status=status.HTTP_204_NO_CONTENT)
+        # Ya hay un borrado en curso para este usuario
+        deletion = UserDeletion.objects.filter(user_id=user.id).exclude(status='done').first()
+        if deletion:
+            return Response(
+                {'message': 'El usuario ya se está eliminando', 'deletion': UserDeletionSerializer(deletion).data},
+                status=status.HTTP_202_ACCEPTED
+            )
+
+        # Las asignaciones abiertas se borrarían en cascada dejando sus tareas
+        # huérfanas; se liberan antes y se reparten entre el resto. Con poco
+        # historial basta el borrado en cascada de Django
+        size = user_graph_size(user)
+        if size <= settings.USER_DELETE_SYNC_LIMIT:
+            with transaction.atomic():
+                task_ids = release_worker_tasks(user)
+                user.delete()
+                rebalance = reassign_released_tasks(task_ids)
+            return Response(
+                {'message': 'Usuario eliminado correctamente', 'rebalance': rebalance},
+                status=status.HTTP_200_OK
+            )
+
+        # Historial grande: se desactiva ya y se borra por lotes en segundo plano
+        with transaction.atomic():
+            task_ids = release_worker_tasks(user)
+            user.is_active = False
+            user.save(update_fields=['is_active'])
+            UserProfile.objects.filter(user=user).update(is_active_worker=False)
+            deletion = UserDeletion.objects.create(
+                user_id=user.id, username=user.username, requested_by=request.user, total_rows=size
+            )
+            enqueue('login.purge_user', {'deletion_id': deletion.id})
+            rebalance = reassign_released_tasks(task_ids)
+        return Response(
+            {
+                'message': 'El usuario se está eliminando en segundo plano',
+                'rebalance': rebalance,
+                'deletion': UserDeletionSerializer(deletion).data,
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+class UserDeletionView(APIView):
+    cost_class = 'cheap'
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, deletion_id):
+        # Progreso de un borrado en segundo plano
+        user_profile = request.user.userprofile
+        if not (request.user.is_superuser or user_profile.role in ['superuser', 'admin']):
+            return Response({'error': 'No tienes permisos para realizar esta acción'}, status=status.HTTP_403_FORBIDDEN)
+        
+        try:
+            deletion = UserDeletion.objects.get(id=deletion_id)
+        except UserDeletion.DoesNotExist:
+            return Response({'error': 'Borrado no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response(UserDeletionSerializer(deletion).data)
 
 class CurrentUserView(APIView):
+    cost_class = 'cheap'
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -105,4 +217,17 @@ class CurrentUserView(APIView):
             UserProfile.objects.create(user=request.user, role='user')
             
         serializer = UserSerializer(request.user)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+class AsyncCurrentUserView(AsyncAPIView):
+    cost_class = 'cheap'
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        # Asegurarse de que el usuario tenga perfil
+        profile, _ = await UserProfile.objects.aget_or_create(user=request.user, defaults={'role': 'user'})
+        request.user.userprofile = profile
+        
+        # La carga actual del perfil se calcula con consultas síncronas
+        data = await sync_to_async(lambda: UserSerializer(request.user).data)()
+        return Response(data)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+    verbose_name = 'Monitorización'
+
+    def ready(self):
+        # Registrar la comprobación de la caché que usa la limitación de peticiones
+        from django_crud_api import throttling  # noqa: F401
@@ -0,0 +1,49 @@
+"""Presupuesto máximo de consultas SQL por endpoint (nombre de URL).
+
+Cada valor es el número de consultas de la ruta con datos como los de
+``task.seeding`` (los de ``manage.py bench_endpoints``): con todas sus
+secciones llenas, no con las que el escenario de ``manage.py
+check_query_budgets`` (12 trabajadores, 12 tareas, 6 reportes y 36
+notificaciones) deja vacías. Estadísticas, por ejemplo, carga los usuarios
+de las clasificaciones con una consulta que no se hace si están vacías.
+Los POST llevan Idempotency-Key como los envía el frontend: reservar la
+clave y guardar la respuesta suman 7 consultas a las rutas con
+``@idempotent``. Al añadir una ruta en task/urls.py, task/dashboard_urls.py
+o login/urls.py hay que declarar aquí su presupuesto o el comando fallará.
+"""
+
+QUERY_BUDGETS = {
+    # login/urls.py
+    'login': 4,
+    'user-list': 3,
+    'user-create': 8,
+    'user-update': 21,
+    'user-delete': 48,
+    'user-deletion-progress': 3,
+    'current-user': 4,
+
+    # task/urls.py
+    'task-list': 4,
+    'task-create': 14,
+    'task-detail': 4,
+    'task-update': 12,
+    'task-delete': 7,
+    'task-reject': 19,
+    'task-complete': 18,
+    'report-list': 5,
+    'report-detail': 3,
+    'report-review': 18,
+    'report-bulk-review': 12,
+    'archived-task-list': 5,
+    'archived-task-detail': 4,
+    'notification-list': 3,
+    'statistics': 7,
+    'workload': 3,
+
+    # task/dashboard_urls.py
+    'dashboard': 5,
+}
+
+
+def get_budget(url_name):
+    return QUERY_BUDGETS.get(url_name)
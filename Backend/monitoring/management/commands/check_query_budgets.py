@@ -0,0 +1,193 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from monitoring.budgets import get_budget
+from monitoring.testing import budgeted_url_names, missing_budgets
+from monitoring.middleware import QueryRecorder
+
+PASSWORD = 'budget-pass'
+
+
+def build_fixture():
+    """Datos mínimos con varias filas por tabla, para detectar consultas N+1"""
+    from datetime import timedelta
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from login.models import UserDeletion
+    from task.archiving import archive_batch
+    from task.models import Task, TaskAssignment, TaskReport, Notification
+
+    admin = User.objects.create_user('budget-admin', password=PASSWORD, is_staff=True)
+    workers = []
+    for role in ('adiestrado', 'regular', 'especialista'):
+        for i in range(4):
+            user = User.objects.create_user(f'budget-{role}-{i}', password=PASSWORD)
+            user.userprofile.role = role
+            user.userprofile.save()
+            workers.append(user)
+
+    assignments = []
+    for i, worker in enumerate(workers):
+        task = Task.objects.create(
+            title=f'Tarea {i}', description='Descripción', difficulty=worker.userprofile.role,
+            status='assigned', created_by=admin, assigned_to=worker
+        )
+        assignments.append(TaskAssignment.objects.create(
+            task=task, assigned_to=worker, assigned_by=admin, status='assigned'
+        ))
+        for n in range(3):
+            Notification.objects.create(
+                user=worker, notification_type='task_assigned', title='Nueva Tarea Asignada',
+                message=f'Notificación {n}', related_task=task
+            )
+
+    # La mitad de las tareas completadas y con reporte pendiente de revisión
+    reports = []
+    for assignment in assignments[::2]:
+        assignment.status = 'completed'
+        assignment.save()
+        assignment.task.status = 'completed'
+        assignment.task.save()
+        reports.append(TaskReport.objects.create(
+            task_assignment=assignment, report_text='Reporte', hours_worked=2
+        ))
+
+    # Tres tareas aprobadas ya archivadas, con su asignación y reporte
+    archived = []
+    for worker in workers[:3]:
+        task = Task.objects.create(
+            title='Archivada', description='Descripción', difficulty=worker.userprofile.role,
+            status='completed', created_by=admin, assigned_to=worker, completed_at=timezone.now()
+        )
+        assignment = TaskAssignment.objects.create(
+            task=task, assigned_to=worker, assigned_by=admin, status='approved', approved_by=admin
+        )
+        TaskReport.objects.create(
+            task_assignment=assignment, report_text='Reporte', hours_worked=1,
+            status='approved', reviewed_by=admin
+        )
+        archived.append(task.id)
+    archive_batch(archived, cutoff=timezone.now() + timedelta(days=1))
+
+    deletion = UserDeletion.objects.create(
+        user_id=workers[0].id, username=workers[0].username, requested_by=admin, total_rows=10
+    )
+
+    return {
+        'admin': admin,
+        'archived_task_id': archived[0],
+        'deletion': deletion,
+        'workers': workers,
+        'open_assignment': assignments[1],
+        'report': reports[0],
+        'reports': reports,
+        'task': assignments[0].task,
+    }
+
+
+def scenarios(fx):
+    """(usuario, método, ruta, datos) de una petición representativa por ruta"""
+    admin = fx['admin']
+    open_assignment = fx['open_assignment']
+    worker = open_assignment.assigned_to
+    task_id = open_assignment.task_id
+    return {
+        'login': (None, 'post', '/api/auth/login/', {'username': admin.username, 'password': PASSWORD}),
+        'user-list': (admin, 'get', '/api/auth/users/', None),
+        'user-create': (admin, 'post', '/api/auth/users/create/', {
+            'username': 'budget-new', 'password': PASSWORD, 'role': 'regular'
+        }),
+        # Desactivar libera su tarea abierta y la reparte entre los de su nivel
+        'user-update': (admin, 'put', f'/api/auth/users/update/{worker.id}/', {'is_active_worker': False}),
+        'user-delete': (admin, 'delete', f'/api/auth/users/delete/{fx["workers"][-1].id}/', None),
+        'user-deletion-progress': (admin, 'get', f'/api/auth/users/deletions/{fx["deletion"].id}/', None),
+        'current-user': (worker, 'get', '/api/auth/me/', None),
+        'task-list': (admin, 'get', '/api/tasks/', None),
+        'task-create': (admin, 'post', '/api/tasks/create/', {
+            'title': 'Nueva', 'description': 'Descripción', 'difficulty': 'regular'
+        }),
+        'task-detail': (admin, 'get', f'/api/tasks/{fx["task"].id}/', None),
+        'task-update': (admin, 'put', f'/api/tasks/{task_id}/update/', {'title': 'Editada'}),
+        'task-delete': (admin, 'delete', f'/api/tasks/{fx["task"].id}/delete/', None),
+        'task-reject': (worker, 'post', f'/api/tasks/{task_id}/reject/', {'reason': 'Sin tiempo'}),
+        'task-complete': (worker, 'post', f'/api/tasks/{task_id}/complete/', {
+            'report_text': 'Hecho', 'hours_worked': 3
+        }),
+        'report-list': (admin, 'get', '/api/tasks/reports/', None),
+        'report-detail': (admin, 'get', f'/api/tasks/reports/{fx["report"].id}/', None),
+        'report-review': (admin, 'post', f'/api/tasks/reports/{fx["report"].id}/review/', {
+            'action': 'approve'
+        }),
+        'report-bulk-review': (admin, 'post', '/api/tasks/reports/bulk-review/', {'reviews': [
+            {'report_id': report.id, 'action': action}
+            for report, action in zip(fx['reports'], ('approve', 'approve', 'reject', 'needs_correction'))
+        ]}),
+        'archived-task-list': (admin, 'get', '/api/tasks/archive/', None),
+        'archived-task-detail': (admin, 'get', f'/api/tasks/archive/{fx["archived_task_id"]}/', None),
+        'notification-list': (worker, 'get', '/api/tasks/notifications/', None),
+        'statistics': (admin, 'get', '/api/tasks/statistics/', None),
+        'workload': (admin, 'get', '/api/tasks/workload/', None),
+        'dashboard': (admin, 'get', '/api/dashboard/', None),
+    }
+
+
+def request_headers(url_name, method):
+    """Los POST llevan Idempotency-Key, como los envía el frontend"""
+    return {'HTTP_IDEMPOTENCY_KEY': f'budget-{url_name}'} if method == 'post' else {}
+
+
+class Command(BaseCommand):
+    help = 'Comprueba en una base de datos de prueba que cada endpoint respeta su presupuesto de consultas'
+
+    def handle(self, *args, **options):
+        missing = missing_budgets()
+        if missing:
+            raise CommandError(f'Rutas sin presupuesto de consultas: {", ".join(missing)}')
+
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            failures = self.check_budgets()
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        if failures:
+            raise CommandError(f'{failures} endpoint(s) superan su presupuesto de consultas')
+        self.stdout.write(self.style.SUCCESS('Todos los endpoints respetan su presupuesto'))
+
+    def check_budgets(self):
+        fx = build_fixture()
+        requests = scenarios(fx)
+        failures = 0
+
+        for url_name in budgeted_url_names():
+            if url_name not in requests:
+                self.stderr.write(f'{url_name:20s} sin escenario definido')
+                failures += 1
+                continue
+
+            user, method, path, data = requests[url_name]
+            client = APIClient()
+            if user is not None:
+                token = RefreshToken.for_user(user).access_token
+                client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+            recorder = QueryRecorder()
+            # Cada escenario se deshace para no afectar a los siguientes
+            with transaction.atomic():
+                with recorder.record():
+                    response = getattr(client, method)(path, data, format='json', **request_headers(url_name, method))
+                transaction.set_rollback(True)
+
+            budget = get_budget(url_name)
+            ok = response.status_code < 400 and recorder.count <= budget
+            failures += not ok
+            line = f'{url_name:20s} {response.status_code} {recorder.count:4d} / {budget} consultas'
+            self.stdout.write(self.style.SUCCESS(line) if ok else self.style.ERROR(line))
+
+        return failures
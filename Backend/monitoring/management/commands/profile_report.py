@@ -0,0 +1,45 @@
+import io
+import pstats
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from monitoring.profiling import profiles_dir
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+class Command(BaseCommand):
+    help = 'Agrega los perfiles guardados por ProfilingMiddleware y muestra las N funciones más costosas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url-name', action='append', dest='url_names',
+                            help='Limitar a estos endpoints (se puede repetir)')
+        parser.add_argument('--top', type=int, default=25)
+        parser.add_argument('--sort', choices=SORT_KEYS, default='tottime')
+        parser.add_argument('--dir', help='Directorio de perfiles (por defecto PROFILING_DIR)')
+
+    def handle(self, *args, **options):
+        base = Path(options['dir']) if options['dir'] else profiles_dir()
+        if not base.is_dir():
+            raise CommandError(f'No existe el directorio de perfiles {base}')
+
+        endpoints = sorted(p for p in base.iterdir() if p.is_dir())
+        if options['url_names']:
+            endpoints = [p for p in endpoints if p.name in options['url_names']]
+
+        for endpoint in endpoints:
+            files = sorted(str(p) for p in endpoint.glob('*.prof'))
+            if not files:
+                continue
+
+            output = io.StringIO()
+            stats = pstats.Stats(files[0], stream=output)
+            for path in files[1:]:
+                stats.add(path)
+            stats.strip_dirs().sort_stats(options['sort']).print_stats(options['top'])
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{endpoint.name}: {len(files)} peticiones perfiladas, '
+                f'{stats.total_tt / len(files) * 1000:.1f} ms de media'
+            ))
+            self.stdout.write(output.getvalue())
@@ -0,0 +1,214 @@
+"""Registro de métricas en proceso con exportación en formato de texto Prometheus.
+
+Contadores e histogramas se acumulan en memoria. Con varios procesos (p. ej.
+gunicorn con varios workers) se define ``METRICS_MULTIPROCESS_DB``: cada
+proceso vuelca periódicamente sus incrementos a ese fichero SQLite y el
+endpoint de métricas exporta la suma de todos. Los gauges se calculan en el
+momento de exportar, así que no necesitan agregación.
+"""
+import atexit
+import json
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _sort_key(sample):
+    # Los buckets de un histograma se ordenan por su límite numérico
+    name, labels, _ = sample
+    return name, tuple((key, float(value) if key == 'le' else value) for key, value in labels)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self._last_flush = time.monotonic()
+        self._flush_lock = threading.Lock()
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    # -- Agregación multiproceso -------------------------------------------
+
+    def _db(self):
+        path = getattr(settings, 'METRICS_MULTIPROCESS_DB', None)
+        if not path:
+            return None
+        conn = sqlite3.connect(path, timeout=5)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS metric_samples (
+                name TEXT, labels TEXT, value REAL,
+                PRIMARY KEY (name, labels)
+            )
+        ''')
+        return conn
+
+    def flush(self):
+        """Vuelca los incrementos locales al fichero compartido"""
+        with self._flush_lock:
+            self._last_flush = time.monotonic()
+            conn = self._db()
+            if conn is None:
+                return
+            rows = []
+            for metric in self.metrics:
+                if metric.aggregated:
+                    rows.extend(
+                        (name, json.dumps(labels), value)
+                        for name, labels, value in metric.drain()
+                    )
+            try:
+                with conn:
+                    conn.executemany('''
+                        INSERT INTO metric_samples (name, labels, value) VALUES (?, ?, ?)
+                        ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value
+                    ''', rows)
+            finally:
+                conn.close()
+
+    def flush_due(self):
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+        return time.monotonic() - self._last_flush >= interval
+
+    def maybe_flush(self):
+        if self.flush_due():
+            self.flush()
+
+    def _shared_samples(self):
+        conn = self._db()
+        if conn is None:
+            return None
+        try:
+            samples = {}
+            for name, labels, value in conn.execute('SELECT name, labels, value FROM metric_samples'):
+                samples[(name, tuple(tuple(pair) for pair in json.loads(labels)))] = value
+            return samples
+        finally:
+            conn.close()
+
+    # -- Exportación ---------------------------------------------------------
+
+    def export(self):
+        """Texto en formato de exposición de Prometheus"""
+        self.flush()
+        shared = self._shared_samples()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            if metric.aggregated and shared is not None:
+                samples = sorted((
+                    (name, labels, value) for (name, labels), value in shared.items()
+                    if name[len(metric.name) + 1:] in metric.suffixes
+                    and name.startswith(metric.name + '_')
+                ), key=_sort_key)
+            else:
+                samples = metric.collect()
+            for name, labels, value in samples:
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+# Volcar lo pendiente al terminar el proceso (modo multiproceso)
+atexit.register(REGISTRY.flush)
+
+
+class Metric:
+    type = None
+    aggregated = True
+    suffixes = ()
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _labels(self, labels):
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def _add(self, sample, labels, amount):
+        key = (sample, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            return sorted((
+                (name, labels, value) for (name, labels), value in self._values.items()
+            ), key=_sort_key)
+
+    def drain(self):
+        """Devuelve y reinicia los valores locales (modo multiproceso)"""
+        with self._lock:
+            values, self._values = self._values, {}
+        return [(name, labels, value) for (name, labels), value in values.items()]
+
+
+class Counter(Metric):
+    type = 'counter'
+    suffixes = ('total',)
+
+    def inc(self, amount=1, **labels):
+        self._add(f'{self.name}_total', self._labels(labels), amount)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+    suffixes = ('bucket', 'sum', 'count')
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        labels = self._labels(labels)
+        # Los buckets se guardan ya acumulados, así se pueden sumar entre procesos
+        for bound in self.buckets:
+            if value <= bound:
+                self._add(f'{self.name}_bucket', labels + (('le', _format_value(bound)),), 1)
+        self._add(f'{self.name}_sum', labels, value)
+        self._add(f'{self.name}_count', labels, 1)
+
+
+class Gauge(Metric):
+    """Gauge calculado al exportar mediante una función que devuelve {etiquetas: valor}"""
+
+    type = 'gauge'
+    aggregated = False
+
+    def __init__(self, name, documentation, labelnames=(), function=None, registry=REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.function = function
+
+    def collect(self):
+        if self.function is None:
+            return []
+        return sorted(
+            (self.name, tuple(zip(self.labelnames, key)), value)
+            for key, value in self.function().items()
+        )
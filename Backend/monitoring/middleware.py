@@ -0,0 +1,145 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from .budgets import get_budget
+from .metrics import REGISTRY, Counter, Histogram
+
+logger = logging.getLogger('monitoring.requests')
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Latencia de las peticiones HTTP por nombre de URL',
+    labelnames=('url_name', 'method')
+)
+REQUESTS = Counter(
+    'http_requests', 'Peticiones HTTP por nombre de URL y código de estado',
+    labelnames=('url_name', 'status')
+)
+
+
+class QueryRecorder:
+    """Cuenta y cronometra las consultas SQL ejecutadas en todos los alias"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+    def record(self):
+        """Context manager que instala el recorder en todas las conexiones"""
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+        return stack
+
+
+class QueryTimingMiddleware:
+    """Mide consultas SQL, tiempo de SQL y tiempo de vista por petición.
+
+    Los resultados se exponen en la cabecera ``Server-Timing`` y se registran
+    como una línea JSON en el logger ``monitoring.requests``.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with recorder.record():
+            response = self.get_response(request)
+        self.report(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        # Las conexiones son por hilo: el recorder se instala en el hilo donde
+        # sync_to_async ejecuta las consultas de esta petición
+        stack = await sync_to_async(recorder.record)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self.report(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    def report(self, request, response, recorder, total):
+        db_ms = recorder.duration * 1000
+        total_ms = total * 1000
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.2f};desc="{recorder.count} queries", '
+            f'view;dur={total_ms - db_ms:.2f}, '
+            f'total;dur={total_ms:.2f}'
+        )
+
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.url_name if match else None
+        budget = get_budget(url_name)
+        over_budget = budget is not None and recorder.count > budget
+
+        if getattr(settings, 'REQUEST_METRICS_LOG', False) or over_budget:
+            logger.log(logging.WARNING if over_budget else logging.INFO, json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'url_name': url_name,
+                'status': response.status_code,
+                'queries': recorder.count,
+                'query_budget': budget,
+                'db_ms': round(db_ms, 2),
+                'total_ms': round(total_ms, 2),
+            }))
+
+
+class RequestMetricsMiddleware:
+    """Alimenta el histograma de latencia y el contador de peticiones por URL"""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, time.perf_counter() - start)
+        REGISTRY.maybe_flush()
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, time.perf_counter() - start)
+        # El volcado al fichero compartido escribe en SQLite
+        if REGISTRY.flush_due():
+            await sync_to_async(REGISTRY.maybe_flush, thread_sensitive=False)()
+        return response
+
+    def observe(self, request, response, elapsed):
+        match = getattr(request, 'resolver_match', None)
+        url_name = (match.url_name if match else None) or 'unmatched'
+        REQUEST_LATENCY.observe(elapsed, url_name=url_name, method=request.method)
+        REQUESTS.inc(url_name=url_name, status=response.status_code)
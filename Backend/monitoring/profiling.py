@@ -0,0 +1,182 @@
+"""Perfilado opcional de peticiones con cProfile.
+
+Un administrador lo activa en tiempo de ejecución desde ``/api/profiling/``
+para una fracción de las peticiones, para usuarios concretos o para las
+peticiones que envían la cabecera ``X-Profile`` con el token configurado.
+Cada petición perfilada se guarda como fichero pstats en
+``PROFILING_DIR/<nombre de URL>/`` y los ficheros más antiguos se borran
+cuando el directorio supera ``PROFILING_MAX_BYTES``.
+
+La configuración se guarda en ``PROFILING_DIR/config.json`` para que la
+compartan todos los procesos de la máquina. Cada proceso perfila una
+petición a la vez: desde Python 3.12 cProfile es global al proceso y un
+segundo ``enable()`` lanza ValueError; las que coinciden no se perfilan.
+"""
+import cProfile
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import resolve, Resolver404
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+DEFAULT_CONFIG = {
+    'enabled': False,
+    'sample_rate': 0.0,
+    'user_ids': [],
+    'url_names': [],
+    'header_token': '',
+}
+
+_lock = threading.Lock()
+_cache = {'mtime': None, 'config': DEFAULT_CONFIG}
+# Tomado mientras hay una petición perfilándose en el proceso
+_profiling = threading.Lock()
+
+
+def profiles_dir():
+    return Path(getattr(settings, 'PROFILING_DIR', settings.BASE_DIR / 'profiles'))
+
+
+def _config_path():
+    return profiles_dir() / 'config.json'
+
+
+def get_config():
+    """Configuración vigente; se relee solo si el fichero cambió"""
+    try:
+        mtime = _config_path().stat().st_mtime
+    except FileNotFoundError:
+        return DEFAULT_CONFIG
+    with _lock:
+        if _cache['mtime'] != mtime:
+            with open(_config_path()) as f:
+                _cache['config'] = {**DEFAULT_CONFIG, **json.load(f)}
+            _cache['mtime'] = mtime
+        return _cache['config']
+
+
+def save_config(config):
+    config = {key: config.get(key, default) for key, default in DEFAULT_CONFIG.items()}
+    profiles_dir().mkdir(parents=True, exist_ok=True)
+    tmp = _config_path().with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(config, f)
+    os.replace(tmp, _config_path())
+    return config
+
+
+def _request_user_id(request):
+    """Id del usuario del token JWT, sin consultar la base de datos"""
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not header.startswith('Bearer '):
+        return None
+    try:
+        return AccessToken(header[len('Bearer '):])['user_id']
+    except (TokenError, KeyError):
+        return None
+
+
+def should_profile(request, url_name, config):
+    if not config['enabled']:
+        return False
+    if config['url_names'] and url_name not in config['url_names']:
+        return False
+    token = config['header_token']
+    if token and request.META.get('HTTP_X_PROFILE') == token:
+        return True
+    if config['user_ids'] and str(_request_user_id(request)) in map(str, config['user_ids']):
+        return True
+    return random.random() < config['sample_rate']
+
+
+def _rotate(directory, max_bytes):
+    """Borra los perfiles más antiguos hasta quedar por debajo de ``max_bytes``"""
+    files = []
+    for path in directory.glob('*/*.prof'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            # Otro proceso lo acaba de rotar
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    files.sort()
+
+    total = sum(size for _, size, _ in files)
+    for _, size, path in files:
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+class ProfilingMiddleware:
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def profiled_url_name(self, request):
+        """Nombre de URL si hay que perfilar la petición, o None"""
+        config = get_config()
+        if not config['enabled']:
+            return None
+
+        try:
+            url_name = resolve(request.path_info).url_name or 'unnamed'
+        except Resolver404:
+            return None
+
+        return url_name if should_profile(request, url_name, config) else None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        url_name = self.profiled_url_name(request)
+        if url_name is None or not _profiling.acquire(blocking=False):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+            _profiling.release()
+        return self.save(profiler, url_name, response)
+
+    async def __acall__(self, request):
+        url_name = self.profiled_url_name(request)
+        if url_name is None or not _profiling.acquire(blocking=False):
+            return await self.get_response(request)
+
+        # Bajo ASGI se perfila el hilo del bucle de eventos, que puede
+        # incluir otras peticiones concurrentes; las consultas se ejecutan
+        # en otro hilo y solo aparece la espera
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            response = await self.get_response(request)
+        finally:
+            profiler.disable()
+            _profiling.release()
+        return self.save(profiler, url_name, response)
+
+    def save(self, profiler, url_name, response):
+        directory = profiles_dir() / url_name
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f'{time.time_ns()}-{os.getpid()}-{threading.get_ident()}.prof'
+        profiler.dump_stats(directory / name)
+        _rotate(profiles_dir(), getattr(settings, 'PROFILING_MAX_BYTES', 100 * 1024 * 1024))
+
+        response['X-Profile-File'] = f'{url_name}/{name}'
+        return response
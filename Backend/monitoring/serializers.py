@@ -0,0 +1,8 @@
+from rest_framework import serializers
+
+class ProfilingConfigSerializer(serializers.Serializer):
+    enabled = serializers.BooleanField()
+    sample_rate = serializers.FloatField(min_value=0, max_value=1)
+    user_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=True)
+    url_names = serializers.ListField(child=serializers.CharField(), allow_empty=True)
+    header_token = serializers.CharField(allow_blank=True, max_length=100)
@@ -0,0 +1,53 @@
+"""Ayudas para comprobar presupuestos de consultas en pruebas y en CI.
+
+``monitoring/tests.py`` las usa para que ``manage.py test`` falle si una
+ruta no tiene presupuesto o lo supera.
+"""
+from contextlib import contextmanager
+
+from django.urls import get_resolver, URLPattern, URLResolver
+from .budgets import get_budget
+from .middleware import QueryRecorder
+
+BUDGETED_URLCONFS = ('login.urls', 'task.urls', 'task.dashboard_urls')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def budgeted_url_names():
+    """Nombres de todas las rutas de los urlconfs de BUDGETED_URLCONFS"""
+    names = []
+
+    def walk(patterns, inside):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                module = getattr(pattern.urlconf_name, '__name__', pattern.urlconf_name)
+                walk(pattern.url_patterns, inside or module in BUDGETED_URLCONFS)
+            elif isinstance(pattern, URLPattern) and inside and pattern.name:
+                names.append(pattern.name)
+
+    walk(get_resolver().url_patterns, False)
+    return names
+
+
+def missing_budgets():
+    return [name for name in budgeted_url_names() if get_budget(name) is None]
+
+
+@contextmanager
+def assert_query_budget(url_name):
+    """Falla si el bloque ejecuta más consultas que el presupuesto de ``url_name``"""
+    budget = get_budget(url_name)
+    if budget is None:
+        raise QueryBudgetExceeded(f'La ruta {url_name!r} no tiene presupuesto de consultas declarado')
+
+    recorder = QueryRecorder()
+    with recorder.record():
+        yield recorder
+
+    if recorder.count > budget:
+        raise QueryBudgetExceeded(
+            f'{url_name}: {recorder.count} consultas, presupuesto {budget}'
+        )
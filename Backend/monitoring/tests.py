@@ -0,0 +1,108 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from task.seeding import seed_workload
+from .management.commands.check_query_budgets import build_fixture, request_headers, scenarios
+from . import profiling
+from .testing import assert_query_budget, budgeted_url_names, missing_budgets
+
+
+@override_settings(REQUEST_THROTTLING=False)
+class QueryBudgetTests(TestCase):
+    """Los mismos escenarios que ``manage.py check_query_budgets``, para que ``manage.py test`` falle"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.requests = scenarios(build_fixture())
+
+    def setUp(self):
+        cache.clear()
+
+    def test_every_route_has_a_budget(self):
+        self.assertEqual(missing_budgets(), [])
+
+    def test_routes_respect_their_budget(self):
+        for url_name in budgeted_url_names():
+            with self.subTest(url_name=url_name):
+                self.assertIn(url_name, self.requests, 'Ruta sin escenario en check_query_budgets')
+                user, method, path, data = self.requests[url_name]
+                client = APIClient()
+                if user is not None:
+                    token = RefreshToken.for_user(user).access_token
+                    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+                # Cada escenario se deshace para no afectar a los siguientes
+                with transaction.atomic():
+                    with assert_query_budget(url_name):
+                        response = getattr(client, method)(
+                            path, data, format='json', **request_headers(url_name, method)
+                        )
+                    transaction.set_rollback(True)
+                self.assertLess(response.status_code, 400)
+
+
+@override_settings(REQUEST_THROTTLING=False)
+class SeededBudgetTests(TestCase):
+    """Las rutas de ``manage.py bench_endpoints`` sobre datos de ``task.seeding``.
+
+    Con todas las secciones llenas hacen consultas que el escenario de
+    check_query_budgets no llega a hacer; los presupuestos las incluyen.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_workload(users=30, tasks=300)
+        cls.admin = User.objects.filter(userprofile__role='admin').order_by('id').first()
+        cls.worker = User.objects.filter(userprofile__role='regular').order_by('id').first()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_benchmarked_routes_respect_their_budget(self):
+        requests = {
+            'task-list': (self.admin, '/api/tasks/'),
+            'statistics': (self.admin, '/api/tasks/statistics/'),
+            'report-list': (self.admin, '/api/tasks/reports/'),
+            'notification-list': (self.worker, '/api/tasks/notifications/'),
+        }
+        for url_name, (user, path) in requests.items():
+            with self.subTest(url_name=url_name):
+                client = APIClient()
+                client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+                with assert_query_budget(url_name):
+                    response = client.get(path)
+                self.assertEqual(response.status_code, 200)
+
+
+@override_settings(REQUEST_THROTTLING=False)
+class ProfilingTests(TestCase):
+    """Una petición perfilada a la vez; las que coinciden se sirven sin perfilar"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.enterContext(override_settings(PROFILING_DIR=self.directory))
+        profiling.save_config({'enabled': True, 'header_token': 'perfil'})
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='worker', password='secreto'))
+
+    def get(self):
+        return self.client.get('/api/auth/me/', HTTP_X_PROFILE='perfil')
+
+    def test_profiles_request(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('X-Profile-File', response)
+
+    def test_skips_while_another_request_is_profiled(self):
+        with profiling._profiling:
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-File', response)
+        self.assertIn('X-Profile-File', self.get())
@@ -0,0 +1,54 @@
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from .metrics import REGISTRY
+from .profiling import get_config, save_config
+from .serializers import ProfilingConfigSerializer
+
+class MetricsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user_profile = request.user.userprofile
+        
+        # Solo administradores pueden ver las métricas
+        if user_profile.role not in ['admin', 'superuser']:
+            return Response(
+                {'error': 'No tienes permisos para ver las métricas'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        return HttpResponse(
+            REGISTRY.export(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+class ProfilingConfigView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def check_admin(self, request):
+        user_profile = request.user.userprofile
+        return user_profile.role in ['admin', 'superuser']
+
+    def get(self, request):
+        if not self.check_admin(request):
+            return Response(
+                {'error': 'No tienes permisos para configurar el perfilado'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(get_config())
+
+    def put(self, request):
+        if not self.check_admin(request):
+            return Response(
+                {'error': 'No tienes permisos para configurar el perfilado'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = ProfilingConfigSerializer(data=request.data, partial=True)
+        if serializer.is_valid():
+            config = save_config({**get_config(), **serializer.validated_data})
+            return Response(config)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
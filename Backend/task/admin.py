@@ -1,12 +1,16 @@
 from django.contrib import admin
-from .models import Task, TaskAssignment, TaskReport, Notification
+from .models import Task, TaskAssignment, TaskReport, Notification, ArchivedTask
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
-    list_display = ('title', 'difficulty', 'status', 'created_by', 'assigned_to', 'created_at')
-    list_filter = ('difficulty', 'status', 'created_at')
+    list_display = ('title', 'difficulty', 'status', 'created_by', 'assigned_to', 'created_at', 'is_archived')
+    list_filter = ('difficulty', 'status', 'created_at', 'is_archived')
     search_fields = ('title', 'description')
-    readonly_fields = ('created_at', 'assigned_at', 'completed_at')
+    readonly_fields = ('created_at', 'assigned_at', 'completed_at', 'archived_at')
+    
+    def get_queryset(self, request):
+        # Incluir las tareas eliminadas pendientes de archivar
+        return Task.all_objects.all()
 
 @admin.register(TaskAssignment)
 class TaskAssignmentAdmin(admin.ModelAdmin):
@@ -27,4 +31,17 @@ class NotificationAdmin(admin.ModelAdmin):
     list_display = ('user', 'notification_type', 'title', 'is_read', 'created_at')
     list_filter = ('notification_type', 'is_read', 'created_at')
     search_fields = ('user__username', 'title', 'message')
-    readonly_fields = ('created_at',)
\ No newline at end of file
+    readonly_fields = ('created_at',)
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(admin.ModelAdmin):
+    list_display = ('title', 'difficulty', 'reason', 'assigned_to', 'created_at', 'archived_at')
+    list_filter = ('reason', 'difficulty', 'archived_at')
+    search_fields = ('title', 'description')
+    
+    # El archivo es de solo lectura
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -3,4 +3,9 @@ from django.apps import AppConfig
 class TaskConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task'
-    verbose_name = 'Sistema de Tareas'
\ No newline at end of file
+    verbose_name = 'Sistema de Tareas'
+
+    def ready(self):
+        # Receptores que invalidan la caché de representación y marcan
+        # los contadores que un borrado de usuario deja por revisar
+        from . import counters, rendering  # noqa: F401
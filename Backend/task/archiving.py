@@ -0,0 +1,110 @@
+"""Archivo en frío de las tareas terminadas.
+
+Las tareas aprobadas, canceladas y eliminadas (borrado lógico) se copian con
+sus asignaciones y reportes a las tablas ``Archived*`` y se borran de las
+tablas activas, para que las consultas del día a día no recorran el
+histórico. Se procesa por lotes de ids, cada uno en su propia transacción,
+de modo que una ejecución interrumpida puede reanudarse sin duplicados.
+
+Las notificaciones se conservan; solo pierden el enlace a la tarea.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, Exists, OuterRef, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .deletion import delete_task_batch
+from .models import (
+    Task, TaskAssignment, TaskReport, Notification,
+    ArchivedTask, ArchivedTaskAssignment, ArchivedTaskReport
+)
+
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_AFTER_DAYS = 30
+
+
+def archivable_tasks(cutoff):
+    """Tareas que pueden archivarse, anotadas con el motivo (``archive_reason``).
+
+    Las eliminadas se archivan siempre; las aprobadas y canceladas cuando
+    terminaron antes de ``cutoff``.
+    """
+    approved = TaskAssignment.objects.filter(task=OuterRef('pk'), status='approved')
+    finished_before = Q(finished_at__lt=cutoff)
+    return Task.all_objects.annotate(
+        finished_at=Coalesce('completed_at', 'created_at'),
+        is_approved=Exists(approved),
+    ).filter(
+        Q(is_archived=True) |
+        Q(finished_before, status='cancelled') |
+        Q(finished_before, status='completed', is_approved=True)
+    ).annotate(archive_reason=Case(
+        When(is_archived=True, then=Value('deleted')),
+        When(status='cancelled', then=Value('cancelled')),
+        default=Value('approved'),
+    ))
+
+
+def _copy(model, obj, **extra):
+    """Instancia de ``model`` con los campos que comparte con ``obj``"""
+    values = {
+        field.attname: getattr(obj, field.attname)
+        for field in model._meta.concrete_fields
+        if hasattr(obj, field.attname)
+    }
+    values.update(extra)
+    return model(**values)
+
+
+def archive_batch(task_ids, cutoff, now=None):
+    """Archiva las tareas de ``task_ids`` que sigan siendo archivables.
+
+    Devuelve el número de tareas, asignaciones y reportes movidos.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        # Se vuelve a comprobar dentro de la transacción: la tarea pudo
+        # cambiar desde que se eligió el lote
+        tasks = list(archivable_tasks(cutoff).filter(id__in=task_ids))
+        if not tasks:
+            return {'tasks': 0, 'assignments': 0, 'reports': 0}
+        ids = [task.id for task in tasks]
+        assignments = list(TaskAssignment.objects.filter(task_id__in=ids))
+        reports = list(TaskReport.objects.filter(task_assignment__task_id__in=ids))
+
+        ArchivedTask.objects.bulk_create([
+            _copy(ArchivedTask, task, reason=task.archive_reason, archived_at=now) for task in tasks
+        ])
+        ArchivedTaskAssignment.objects.bulk_create([
+            _copy(ArchivedTaskAssignment, assignment) for assignment in assignments
+        ])
+        ArchivedTaskReport.objects.bulk_create([
+            _copy(ArchivedTaskReport, report) for report in reports
+        ])
+
+        Notification.objects.filter(related_task_id__in=ids).update(related_task=None)
+        delete_task_batch(ids)
+
+    return {'tasks': len(tasks), 'assignments': len(assignments), 'reports': len(reports)}
+
+
+def archive_tasks(older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE, now=None, log=None):
+    """Archiva por lotes todas las tareas archivables; devuelve los totales"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=older_than_days)
+    totals = Counter(tasks=0, assignments=0, reports=0)
+    last_id = 0
+    while True:
+        # Recorrido por id para no volver a examinar lo ya descartado
+        task_ids = list(
+            archivable_tasks(cutoff).filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not task_ids:
+            break
+        last_id = task_ids[-1]
+        totals.update(archive_batch(task_ids, cutoff, now))
+        if log:
+            log(f"{totals['tasks']} tareas archivadas (hasta id {last_id})")
+    return dict(totals)
@@ -0,0 +1,162 @@
+"""Conciliación de los contadores de estadísticas de UserProfile.
+
+``tasks_assigned``, ``tasks_completed`` y ``tasks_rejected`` se incrementan
+al vuelo (algunos desde trabajos en cola), pero nada los corrige cuando se
+borran asignaciones en cascada, p. ej. al eliminar al usuario que creó las
+tareas o que las asignó. Aquí se recalculan de las asignaciones, activas y
+archivadas, en una sola consulta:
+
+- tasks_assigned: todas las asignaciones recibidas
+- tasks_completed: las aprobadas
+- tasks_rejected: las que el trabajador rechazó
+
+Las correcciones se escriben como ``F(campo) + diferencia`` y descontando
+los incrementos aún en cola, así que se puede conciliar con el sistema en
+marcha: lo que cambie entre la lectura y la escritura no se pisa.
+
+El modo incremental solo revisa los usuarios con asignaciones que cambiaron
+desde la última ejecución y los marcados en ``StaleCounter`` por un borrado.
+"""
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, OuterRef, Q
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from django_crud_api.queries import count_subquery
+from jobs.models import Job
+from login.models import UserProfile
+from .models import ArchivedTaskAssignment, CounterReconciliation, StaleCounter, TaskAssignment
+from .services import counter_increments
+
+# Asignaciones que cuenta cada contador
+COUNTED_ASSIGNMENTS = {
+    'tasks_assigned': Q(),
+    'tasks_completed': Q(status='approved'),
+    'tasks_rejected': Q(status='rejected'),
+}
+# Fechas de una asignación que cambian con su estado
+ASSIGNMENT_DATES = ('assigned_at', 'rejected_at', 'completed_at', 'approved_at')
+RECONCILE_BATCH_SIZE = 500
+# Usuarios con más desviación que se guardan en el informe
+DRIFT_SAMPLE_SIZE = 20
+
+
+def expected_counts():
+    """Valor correcto de cada contador, como subconsultas sobre el perfil"""
+    return {
+        f'expected_{field}': sum(
+            count_subquery(model.objects.filter(counted, assigned_to=OuterRef('user_id')))
+            for model in (TaskAssignment, ArchivedTaskAssignment)
+        )
+        for field, counted in COUNTED_ASSIGNMENTS.items()
+    }
+
+
+def pending_increments():
+    """Incrementos en cola que aún no llegaron al perfil: {(user_id, campo): cantidad}"""
+    pending = Counter()
+    for payload in Job.objects.filter(
+        name='task.increment_counter', status__in=['queued', 'running']
+    ).values_list('payload', flat=True):
+        for user_id, amount in counter_increments(payload).items():
+            pending[user_id, payload['field']] += amount
+    return pending
+
+
+def touched_since(since):
+    """Perfiles con asignaciones que cambiaron desde ``since`` o marcados por un borrado"""
+    changed = Q()
+    for date in ASSIGNMENT_DATES:
+        changed |= Q(**{f'{date}__gte': since})
+    return (
+        Q(user_id__in=TaskAssignment.objects.filter(changed).values('assigned_to_id'))
+        | Q(user_id__in=ArchivedTaskAssignment.objects.filter(changed).values('assigned_to_id'))
+        | Q(user_id__in=StaleCounter.objects.values('user_id'))
+    )
+
+
+def last_run():
+    return CounterReconciliation.objects.filter(finished_at__isnull=False).order_by('-started_at').first()
+
+
+def reconcile_counters(incremental=False, dry_run=False):
+    """Recalcula los contadores y corrige los desviados; devuelve la ejecución.
+
+    Sin ejecución anterior el modo incremental revisa todos los perfiles.
+    Con ``dry_run`` solo se informa: ni se corrige ni se guarda la ejecución.
+    """
+    started_at = timezone.now()
+    previous = last_run() if incremental else None
+    run = CounterReconciliation(mode='incremental' if previous else 'full', started_at=started_at)
+
+    profiles = UserProfile.objects.all()
+    if previous:
+        profiles = profiles.filter(touched_since(previous.started_at))
+    pending = pending_increments()
+
+    # Solo vuelven los perfiles desviados (o con incrementos en cola, que se comprueban aquí)
+    drifted = Q(user_id__in={user_id for user_id, _ in pending})
+    for field in COUNTED_ASSIGNMENTS:
+        drifted |= ~Q(**{field: F(f'expected_{field}')})
+    rows = profiles.annotate(**expected_counts()).filter(drifted).values(
+        'id', 'user_id', 'user__username', *COUNTED_ASSIGNMENTS,
+        *(f'expected_{field}' for field in COUNTED_ASSIGNMENTS)
+    )
+
+    totals = {field: {'users': 0, 'net': 0, 'absolute': 0} for field in COUNTED_ASSIGNMENTS}
+    corrections, users = [], []
+    for row in rows:
+        deltas = {
+            field: max(row[f'expected_{field}'] - pending[row['user_id'], field], 0) - row[field]
+            for field in COUNTED_ASSIGNMENTS
+        }
+        if not any(deltas.values()):
+            continue
+        profile = UserProfile(id=row['id'])
+        for field, delta in deltas.items():
+            setattr(profile, field, F(field) + delta)
+            if delta:
+                totals[field]['users'] += 1
+                totals[field]['net'] += delta
+                totals[field]['absolute'] += abs(delta)
+        corrections.append(profile)
+        users.append({
+            'user_id': row['user_id'],
+            'username': row['user__username'],
+            **{field: {'stored': row[field], 'delta': delta} for field, delta in deltas.items() if delta},
+        })
+
+    run.checked = profiles.count()
+    run.corrected = len(corrections)
+    users.sort(key=lambda user: -sum(abs(user[field]['delta']) for field in COUNTED_ASSIGNMENTS if field in user))
+    run.drift = {'fields': totals, 'users': users[:DRIFT_SAMPLE_SIZE]}
+    if dry_run:
+        return run
+
+    with transaction.atomic():
+        UserProfile.objects.bulk_update(corrections, list(COUNTED_ASSIGNMENTS), batch_size=RECONCILE_BATCH_SIZE)
+        # Los marcados durante la ejecución esperan a la siguiente
+        StaleCounter.objects.filter(marked_at__lte=started_at).delete()
+        run.finished_at = timezone.now()
+        run.save()
+    return run
+
+
+def mark_stale_counters(assignments):
+    """Marca a los trabajadores de esas asignaciones, que van a borrarse"""
+    worker_ids = assignments.order_by().values_list('assigned_to_id', flat=True).distinct()
+    StaleCounter.objects.bulk_create(
+        [StaleCounter(user_id=worker_id) for worker_id in worker_ids], ignore_conflicts=True
+    )
+
+
+@receiver(pre_delete, sender=User)
+def mark_workers_of_deleted_user(sender, instance, **kwargs):
+    # Asignaciones que el borrado en cascada de Django quita a otros trabajadores;
+    # purge_batches las marca lote a lote antes de borrarlas
+    mark_stale_counters(TaskAssignment.objects.filter(
+        Q(task__created_by=instance) | Q(assigned_by=instance)
+    ).exclude(assigned_to=instance))
@@ -0,0 +1,7 @@
+from django.conf import settings
+from django.urls import path
+from .views import DashboardView, AsyncDashboardView
+
+urlpatterns = [
+    path('', (AsyncDashboardView if settings.ASYNC_READ_VIEWS else DashboardView).as_view(), name='dashboard'),
+]
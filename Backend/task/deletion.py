@@ -0,0 +1,173 @@
+"""Borrado por lotes de grafos grandes de tareas y usuarios.
+
+``Model.delete()`` deja que el collector de Django cargue en memoria cada
+asignación, reporte y notificación relacionada antes de borrarlas, y lo hace
+todo en una transacción. Para un trabajador con años de historial eso son
+decenas de miles de objetos en una petición.
+
+Aquí los hijos se borran con ``DELETE ... WHERE id IN (...)`` por lotes
+acotados, cada uno en una transacción corta, y las referencias SET_NULL se
+desvinculan con ``UPDATE`` por lotes. Solo al final se llama a ``delete()``
+sobre el usuario, cuando ya no le queda casi nada relacionado (perfil,
+permisos, log del admin). No se envían señales por fila: ningún receptor del
+proyecto escucha el borrado de estos modelos.
+
+Cada lote vuelve a consultar las filas pendientes, así que un borrado
+interrumpido se reanuda sin más que volver a ejecutarlo.
+"""
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import connection, models, transaction
+from django.db.models import Q
+from django_crud_api.queries import count_subquery
+from .models import Task, TaskAssignment, TaskReport, Notification
+from .counters import mark_stale_counters
+from .rendering import forget, forget_user
+
+DELETE_BATCH_SIZE = 1000
+
+
+def _execute(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def delete_where(model, column, values):
+    """DELETE de las filas de ``model`` cuyo ``column`` está en ``values``"""
+    if not values:
+        return 0
+    qn = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(values))
+    return _execute(
+        f'DELETE FROM {qn(model._meta.db_table)} WHERE {qn(column)} IN ({placeholders})', list(values)
+    )
+
+
+def null_where(model, column, ids):
+    """Pone a NULL ``column`` en las filas de ``model`` con esos ids"""
+    if not ids:
+        return 0
+    qn = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    return _execute(
+        f'UPDATE {qn(model._meta.db_table)} SET {qn(column)} = NULL '
+        f'WHERE {qn(model._meta.pk.column)} IN ({placeholders})', list(ids)
+    )
+
+
+def pending_batches(queryset, batch_size=DELETE_BATCH_SIZE):
+    """Lotes de ids del queryset hasta vaciarlo.
+
+    Cada lote debe sacar sus filas del queryset (borrándolas o desvinculándolas);
+    si no, se repetiría indefinidamente.
+    """
+    queryset = queryset.order_by().values_list('pk', flat=True)
+    while True:
+        ids = list(queryset[:batch_size])
+        if not ids:
+            return
+        yield ids
+
+
+def delete_task_batch(task_ids):
+    """Borra un lote de tareas con sus asignaciones, reportes y notificaciones"""
+    with transaction.atomic():
+        assignment_ids = list(TaskAssignment.objects.filter(task_id__in=task_ids).values_list('id', flat=True))
+        forget('report', TaskReport.objects.filter(task_assignment_id__in=assignment_ids).values('id'))
+        return Counter(
+            reports=delete_where(TaskReport, 'task_assignment_id', assignment_ids),
+            assignments=delete_where(TaskAssignment, 'id', assignment_ids),
+            notifications=delete_where(Notification, 'related_task_id', task_ids),
+            tasks=delete_where(Task, 'id', task_ids),
+        )
+
+
+def delete_assignment_batch(assignment_ids):
+    with transaction.atomic():
+        forget('report', TaskReport.objects.filter(task_assignment_id__in=assignment_ids).values('id'))
+        return Counter(
+            reports=delete_where(TaskReport, 'task_assignment_id', assignment_ids),
+            assignments=delete_where(TaskAssignment, 'id', assignment_ids),
+        )
+
+
+def _set_null_references(model):
+    """(modelo, campo) de las claves foráneas hacia ``model`` con on_delete=SET_NULL"""
+    # include_hidden: también las de related_name='+' (archivo, borrados de usuarios)
+    return [
+        (rel.related_model, rel.field)
+        for rel in model._meta.get_fields(include_hidden=True)
+        if rel.auto_created and not rel.concrete and getattr(rel, 'on_delete', None) is models.SET_NULL
+    ]
+
+
+def user_graph(user):
+    """(tipo, queryset, columna) de lo que hay que borrar o desvincular antes que al usuario, en orden"""
+    graph = [
+        # Las tareas que creó, con todo lo que cuelga de ellas
+        ('tasks', Task.all_objects.filter(created_by=user), None),
+        # Asignaciones que recibió o que dio en tareas de otros
+        ('assignments', TaskAssignment.objects.filter(Q(assigned_to=user) | Q(assigned_by=user)), None),
+        ('notifications', Notification.objects.filter(user=user), None),
+    ]
+    graph += [
+        ('nulled', related_model._base_manager.filter(**{field.name: user}), field.column)
+        for related_model, field in _set_null_references(User)
+    ]
+    return graph
+
+
+def user_graph_size(user):
+    """Filas que tocará el borrado del usuario, en una consulta (aproximado: no cuenta los reportes)"""
+    querysets = [queryset for _, queryset, _ in user_graph(user)] + [
+        # Lo que cuelga de las tareas que creó
+        TaskAssignment.objects.filter(task__created_by=user),
+        Notification.objects.filter(related_task__created_by=user),
+    ]
+    return User.objects.filter(pk=user.pk).annotate(
+        graph_size=sum(count_subquery(queryset) for queryset in querysets)
+    ).values_list('graph_size', flat=True).get()
+
+
+def purge_batches(user, batch_size=DELETE_BATCH_SIZE):
+    """Borra el usuario lote a lote; genera las filas tocadas por cada lote.
+
+    El último lote borra al propio usuario (``{'users': 1}``). Se puede dejar
+    de consumir en cualquier momento y continuar más tarde con otro generador.
+    Cada lote se confirma antes de generarse salvo que quien consume el
+    generador lo haga dentro de su propia transacción (como
+    ``login.jobs.purge_user``, que guarda el progreso en la misma).
+    """
+    # Antes de desvincularlo: después ya no se sabe qué fragmentos llevan su nombre
+    forget_user(user)
+    for kind, queryset, column in user_graph(user):
+        for ids in pending_batches(queryset, batch_size):
+            # Ninguna transacción queda abierta entre lotes (entre un yield y el siguiente)
+            with transaction.atomic():
+                # Los trabajadores que pierden asignaciones quedan con los contadores por revisar
+                if kind == 'tasks':
+                    mark_stale_counters(TaskAssignment.objects.filter(task_id__in=ids).exclude(assigned_to=user))
+                    counts = delete_task_batch(ids)
+                elif kind == 'assignments':
+                    mark_stale_counters(TaskAssignment.objects.filter(id__in=ids).exclude(assigned_to=user))
+                    counts = delete_assignment_batch(ids)
+                elif kind == 'notifications':
+                    counts = {'notifications': delete_where(Notification, 'id', ids)}
+                else:
+                    counts = {'nulled': null_where(queryset.model, column, ids)}
+            yield counts
+
+    # Lo que queda (perfil, permisos, tokens, log del admin) es poco
+    with transaction.atomic():
+        user.delete()
+    yield {'users': 1}
+
+
+def purge_user(user, batch_size=DELETE_BATCH_SIZE):
+    """Borra el usuario y todo su historial; devuelve las filas tocadas por tipo"""
+    totals = Counter()
+    for counts in purge_batches(user, batch_size):
+        totals.update(counts)
+    return dict(totals)
@@ -0,0 +1,119 @@
+"""Reintentos seguros de los POST del flujo de trabajo.
+
+Con la cabecera ``Idempotency-Key`` la primera petición reserva la clave
+(por usuario) antes de ejecutar la vista y guarda su respuesta en la misma
+transacción que el trabajo que hace. Un reintento con la misma clave y el
+mismo cuerpo recibe la respuesta guardada, con ``Idempotent-Replayed: true``,
+sin volver a crear tareas ni reportes.
+
+- Misma clave con otro método, ruta o cuerpo: 422.
+- Misma clave mientras la primera petición sigue en curso: 409 con Retry-After.
+- Los errores 5xx no se guardan: la clave se libera y puede reintentarse.
+
+Las claves caducan a las ``IDEMPOTENCY_KEY_TTL_SECONDS``; las caducadas se
+reemplazan al reutilizarse y ``expire_idempotency_keys`` las borra.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+def request_fingerprint(request):
+    """sha256 de método, ruta y cuerpo ya interpretado (independiente del orden de las claves)"""
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f'{request.method}\n{request.get_full_path()}\n{body}'.encode()).hexdigest()
+
+
+def _stored_response(record, fingerprint):
+    """Respuesta para una clave ya usada"""
+    if record is not None and record.fingerprint != fingerprint:
+        return Response(
+            {'error': 'La clave de idempotencia ya se usó con una petición distinta'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if record is None or record.status_code is None:
+        return Response(
+            {'error': 'Ya se está procesando una petición con esta clave de idempotencia'},
+            status=status.HTTP_409_CONFLICT, headers={'Retry-After': '1'}
+        )
+    return Response(record.response_body, status=record.status_code, headers={REPLAYED_HEADER: 'true'})
+
+
+def claim_key(user, key, fingerprint):
+    """Reserva la clave; devuelve (registro, None) o (None, respuesta ya conocida)"""
+    now = timezone.now()
+    pending_since = now - timedelta(seconds=settings.IDEMPOTENCY_PENDING_SECONDS)
+    record = IdempotencyKey.objects.filter(user=user, key=key).first()
+    if record is not None and (
+        record.expires_at <= now or (record.status_code is None and record.created_at <= pending_since)
+    ):
+        # Caducada o abandonada por una petición que no terminó
+        IdempotencyKey.objects.filter(pk=record.pk).delete()
+        record = None
+
+    if record is None:
+        try:
+            # Se confirma antes de ejecutar la vista: un reintento concurrente la ve
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(
+                    user=user, key=key, fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+                ), None
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=user, key=key).first()
+
+    return None, _stored_response(record, fingerprint)
+
+
+def idempotent(handler):
+    """Decorador para métodos POST de APIView que admite ``Idempotency-Key``"""
+
+    @wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return handler(view, request, *args, **kwargs)
+        if not key or len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            return Response(
+                {'error': 'La cabecera Idempotency-Key debe tener entre 1 y 255 caracteres'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = request_fingerprint(request)
+        record, stored = claim_key(request.user, key, fingerprint)
+        if stored is not None:
+            return stored
+
+        try:
+            with transaction.atomic():
+                response = handler(view, request, *args, **kwargs)
+                if response.status_code < 500:
+                    IdempotencyKey.objects.filter(pk=record.pk).update(
+                        status_code=response.status_code, response_body=response.data
+                    )
+        except BaseException:
+            IdempotencyKey.objects.filter(pk=record.pk).delete()
+            raise
+
+        if response.status_code >= 500:
+            IdempotencyKey.objects.filter(pk=record.pk).delete()
+        return response
+
+    return wrapper
+
+
+def expire_keys(now=None):
+    """Borra las claves caducadas; devuelve cuántas"""
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=now or timezone.now()).delete()
+    return deleted
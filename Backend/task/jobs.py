@@ -0,0 +1,37 @@
+"""Manejadores de trabajos en segundo plano del sistema de tareas."""
+from jobs.queue import register
+from .models import Task, Notification
+from .counters import reconcile_counters
+from .services import auto_assign_task, counter_increments, increment_profile_counters, redistribute_tasks
+
+
+@register('task.auto_assign')
+def auto_assign(payload):
+    task = Task.objects.select_for_update().filter(id=payload['task_id']).first()
+    # La tarea pudo eliminarse o asignarse manualmente mientras esperaba en cola
+    if task is None or task.status != 'pending':
+        return
+    auto_assign_task(task, reassigned=payload.get('reassigned', False))
+
+
+@register('task.notify')
+def notify(payload):
+    Notification.objects.bulk_create([
+        Notification(**data) for data in payload['notifications']
+    ])
+
+
+@register('task.increment_counter')
+def increment_counter(payload):
+    increment_profile_counters(payload['field'], counter_increments(payload))
+
+
+@register('task.rebalance')
+def rebalance(payload):
+    redistribute_tasks(payload['task_ids'])
+
+
+# Recorre todos los perfiles con sus asignaciones: más que el arrendamiento por defecto
+@register('task.reconcile_counters', lease=600)
+def reconcile(payload):
+    reconcile_counters(incremental=payload.get('incremental', True))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from task.archiving import archive_tasks, ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = ('Mueve las tareas aprobadas, canceladas y eliminadas, con sus asignaciones y reportes, '
+            'a las tablas de archivo')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=ARCHIVE_AFTER_DAYS,
+                            help='Días desde que terminó la tarea (las eliminadas se archivan siempre)')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE,
+                            help='Tareas por transacción')
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--older-than no puede ser negativo y --batch-size debe ser positivo')
+
+        start = time.perf_counter()
+        totals = archive_tasks(
+            older_than_days=options['older_than'], batch_size=options['batch_size'], log=self.stdout.write
+        )
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['tasks']} tareas, {totals['assignments']} asignaciones y "
+            f"{totals['reports']} reportes archivados en {elapsed:.1f}s"
+        ))
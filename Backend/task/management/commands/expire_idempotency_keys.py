@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from task.idempotency import expire_keys
+
+
+class Command(BaseCommand):
+    help = 'Borra las claves de idempotencia caducadas y sus respuestas guardadas'
+
+    def handle(self, *args, **options):
+        deleted = expire_keys()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} claves de idempotencia caducadas borradas'))
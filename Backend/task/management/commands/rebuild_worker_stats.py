@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+from task.worker_stats import rebuild_worker_stats
+
+
+class Command(BaseCommand):
+    help = ('Recalcula las estadísticas diarias y totales de cada trabajador (las de las clasificaciones) '
+            'a partir de las asignaciones activas y archivadas')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        workers = rebuild_worker_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Estadísticas de {workers} trabajadores recalculadas en {time.perf_counter() - start:.1f}s'
+        ))
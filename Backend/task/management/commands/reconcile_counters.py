@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from task.counters import COUNTED_ASSIGNMENTS, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = ('Recalcula tasks_assigned, tasks_completed y tasks_rejected de los perfiles a partir de '
+            'las asignaciones y corrige los que se desviaron')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true',
+                            help='Solo los usuarios con asignaciones cambiadas desde la última ejecución')
+        parser.add_argument('--dry-run', action='store_true', help='Informar de la desviación sin corregirla')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        run = reconcile_counters(incremental=options['incremental'], dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - start
+
+        for field in COUNTED_ASSIGNMENTS:
+            totals = run.drift['fields'][field]
+            self.stdout.write(
+                f"{field:16s} {totals['users']:6d} usuarios  neto {totals['net']:+7d}  absoluto {totals['absolute']:7d}"
+            )
+        for user in run.drift['users']:
+            changes = ', '.join(
+                f"{field} {user[field]['stored']} -> {user[field]['stored'] + user[field]['delta']}"
+                for field in COUNTED_ASSIGNMENTS if field in user
+            )
+            self.stdout.write(f"  {user['username']} (#{user['user_id']}): {changes}")
+
+        action = 'con desviación' if options['dry_run'] else 'corregidos'
+        self.stdout.write(self.style.SUCCESS(
+            f"Conciliación {run.get_mode_display().lower()}: {run.checked} perfiles revisados, "
+            f"{run.corrected} {action} en {elapsed:.1f}s"
+        ))
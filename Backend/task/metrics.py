@@ -0,0 +1,30 @@
+"""Métricas del flujo de trabajo de las tareas."""
+from django.db import transaction
+from django.db.models import Count
+from monitoring.metrics import Counter, Gauge
+
+TRANSITIONS = Counter(
+    'workflow_transitions', 'Transiciones de estado del flujo de tareas',
+    labelnames=('transition',)
+)
+
+
+def record_transition(transition, amount=1):
+    """Cuenta la transición cuando se confirma la transacción en curso"""
+    transaction.on_commit(lambda: TRANSITIONS.inc(amount, transition=transition))
+
+
+def _pending_by_difficulty():
+    from .models import Task
+    counts = dict(
+        Task.objects.filter(status='pending')
+        .values_list('difficulty')
+        .annotate(total=Count('id'))
+    )
+    return {(difficulty,): counts.get(difficulty, 0) for difficulty, _ in Task.DIFFICULTY_LEVELS}
+
+
+PENDING_TASKS = Gauge(
+    'workflow_pending_tasks', 'Tareas pendientes de asignación por dificultad',
+    labelnames=('difficulty',), function=_pending_by_difficulty
+)
@@ -0,0 +1,134 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('difficulty', models.CharField(choices=[('adiestrado', 'Adiestrado'), ('regular', 'Regular'), ('especialista', 'Especialista')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente de Asignación'), ('assigned', 'Asignada'), ('in_progress', 'En Progreso'), ('completed', 'Completada'), ('rejected', 'Rechazada'), ('cancelled', 'Cancelada')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('assigned_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('deadline', models.DateTimeField(blank=True, null=True)),
+                ('estimated_hours', models.PositiveIntegerField(default=1)),
+                ('priority', models.PositiveIntegerField(default=1)),
+                ('reason', models.CharField(choices=[('approved', 'Aprobada'), ('cancelled', 'Cancelada'), ('deleted', 'Eliminada')], max_length=20)),
+                ('archived_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Tarea archivada',
+                'verbose_name_plural': 'Tareas archivadas',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTaskAssignment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(max_length=20)),
+                ('assigned_at', models.DateTimeField()),
+                ('rejected_at', models.DateTimeField(blank=True, null=True)),
+                ('rejected_reason', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('approved_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-assigned_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTaskReport',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('report_text', models.TextField()),
+                ('hours_worked', models.PositiveIntegerField()),
+                ('challenges_faced', models.TextField(blank=True)),
+                ('solutions_applied', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('pending_review', 'Pendiente de Revisión'), ('approved', 'Aprobado'), ('rejected', 'Rechazado'), ('needs_correction', 'Requiere Corrección')], max_length=20)),
+                ('submitted_at', models.DateTimeField()),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('review_notes', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['-submitted_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='is_archived',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['status'], name='task_live_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['-created_at'], name='task_live_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='assigned_to',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedtaskassignment',
+            name='approved_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedtaskassignment',
+            name='assigned_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedtaskassignment',
+            name='assigned_to',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_assignments', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedtaskassignment',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='task.archivedtask'),
+        ),
+        migrations.AddField(
+            model_name='archivedtaskreport',
+            name='reviewed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedtaskreport',
+            name='task_assignment',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='report', to='task.archivedtaskassignment'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['reason', '-created_at'], name='archived_task_reason_idx'),
+        ),
+    ]
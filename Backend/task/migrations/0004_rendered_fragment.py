@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0003_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedFragment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('report', 'Reporte'), ('archived_task', 'Tarea archivada')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('version', models.PositiveIntegerField()),
+                ('payload', models.BinaryField()),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_worker_stats(apps, schema_editor):
+    from task.worker_stats import rebuild_worker_stats
+    rebuild_worker_stats(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('task', '0005_counter_reconciliation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkerTotalStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('hours_worked', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-approved', 'user'], name='worker_total_approved_idx'), models.Index(fields=['-rejected', 'user'], name='worker_total_rejected_idx'), models.Index(fields=['-hours_worked', 'user'], name='worker_total_hours_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkerDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('hours_worked', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='worker_daily_day_idx')],
+                'unique_together': {('user', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_worker_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0006_worker_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskreport',
+            index=models.Index(fields=['status', '-submitted_at', '-id'], name='report_status_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskreport',
+            index=models.Index(fields=['-submitted_at', '-id'], name='report_submitted_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:49
+
+import django.db.models.manager
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0007_report_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'default_manager_name': 'all_objects', 'ordering': ['-created_at'], 'verbose_name': 'Tarea', 'verbose_name_plural': 'Tareas'},
+        ),
+        migrations.AlterModelManagers(
+            name='task',
+            managers=[
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
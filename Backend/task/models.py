@@ -1,7 +1,21 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
+class LiveTaskManager(models.Manager):
+    """Excluye las tareas eliminadas; ``Task.all_objects`` las incluye.
+
+    ``Task.objects`` es el que usan las vistas, pero el gestor por defecto
+    del modelo (``Meta.default_manager_name``) es ``all_objects``: así
+    dumpdata, el admin y los gestores inversos (``user.created_tasks``) ven
+    también las tareas eliminadas pendientes de archivar. Las consultas de
+    tareas vivas deben partir de ``Task.objects``.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_archived=False)
+
 class Task(models.Model):
     DIFFICULTY_LEVELS = (
         ('adiestrado', 'Adiestrado'),
@@ -38,10 +52,29 @@ class Task(models.Model):
     estimated_hours = models.PositiveIntegerField(default=1)
     priority = models.PositiveIntegerField(default=1)  # 1-5, donde 5 es más prioritario
     
+    # Borrado lógico: la tarea deja de verse y espera a que archive_tasks la
+    # mueva a las tablas de archivo
+    is_archived = models.BooleanField(default=False)
+    archived_at = models.DateTimeField(null=True, blank=True)
+    
+    objects = LiveTaskManager()
+    all_objects = models.Manager()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Tarea'
         verbose_name_plural = 'Tareas'
+        # Sin él, dumpdata omitiría las tareas eliminadas y sus asignaciones
+        # quedarían sin tarea al cargar el volcado
+        default_manager_name = 'all_objects'
+        # Índices parciales: solo cubren las tareas vivas, que son las que
+        # filtra LiveTaskManager
+        indexes = [
+            models.Index(fields=['status'], condition=models.Q(is_archived=False),
+                         name='task_live_status_idx'),
+            models.Index(fields=['-created_at'], condition=models.Q(is_archived=False),
+                         name='task_live_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.get_difficulty_display()}"
@@ -100,6 +133,11 @@ class TaskReport(models.Model):
     
     class Meta:
         ordering = ['-submitted_at']
+        # Páginas del listado de revisión, por estado o de todos
+        indexes = [
+            models.Index(fields=['status', '-submitted_at', '-id'], name='report_status_submitted_idx'),
+            models.Index(fields=['-submitted_at', '-id'], name='report_submitted_idx'),
+        ]
     
     def __str__(self):
         return f"Reporte - {self.task_assignment.task.title}"
@@ -127,4 +165,200 @@ class Notification(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.get_notification_type_display()} - {self.user.username}"
\ No newline at end of file
+        return f"{self.get_notification_type_display()} - {self.user.username}"
+
+# -- Archivo ---------------------------------------------------------------
+# Copias de las tareas terminadas que archive_tasks saca de las tablas
+# activas. Conservan el id original y solo se leen desde /api/tasks/archive/.
+
+class ArchivedTask(models.Model):
+    ARCHIVE_REASONS = (
+        ('approved', 'Aprobada'),
+        ('cancelled', 'Cancelada'),
+        ('deleted', 'Eliminada'),
+    )
+    
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    difficulty = models.CharField(max_length=20, choices=Task.DIFFICULTY_LEVELS)
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField()
+    assigned_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    deadline = models.DateTimeField(null=True, blank=True)
+    estimated_hours = models.PositiveIntegerField(default=1)
+    priority = models.PositiveIntegerField(default=1)
+    
+    reason = models.CharField(max_length=20, choices=ARCHIVE_REASONS)
+    archived_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Tarea archivada'
+        verbose_name_plural = 'Tareas archivadas'
+        indexes = [
+            models.Index(fields=['reason', '-created_at'], name='archived_task_reason_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} - {self.get_reason_display()}"
+
+class ArchivedTaskAssignment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE, related_name='assignments')
+    assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='archived_assignments')
+    assigned_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=20)
+    assigned_at = models.DateTimeField()
+    rejected_at = models.DateTimeField(null=True, blank=True)
+    rejected_reason = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    approved_at = models.DateTimeField(null=True, blank=True)
+    approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    
+    class Meta:
+        ordering = ['-assigned_at']
+    
+    def __str__(self):
+        return f"{self.task.title} - {self.assigned_to_id}"
+
+class ArchivedTaskReport(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    task_assignment = models.OneToOneField(ArchivedTaskAssignment, on_delete=models.CASCADE,
+                                          related_name='report')
+    report_text = models.TextField()
+    hours_worked = models.PositiveIntegerField()
+    challenges_faced = models.TextField(blank=True)
+    solutions_applied = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=TaskReport.REPORT_STATUS)
+    submitted_at = models.DateTimeField()
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    review_notes = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['-submitted_at']
+    
+    def __str__(self):
+        return f"Reporte archivado - {self.task_assignment.task.title}"
+
+# -- Idempotencia ----------------------------------------------------------
+# Respuestas guardadas de los POST del flujo de trabajo enviados con la
+# cabecera Idempotency-Key (ver task/idempotency.py).
+
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=255)
+    # sha256 de método, ruta y cuerpo: la clave no puede reutilizarse con otra petición
+    fingerprint = models.CharField(max_length=64)
+    
+    # Sin código de estado mientras la primera petición sigue en curso
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        unique_together = ['user', 'key']
+    
+    def __str__(self):
+        return f"{self.key} - {self.user_id}"
+
+# -- Caché de representación -----------------------------------------------
+# JSON ya codificado de las filas que no cambian: reportes aprobados de
+# asignaciones aprobadas y tareas archivadas (ver task/rendering.py).
+
+class RenderedFragment(models.Model):
+    KINDS = (
+        ('report', 'Reporte'),
+        ('archived_task', 'Tarea archivada'),
+    )
+    
+    kind = models.CharField(max_length=20, choices=KINDS)
+    object_id = models.BigIntegerField()
+    # Versión del serializador con la que se generó; las de otra versión se regeneran
+    version = models.PositiveIntegerField()
+    payload = models.BinaryField()
+    
+    class Meta:
+        unique_together = ['kind', 'object_id']
+    
+    def __str__(self):
+        return f"{self.kind} {self.object_id} (v{self.version})"
+
+# -- Conciliación de contadores --------------------------------------------
+# Ejecuciones de reconcile_counters y usuarios pendientes de revisar tras un
+# borrado en cascada (ver task/counters.py).
+
+class CounterReconciliation(models.Model):
+    MODES = (
+        ('full', 'Completa'),
+        ('incremental', 'Incremental'),
+    )
+    
+    mode = models.CharField(max_length=20, choices=MODES)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    # Perfiles revisados y corregidos; desviación por contador y muestra de usuarios
+    checked = models.PositiveIntegerField(default=0)
+    corrected = models.PositiveIntegerField(default=0)
+    drift = models.JSONField(default=dict)
+    
+    class Meta:
+        ordering = ['-started_at']
+    
+    def __str__(self):
+        return f"Conciliación {self.get_mode_display()} - {self.started_at}"
+
+class StaleCounter(models.Model):
+    """Trabajador que perdió asignaciones en un borrado en cascada"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='+')
+    marked_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Contadores de {self.user_id} pendientes"
+
+# -- Estadísticas por trabajador -------------------------------------------
+# Aprobadas, rechazadas y horas trabajadas de cada trabajador por día y en
+# total, actualizadas en cada transición; de ellas salen las clasificaciones
+# (ver task/worker_stats.py).
+
+class WorkerDailyStats(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    day = models.DateField()
+    approved = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    hours_worked = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['user', 'day']
+        indexes = [
+            models.Index(fields=['day'], name='worker_daily_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.day}"
+
+class WorkerTotalStats(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    approved = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    hours_worked = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        # Las clasificaciones de todos los tiempos recorren estos índices en orden
+        indexes = [
+            models.Index(fields=['-approved', 'user'], name='worker_total_approved_idx'),
+            models.Index(fields=['-rejected', 'user'], name='worker_total_rejected_idx'),
+            models.Index(fields=['-hours_worked', 'user'], name='worker_total_hours_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Totales de {self.user_id}"
@@ -0,0 +1,147 @@
+"""Caché de representación de filas inmutables.
+
+Un reporte aprobado de una asignación aprobada y una tarea archivada ya no
+cambian, pero los listados los volvían a serializar en cada petición
+recorriendo sus claves foráneas. Aquí se guarda el JSON ya codificado de
+cada fila (``RenderedFragment``) y los listados lo intercalan tal cual; solo
+se serializan las filas que pueden cambiar o que aún no están en la caché.
+
+Lo que sí puede cambiar de esas filas son datos de otras tablas que el
+serializador copia (nombres de usuario, título de la tarea) o una nueva
+revisión del reporte: los receptores del final del módulo borran los
+fragmentos afectados. Al cambiar un serializador hay que subir su versión
+en ``RENDERERS``.
+"""
+from django.contrib.auth.models import User
+from django.db.models import BinaryField, OuterRef, Q, Subquery
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.renderers import JSONRenderer
+from .models import ArchivedTask, RenderedFragment, Task, TaskReport
+from .serializers import REPORT_TEXT_FIELDS, ArchivedTaskSerializer, TaskReportListSerializer
+
+# Ids por consulta al cargar las filas que faltan; por debajo del límite de
+# parámetros de SQLite aunque se rendericen listados enteros (bench_render)
+RENDER_IN_LIMIT = 900
+RENDER_BATCH_SIZE = 500
+
+
+class Renderer:
+    """Cómo cargar, serializar y reconocer las filas inmutables de un tipo"""
+
+    def __init__(self, serializer_class, related, is_immutable, version, deferred=()):
+        self.serializer_class = serializer_class
+        self.related = related
+        # Columnas que el serializador no lee y no hace falta cargar
+        self.deferred = deferred
+        self.is_immutable = is_immutable
+        self.version = version
+
+
+RENDERERS = {
+    'report': Renderer(
+        TaskReportListSerializer,
+        related=('task_assignment__task', 'task_assignment__assigned_to', 'reviewed_by'),
+        deferred=(*REPORT_TEXT_FIELDS, 'task_assignment__task__description'),
+        is_immutable=lambda report: report.status == 'approved' and report.task_assignment.status == 'approved',
+        version=2,
+    ),
+    'archived_task': Renderer(
+        ArchivedTaskSerializer,
+        related=('created_by', 'assigned_to'),
+        is_immutable=lambda task: True,
+        version=1,
+    ),
+}
+
+
+def _fragments(kind):
+    return RenderedFragment.objects.filter(
+        kind=kind, version=RENDERERS[kind].version, object_id=OuterRef('pk')
+    )
+
+
+def with_fragments(queryset, kind):
+    """(id, fragmento o None) de cada fila, en el orden del queryset"""
+    return queryset.annotate(
+        rendered=Subquery(_fragments(kind).values('payload')[:1], output_field=BinaryField())
+    ).values_list('id', 'rendered')
+
+
+def render_rows(rows, queryset, kind):
+    """Fragmentos JSON de ``rows`` (de ``with_fragments``), serializando los que faltan.
+
+    ``queryset`` es el queryset sin cortar del que salen las filas; de él se
+    cargan las que no están en la caché. Las inmutables se guardan.
+    """
+    renderer = RENDERERS[kind]
+    missing = [object_id for object_id, rendered in rows if rendered is None]
+    rendered = {}
+    if missing:
+        loader = queryset.select_related(*renderer.related).defer(*renderer.deferred)
+        objects = []
+        for start in range(0, len(missing), RENDER_IN_LIMIT):
+            objects += loader.filter(id__in=missing[start:start + RENDER_IN_LIMIT])
+        json_renderer = JSONRenderer()
+        fresh = []
+        # Un solo serializador para todas: instanciarlo por fila cuesta más que serializar
+        for obj, data in zip(objects, renderer.serializer_class(objects, many=True).data):
+            payload = json_renderer.render(data)
+            rendered[obj.id] = payload
+            if renderer.is_immutable(obj):
+                fresh.append(RenderedFragment(kind=kind, object_id=obj.id, version=renderer.version, payload=payload))
+        RenderedFragment.objects.bulk_create(
+            fresh, batch_size=RENDER_BATCH_SIZE,
+            update_conflicts=True, unique_fields=['kind', 'object_id'], update_fields=['version', 'payload'],
+        )
+    return [bytes(payload) if payload is not None else rendered[object_id] for object_id, payload in rows]
+
+
+def json_array(fragments):
+    return b'[' + b','.join(fragments) + b']'
+
+
+def json_page(envelope, fragments):
+    """``envelope`` (p. ej. los datos de paginación) con los fragmentos en ``results``"""
+    return JSONRenderer().render(envelope)[:-1] + b',"results":' + json_array(fragments) + b'}'
+
+
+def forget(kind, ids):
+    """Borra los fragmentos de esas filas (ids o queryset de ids)"""
+    RenderedFragment.objects.filter(kind=kind, object_id__in=ids).delete()
+
+
+def forget_user(user):
+    """Borra los fragmentos que copian el nombre del usuario"""
+    forget('report', TaskReport.objects.filter(
+        Q(task_assignment__assigned_to=user) | Q(reviewed_by=user)
+    ).values('id'))
+    forget('archived_task', ArchivedTask.objects.filter(Q(created_by=user) | Q(assigned_to=user)).values('id'))
+
+
+def _changed(update_fields, fields):
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+@receiver(post_save, sender=User)
+def forget_renamed_user(sender, instance, created, update_fields, **kwargs):
+    if not created and _changed(update_fields, {'first_name', 'last_name'}):
+        forget_user(instance)
+
+
+@receiver(pre_delete, sender=User)
+def forget_deleted_user(sender, instance, **kwargs):
+    # Sus reportes se borran y en los que revisó el revisor pasa a NULL
+    forget_user(instance)
+
+
+@receiver(post_save, sender=Task)
+def forget_renamed_task(sender, instance, created, update_fields, **kwargs):
+    if not created and _changed(update_fields, {'title'}):
+        forget('report', TaskReport.objects.filter(task_assignment__task=instance).values('id'))
+
+
+@receiver(post_save, sender=TaskReport)
+def forget_reviewed_report(sender, instance, created, update_fields, **kwargs):
+    if not created and _changed(update_fields, {'status', 'reviewed_by', 'review_notes'}):
+        forget('report', [instance.id])
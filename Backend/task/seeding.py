@@ -0,0 +1,268 @@
+"""Generador de datos sintéticos a gran escala.
+
+Crea usuarios de todos los roles y tareas con su historial completo
+(asignaciones, rechazos, reportes y notificaciones) usando ``bulk_create`` por
+lotes e ids explícitos, de forma determinista a partir de una semilla. Lo usan
+``manage.py seed_workload`` y las pruebas de rendimiento.
+"""
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from login.models import UserProfile
+from .models import Task, TaskAssignment, TaskReport, Notification
+from .worker_stats import rebuild_worker_stats
+
+SEED_PASSWORD = 'seed-password'
+
+ROLE_WEIGHTS = {
+    'adiestrado': 40,
+    'regular': 35,
+    'especialista': 20,
+    'admin': 4,
+    'superuser': 1,
+}
+DIFFICULTY_WEIGHTS = {'adiestrado': 45, 'regular': 35, 'especialista': 20}
+PRIORITY_WEIGHTS = {1: 30, 2: 30, 3: 20, 4: 12, 5: 8}
+TASK_STATUS_WEIGHTS = {
+    'pending': 8,
+    'assigned': 17,
+    'in_progress': 5,
+    'completed': 65,
+    'cancelled': 5,
+}
+# Estado del reporte de una tarea completada
+REPORT_STATUS_WEIGHTS = {'approved': 78, 'pending_review': 17, 'needs_correction': 5}
+REJECTION_RATE = 0.15
+NOTIFICATION_READ_RATE = 0.7
+
+
+def _choice(rnd, weights):
+    return rnd.choices(list(weights), weights=list(weights.values()))[0]
+
+
+@contextmanager
+def _historical_timestamps():
+    """Permite fijar a mano los campos auto_now/auto_now_add durante la carga"""
+    fields = [
+        Task._meta.get_field('created_at'),
+        TaskAssignment._meta.get_field('assigned_at'),
+        TaskReport._meta.get_field('submitted_at'),
+        Notification._meta.get_field('created_at'),
+        UserProfile._meta.get_field('created_at'),
+        UserProfile._meta.get_field('updated_at'),
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _next_id(model):
+    return (model.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+
+
+class _Ids:
+    """Reparte ids explícitos para poder enlazar filas sin releerlas"""
+
+    def __init__(self, model):
+        self.value = _next_id(model)
+
+    def take(self):
+        value = self.value
+        self.value += 1
+        return value
+
+
+def seed_workload(users=1000, tasks=10000, seed=0, batch_size=5000, now=None, log=None):
+    """Crea ``users`` usuarios y ``tasks`` tareas; devuelve un resumen con los totales"""
+    rnd = random.Random(seed)
+    now = now or timezone.now()
+    log = log or (lambda message: None)
+    summary = {'users': 0, 'tasks': 0, 'assignments': 0, 'reports': 0, 'notifications': 0}
+
+    with _historical_timestamps():
+        user_rows, workers_by_role, open_slots, admins = _build_users(rnd, users, now)
+        with transaction.atomic():
+            User.objects.bulk_create([row['user'] for row in user_rows], batch_size=batch_size)
+        summary['users'] = len(user_rows)
+        log(f'{len(user_rows)} usuarios creados')
+
+        counters = {row['user'].id: [0, 0, 0] for row in user_rows}
+        ids = {model: _Ids(model) for model in (Task, TaskAssignment, TaskReport, Notification)}
+
+        for start in range(0, tasks, batch_size):
+            batch = _build_task_batch(
+                rnd, min(batch_size, tasks - start), now, ids,
+                workers_by_role, open_slots, admins, counters
+            )
+            with transaction.atomic():
+                for model in (Task, TaskAssignment, TaskReport, Notification):
+                    model.objects.bulk_create(batch[model], batch_size=batch_size)
+            summary['tasks'] += len(batch[Task])
+            summary['assignments'] += len(batch[TaskAssignment])
+            summary['reports'] += len(batch[TaskReport])
+            summary['notifications'] += len(batch[Notification])
+            log(f'{summary["tasks"]}/{tasks} tareas creadas')
+
+        # Los perfiles se crean al final con los contadores ya calculados
+        # (bulk_create no dispara la señal post_save de User)
+        profiles = []
+        for row in user_rows:
+            assigned, completed, rejected = counters[row['user'].id]
+            profiles.append(UserProfile(
+                user=row['user'], role=row['role'], created_at=row['user'].date_joined,
+                updated_at=now, tasks_assigned=assigned, tasks_completed=completed,
+                tasks_rejected=rejected, is_active_worker=row['active'], max_tasks=row['max_tasks']
+            ))
+        with transaction.atomic():
+            UserProfile.objects.bulk_create(profiles, batch_size=batch_size)
+        # Igual con las estadísticas de las clasificaciones
+        rebuild_worker_stats()
+
+    return summary
+
+
+def _build_users(rnd, count, now):
+    password = make_password(SEED_PASSWORD)
+    next_id = _next_id(User)
+    rows = []
+    workers_by_role = {role: [] for role in DIFFICULTY_WEIGHTS}
+    # Huecos libres de trabajadores activos: un id por cada tarea que aún aceptan
+    open_slots = {role: [] for role in DIFFICULTY_WEIGHTS}
+    admins = []
+
+    for i in range(count):
+        user_id = next_id + i
+        # Garantizar al menos un administrador que cree las tareas
+        role = 'admin' if i == 0 else _choice(rnd, ROLE_WEIGHTS)
+        user = User(
+            id=user_id, username=f'seed{user_id}', password=password,
+            first_name=f'Nombre{user_id}', last_name=f'Apellido{user_id}',
+            email=f'seed{user_id}@example.com', is_staff=role in ('admin', 'superuser'),
+            is_superuser=role == 'superuser',
+            date_joined=now - timedelta(days=rnd.randint(30, 3 * 365))
+        )
+        active = rnd.random() < 0.95
+        max_tasks = rnd.randint(3, 8)
+        rows.append({'user': user, 'role': role, 'active': active, 'max_tasks': max_tasks})
+        if role in workers_by_role:
+            workers_by_role[role].append(user_id)
+            if active:
+                # Se deja un hueco libre por trabajador para que la asignación
+                # automática encuentre candidatos en la base de datos generada
+                open_slots[role].extend([user_id] * (max_tasks - 1))
+        else:
+            admins.append(user_id)
+
+    return rows, workers_by_role, open_slots, admins
+
+
+def _take_slot(rnd, slots):
+    """Saca un hueco libre al azar en O(1); None si el nivel está lleno"""
+    if not slots:
+        return None
+    index = rnd.randrange(len(slots))
+    slots[index], slots[-1] = slots[-1], slots[index]
+    return slots.pop()
+
+
+def _build_task_batch(rnd, count, now, ids, workers_by_role, open_slots, admins, counters):
+    batch = {Task: [], TaskAssignment: [], TaskReport: [], Notification: []}
+
+    def notify(user_id, kind, title, task, when):
+        batch[Notification].append(Notification(
+            id=ids[Notification].take(), user_id=user_id, notification_type=kind, title=title,
+            message=f'{title}: {task.title}', related_task_id=task.id,
+            is_read=rnd.random() < NOTIFICATION_READ_RATE, created_at=when
+        ))
+
+    for _ in range(count):
+        difficulty = _choice(rnd, DIFFICULTY_WEIGHTS)
+        status = _choice(rnd, TASK_STATUS_WEIGHTS)
+        workers = workers_by_role[difficulty]
+        worker = None
+        if status in ('assigned', 'in_progress'):
+            # Las tareas abiertas respetan max_tasks de trabajadores activos;
+            # si el nivel está completo la tarea queda pendiente
+            worker = _take_slot(rnd, open_slots[difficulty])
+        elif status != 'pending' and workers:
+            worker = rnd.choice(workers)
+        if worker is None:
+            status = 'pending'
+
+        task_id = ids[Task].take()
+        created_at = now - timedelta(seconds=rnd.randint(0, 365 * 24 * 3600))
+        task = Task(
+            id=task_id, title=f'Tarea {task_id}',
+            description='Descripción generada para pruebas de carga. ' * rnd.randint(1, 6),
+            difficulty=difficulty, status=status, created_by_id=rnd.choice(admins),
+            created_at=created_at,
+            deadline=created_at + timedelta(days=rnd.randint(1, 30)) if rnd.random() < 0.8 else None,
+            estimated_hours=max(1, min(40, int(rnd.lognormvariate(1.5, 0.8)))),
+            priority=_choice(rnd, PRIORITY_WEIGHTS),
+        )
+        batch[Task].append(task)
+        if status == 'pending':
+            continue
+
+        when = created_at + timedelta(minutes=rnd.randint(1, 120))
+        # Historial de rechazo previo por otro trabajador del mismo nivel
+        rejecter = rnd.choice(workers)
+        if rejecter != worker and rnd.random() < REJECTION_RATE:
+            batch[TaskAssignment].append(TaskAssignment(
+                id=ids[TaskAssignment].take(), task_id=task.id, assigned_to_id=rejecter,
+                assigned_by_id=task.created_by_id, status='rejected', assigned_at=when,
+                rejected_at=when + timedelta(hours=2), rejected_reason='Sin disponibilidad'
+            ))
+            counters[rejecter][0] += 1
+            counters[rejecter][2] += 1
+            notify(rejecter, 'task_assigned', 'Nueva Tarea Asignada', task, when)
+            notify(task.created_by_id, 'task_rejected', 'Tarea Rechazada', task, when + timedelta(hours=2))
+            when += timedelta(hours=3)
+
+        task.assigned_to_id = worker
+        task.assigned_at = when
+        assignment = TaskAssignment(
+            id=ids[TaskAssignment].take(), task_id=task.id, assigned_to_id=worker,
+            assigned_by_id=task.created_by_id, status=status, assigned_at=when
+        )
+        batch[TaskAssignment].append(assignment)
+        counters[worker][0] += 1
+        notify(worker, 'task_assigned', 'Nueva Tarea Asignada', task, when)
+
+        if status == 'in_progress':
+            assignment.started_at = when + timedelta(hours=1)
+        elif status == 'completed':
+            done = when + timedelta(hours=task.estimated_hours + rnd.randint(0, 72))
+            task.completed_at = assignment.completed_at = done
+            report_status = _choice(rnd, REPORT_STATUS_WEIGHTS)
+            report = TaskReport(
+                id=ids[TaskReport].take(), task_assignment_id=assignment.id,
+                report_text='Trabajo realizado según lo indicado. ' * rnd.randint(1, 10),
+                hours_worked=max(1, task.estimated_hours + rnd.randint(-2, 4)),
+                challenges_faced='Ninguno relevante' if rnd.random() < 0.5 else '',
+                status=report_status, submitted_at=done
+            )
+            batch[TaskReport].append(report)
+            notify(task.created_by_id, 'report_submitted', 'Reporte de Tarea Enviado', task, done)
+            if report_status != 'pending_review':
+                report.reviewed_at = done + timedelta(hours=rnd.randint(1, 48))
+                report.reviewed_by_id = task.created_by_id
+            if report_status == 'approved':
+                assignment.status = 'approved'
+                assignment.approved_at = report.reviewed_at
+                assignment.approved_by_id = task.created_by_id
+                counters[worker][1] += 1
+                notify(worker, 'task_approved', 'Tarea Aprobada', task, report.reviewed_at)
+
+    return batch
@@ -1,6 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Task, TaskAssignment, TaskReport, Notification
+from django.db.models import Prefetch
+from .models import (
+    Task, TaskAssignment, TaskReport, Notification,
+    ArchivedTask, ArchivedTaskAssignment, ArchivedTaskReport
+)
+from .services import REVIEW_ACTIONS, BULK_REVIEW_MAX_ITEMS
 
 class UserBasicSerializer(serializers.ModelSerializer):
     profile = serializers.SerializerMethodField()
@@ -18,6 +23,18 @@ class UserBasicSerializer(serializers.ModelSerializer):
             'can_accept_more_tasks': obj.userprofile.can_accept_more_tasks
         }
 
+CURRENT_ASSIGNMENT_STATUSES = ['assigned', 'in_progress', 'completed']
+
+def with_current_assignment(tasks):
+    """Carga en bloque lo que lee TaskSerializer, incluida la asignación vigente"""
+    return tasks.select_related('created_by', 'assigned_to').prefetch_related(Prefetch(
+        'assignments',
+        queryset=TaskAssignment.objects.filter(
+            status__in=CURRENT_ASSIGNMENT_STATUSES
+        ).select_related('assigned_to', 'assigned_by', 'approved_by'),
+        to_attr='current_assignments'
+    ))
+
 class TaskSerializer(serializers.ModelSerializer):
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
@@ -29,9 +46,13 @@ class TaskSerializer(serializers.ModelSerializer):
         read_only_fields = ('created_by', 'created_at', 'assigned_at')
     
     def get_current_assignment(self, obj):
-        current_assignment = obj.assignments.filter(
-            status__in=['assigned', 'in_progress', 'completed']
-        ).first()
+        if hasattr(obj, 'current_assignments'):
+            # Precargada por with_current_assignment
+            current_assignment = next(iter(obj.current_assignments), None)
+        else:
+            current_assignment = obj.assignments.filter(
+                status__in=CURRENT_ASSIGNMENT_STATUSES
+            ).first()
         if current_assignment:
             return TaskAssignmentSerializer(current_assignment).data
         return None
@@ -58,6 +79,14 @@ class TaskReportSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('submitted_at', 'reviewed_at')
 
+# Campos de texto largo que el listado de reportes no carga (están en el detalle)
+REPORT_TEXT_FIELDS = ('report_text', 'challenges_faced', 'solutions_applied', 'review_notes')
+
+class TaskReportListSerializer(TaskReportSerializer):
+    class Meta(TaskReportSerializer.Meta):
+        fields = None
+        exclude = REPORT_TEXT_FIELDS
+
 class NotificationSerializer(serializers.ModelSerializer):
     task_title = serializers.CharField(source='related_task.title', read_only=True)
     
@@ -66,6 +95,40 @@ class NotificationSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('created_at',)
 
+class ArchivedTaskSerializer(serializers.ModelSerializer):
+    created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
+    assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
+    
+    class Meta:
+        model = ArchivedTask
+        fields = '__all__'
+
+class ArchivedTaskReportSerializer(serializers.ModelSerializer):
+    reviewed_by_name = serializers.CharField(source='reviewed_by.get_full_name', read_only=True)
+    
+    class Meta:
+        model = ArchivedTaskReport
+        exclude = ('task_assignment',)
+
+class ArchivedTaskAssignmentSerializer(serializers.ModelSerializer):
+    assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
+    assigned_by_name = serializers.CharField(source='assigned_by.get_full_name', read_only=True)
+    approved_by_name = serializers.CharField(source='approved_by.get_full_name', read_only=True)
+    report = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ArchivedTaskAssignment
+        exclude = ('task',)
+    
+    def get_report(self, obj):
+        try:
+            return ArchivedTaskReportSerializer(obj.report).data
+        except ArchivedTaskReport.DoesNotExist:
+            return None
+
+class ArchivedTaskDetailSerializer(ArchivedTaskSerializer):
+    assignments = ArchivedTaskAssignmentSerializer(many=True, read_only=True)
+
 class TaskCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
@@ -84,4 +147,13 @@ class TaskCompletionSerializer(serializers.Serializer):
     report_text = serializers.CharField()
     hours_worked = serializers.IntegerField(min_value=1)
     challenges_faced = serializers.CharField(required=False, allow_blank=True)
-    solutions_applied = serializers.CharField(required=False, allow_blank=True)
\ No newline at end of file
+    solutions_applied = serializers.CharField(required=False, allow_blank=True)
+
+
+class ReportReviewItemSerializer(serializers.Serializer):
+    report_id = serializers.IntegerField()
+    action = serializers.ChoiceField(choices=REVIEW_ACTIONS)
+    review_notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+class BulkReportReviewSerializer(serializers.Serializer):
+    reviews = ReportReviewItemSerializer(many=True, allow_empty=False, max_length=BULK_REVIEW_MAX_ITEMS)
@@ -0,0 +1,593 @@
+"""Transiciones del ciclo de vida de las tareas.
+
+Cada transición se ejecuta dentro de una única transacción, escribe solo las
+columnas que cambian (``update_fields``) y actualiza los contadores del perfil
+con ``F()`` para no depender de lecturas previas.
+
+Los efectos secundarios (notificaciones, contadores y la búsqueda de un nuevo
+asignado) se encolan en la misma transacción y los ejecuta el trabajador de
+``manage.py run_jobs``; la petición HTTP solo aplica el cambio de estado.
+"""
+import heapq
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, Count, F
+from django.utils import timezone
+from django.contrib.auth.models import User
+from jobs.queue import enqueue
+from .models import Task, TaskAssignment, TaskReport, Notification
+from .metrics import record_transition
+from .worker_stats import record_worker_stats
+from login.models import UserProfile
+
+ACTIVE_ASSIGNMENT_STATUSES = ['assigned', 'in_progress']
+
+
+def increment_profile_counter(user, field, amount=1):
+    """Incrementa un contador de UserProfile con un único UPDATE"""
+    UserProfile.objects.filter(user=user).update(**{field: F(field) + amount})
+
+
+def increment_profile_counters(field, amounts):
+    """Incrementa un contador para varios usuarios ({user_id: cantidad}).
+
+    Se hace un UPDATE por cada cantidad distinta en lugar de uno por usuario.
+    """
+    users_by_amount = defaultdict(list)
+    for user_id, amount in amounts.items():
+        users_by_amount[amount].append(user_id)
+    for amount, user_ids in users_by_amount.items():
+        UserProfile.objects.filter(user_id__in=user_ids).update(**{field: F(field) + amount})
+
+
+def notify(user_id, notification_type, title, message, task):
+    """Encola una notificación para el usuario"""
+    enqueue('task.notify', {'notifications': [{
+        'user_id': user_id,
+        'notification_type': notification_type,
+        'title': title,
+        'message': message,
+        'related_task_id': task.id,
+    }]})
+
+
+def schedule_counters(field, amounts):
+    """Encola en un trabajo el incremento de un contador para varios usuarios ({user_id: cantidad})"""
+    if amounts:
+        # Las claves de un objeto JSON son cadenas
+        enqueue('task.increment_counter', {
+            'field': field, 'amounts': {str(user_id): amount for user_id, amount in amounts.items()}
+        })
+
+
+def schedule_counter(user_id, field):
+    """Encola el incremento de un contador de estadísticas"""
+    schedule_counters(field, {user_id: 1})
+
+
+def counter_increments(payload):
+    """{user_id: cantidad} de un trabajo 'task.increment_counter'"""
+    if 'amounts' in payload:
+        return {int(user_id): amount for user_id, amount in payload['amounts'].items()}
+    # Trabajos encolados antes de schedule_counters, con un solo usuario
+    return {payload['user_id']: payload.get('amount', 1)}
+
+
+def schedule_auto_assign(task, reassigned=False):
+    """Encola la búsqueda de un trabajador disponible para la tarea"""
+    enqueue('task.auto_assign', {'task_id': task.id, 'reassigned': reassigned})
+
+
+def find_available_worker(task):
+    """Devuelve el trabajador disponible con menos carga para la tarea, o None"""
+    # Usuarios con el rol que coincide con la dificultad y que nunca tuvieron
+    # esta tarea (unique_together impide volver a asignársela)
+    return User.objects.filter(
+        userprofile__role=task.difficulty,
+        userprofile__is_active_worker=True
+    ).exclude(
+        task_assignments__task=task
+    ).annotate(
+        current_tasks=Count(
+            'task_assignments',
+            filter=Q(task_assignments__status__in=ACTIVE_ASSIGNMENT_STATUSES)
+        )
+    ).filter(
+        current_tasks__lt=F('userprofile__max_tasks')
+    ).order_by('current_tasks', 'userprofile__tasks_rejected', 'id').first()
+
+
+def _assign(task, user, assigned_by_id):
+    """Crea la asignación y actualiza la tarea y el contador del trabajador"""
+    TaskAssignment.objects.create(
+        task=task,
+        assigned_to=user,
+        assigned_by_id=assigned_by_id,
+        status='assigned'
+    )
+
+    task.assigned_to = user
+    task.status = 'assigned'
+    task.assigned_at = timezone.now()
+    task.save(update_fields=['assigned_to', 'status', 'assigned_at'])
+
+    increment_profile_counter(user, 'tasks_assigned')
+
+
+def auto_assign_task(task, reassigned=False):
+    """Asigna automáticamente la tarea a un usuario disponible del nivel correspondiente.
+
+    Se ejecuta desde el trabajador de la cola, por eso escribe la notificación
+    directamente.
+    """
+    with transaction.atomic(savepoint=False):
+        user = find_available_worker(task)
+        if user is None:
+            record_transition('assignment_failed')
+            if task.status != 'pending' or task.assigned_to_id is not None:
+                task.assigned_to = None
+                task.status = 'pending'
+                task.save(update_fields=['assigned_to', 'status'])
+            return None
+
+        # Mantener al creador original como quien asigna
+        _assign(task, user, task.created_by_id)
+        record_transition('assigned')
+
+        suffix = ' (reasignada automáticamente)' if reassigned else ''
+        Notification.objects.create(
+            user=user,
+            notification_type='task_assigned',
+            title='Nueva Tarea Asignada',
+            message=f'Se te ha asignado la tarea: {task.title}{suffix}',
+            related_task=task
+        )
+        return user
+
+
+def create_task(serializer, created_by):
+    """Crea la tarea pendiente y encola su asignación automática"""
+    with transaction.atomic():
+        task = serializer.save(created_by=created_by, status='pending')
+        record_transition('created')
+        schedule_auto_assign(task)
+    return task
+
+
+def assign_task_to_user(task, user, assigned_by):
+    """Asigna manualmente la tarea a un usuario concreto"""
+    with transaction.atomic(savepoint=False):
+        _assign(task, user, assigned_by.id)
+        record_transition('assigned_manually')
+        notify(
+            user.id, 'task_assigned', 'Tarea Reasignada',
+            f'Se te ha reasignado la tarea: {task.title}', task
+        )
+
+
+def cancel_active_assignments(task):
+    """Cancela las asignaciones abiertas de la tarea"""
+    return TaskAssignment.objects.filter(
+        task=task,
+        status__in=ACTIVE_ASSIGNMENT_STATUSES
+    ).update(status='cancelled')
+
+
+def update_task(task, changes, reassign=False, assigned_user=None, assigned_by=None):
+    """Actualiza los campos de la tarea y, si se pide, la reasigna.
+
+    Sin ``assigned_user`` la tarea vuelve a pendiente y su reasignación
+    automática queda en cola.
+    """
+    with transaction.atomic():
+        for attr, value in changes.items():
+            setattr(task, attr, value)
+        if changes:
+            task.save(update_fields=list(changes))
+
+        if not reassign:
+            return task
+
+        # Cancelar asignaciones existentes
+        cancel_active_assignments(task)
+
+        if assigned_user is not None:
+            assign_task_to_user(task, assigned_user, assigned_by)
+        else:
+            task.assigned_to = None
+            task.status = 'pending'
+            task.save(update_fields=['assigned_to', 'status'])
+            schedule_auto_assign(task, reassigned=True)
+
+    return task
+
+
+def delete_task(task):
+    """Borrado lógico: la tarea deja de verse y libera su asignación abierta.
+
+    Las filas se conservan hasta que ``manage.py archive_tasks`` las mueve
+    a las tablas de archivo.
+    """
+    with transaction.atomic():
+        cancel_active_assignments(task)
+        task.is_archived = True
+        task.archived_at = timezone.now()
+        task.save(update_fields=['is_archived', 'archived_at'])
+        record_transition('deleted')
+    return task
+
+
+def reject_task(task, assignment, user, reason):
+    """Rechaza la asignación y deja la tarea pendiente de reasignación"""
+    with transaction.atomic():
+        assignment.status = 'rejected'
+        assignment.rejected_at = timezone.now()
+        assignment.rejected_reason = reason
+        assignment.save(update_fields=['status', 'rejected_at', 'rejected_reason'])
+
+        # Resetear la tarea para reasignación
+        task.assigned_to = None
+        task.status = 'pending'
+        task.save(update_fields=['assigned_to', 'status'])
+
+        record_transition('rejected')
+        schedule_counter(user.id, 'tasks_rejected')
+        record_worker_stats({user.id: {'rejected': 1}})
+        notify(
+            task.created_by_id, 'task_rejected', 'Tarea Rechazada',
+            f'{user.get_full_name()} rechazó la tarea: {task.title}. Razón: {reason}', task
+        )
+        schedule_auto_assign(task, reassigned=True)
+
+
+def complete_task(task, assignment, user, data):
+    """Marca la tarea como completada y crea el reporte para revisión"""
+    now = timezone.now()
+    with transaction.atomic():
+        report = TaskReport.objects.create(
+            task_assignment=assignment,
+            report_text=data['report_text'],
+            hours_worked=data['hours_worked'],
+            challenges_faced=data.get('challenges_faced', ''),
+            solutions_applied=data.get('solutions_applied', '')
+        )
+
+        assignment.status = 'completed'
+        assignment.completed_at = now
+        assignment.save(update_fields=['status', 'completed_at'])
+
+        task.status = 'completed'
+        task.completed_at = now
+        task.save(update_fields=['status', 'completed_at'])
+
+        record_transition('completed')
+        notify(
+            task.created_by_id, 'report_submitted', 'Reporte de Tarea Enviado',
+            f'{user.get_full_name()} completó la tarea: {task.title}', task
+        )
+
+    return report
+
+
+REVIEW_ACTIONS = ('approve', 'reject', 'needs_correction')
+REVIEWABLE_REPORT_STATUSES = ('pending_review', 'needs_correction')
+
+
+def review_report(report, reviewer, action, review_notes=''):
+    """Aplica la revisión de un reporte ('approve', 'reject' o 'needs_correction').
+
+    Devuelve None si el reporte ya fue revisado: el UPDATE solo cambia
+    reportes en REVIEWABLE_REPORT_STATUSES, así que de dos revisiones
+    simultáneas solo una suma contadores.
+    """
+    if action not in REVIEW_ACTIONS:
+        raise ValueError(action)
+
+    now = timezone.now()
+    with transaction.atomic():
+        report.status = {
+            'approve': 'approved',
+            'reject': 'rejected',
+            'needs_correction': 'needs_correction',
+        }[action]
+        report.reviewed_at = now
+        report.reviewed_by = reviewer
+        report.review_notes = review_notes
+        reviewed = TaskReport.objects.filter(
+            pk=report.pk, status__in=REVIEWABLE_REPORT_STATUSES
+        ).update(status=report.status, reviewed_at=now, reviewed_by=reviewer, review_notes=review_notes)
+        if not reviewed:
+            return None
+        record_transition({
+            'approve': 'approved',
+            'reject': 'report_rejected',
+            'needs_correction': 'needs_correction',
+        }[action])
+
+        if action == 'needs_correction':
+            return report
+
+        assignment = report.task_assignment
+        task = assignment.task
+
+        if action == 'approve':
+            assignment.status = 'approved'
+            assignment.approved_at = now
+            assignment.approved_by = reviewer
+            assignment.save(update_fields=['status', 'approved_at', 'approved_by'])
+
+            schedule_counter(assignment.assigned_to_id, 'tasks_completed')
+            record_worker_stats({assignment.assigned_to_id: {'approved': 1, 'hours_worked': report.hours_worked}})
+            notify(
+                assignment.assigned_to_id, 'task_approved', 'Tarea Aprobada',
+                f'Tu tarea "{task.title}" ha sido aprobada', task
+            )
+        else:
+            # Volver a asignada para corrección
+            assignment.status = 'assigned'
+            assignment.save(update_fields=['status'])
+
+            task.status = 'assigned'
+            task.save(update_fields=['status'])
+
+            notify(
+                assignment.assigned_to_id, 'system_message', 'Tarea Requiere Corrección',
+                f'Tu reporte para la tarea "{task.title}" requiere correcciones. Notas: {review_notes}',
+                task
+            )
+
+    return report
+
+
+BULK_REVIEW_MAX_ITEMS = 1000
+
+
+def bulk_review_reports(reviewer, items):
+    """Revisa varios reportes en una sola transacción.
+
+    ``items`` es una lista de ``{'report_id', 'action', 'review_notes'}``.
+    Los reportes se bloquean y cargan con una consulta, los cambios se
+    escriben con ``bulk_update``, los contadores de cada trabajador en un
+    trabajo como los de ``review_report`` y las notificaciones en un único
+    trabajo. Los
+    elementos no válidos se omiten; devuelve el resultado de cada uno en orden.
+    """
+    now = timezone.now()
+    results = []
+    reports_to_update = []
+    assignments_to_update = []
+    tasks_to_update = []
+    completed_by_worker = Counter()
+    hours_by_worker = Counter()
+    transitions = Counter()
+    notifications = []
+
+    with transaction.atomic():
+        reports = TaskReport.objects.select_for_update().select_related(
+            'task_assignment__task'
+        ).filter(
+            task_assignment__task__is_archived=False
+        ).in_bulk({item['report_id'] for item in items})
+        seen = set()
+
+        for item in items:
+            report_id, action = item['report_id'], item['action']
+            report = reports.get(report_id)
+            if report is None:
+                results.append({'report_id': report_id, 'success': False, 'error': 'Reporte no encontrado'})
+                continue
+            if report_id in seen:
+                results.append({'report_id': report_id, 'success': False, 'error': 'Reporte duplicado en la petición'})
+                continue
+            seen.add(report_id)
+            if report.status not in REVIEWABLE_REPORT_STATUSES:
+                results.append({'report_id': report_id, 'success': False, 'error': 'El reporte ya fue revisado'})
+                continue
+
+            review_notes = item.get('review_notes', '')
+            report.status = {
+                'approve': 'approved',
+                'reject': 'rejected',
+                'needs_correction': 'needs_correction',
+            }[action]
+            report.reviewed_at = now
+            report.reviewed_by = reviewer
+            report.review_notes = review_notes
+            reports_to_update.append(report)
+            transitions[{
+                'approve': 'approved',
+                'reject': 'report_rejected',
+                'needs_correction': 'needs_correction',
+            }[action]] += 1
+            results.append({'report_id': report_id, 'success': True, 'status': report.status})
+
+            if action == 'needs_correction':
+                continue
+
+            assignment = report.task_assignment
+            task = assignment.task
+            if action == 'approve':
+                assignment.status = 'approved'
+                assignment.approved_at = now
+                assignment.approved_by = reviewer
+                completed_by_worker[assignment.assigned_to_id] += 1
+                hours_by_worker[assignment.assigned_to_id] += report.hours_worked
+                notifications.append({
+                    'user_id': assignment.assigned_to_id,
+                    'notification_type': 'task_approved',
+                    'title': 'Tarea Aprobada',
+                    'message': f'Tu tarea "{task.title}" ha sido aprobada',
+                    'related_task_id': task.id,
+                })
+            else:
+                # Volver a asignada para corrección
+                assignment.status = 'assigned'
+                task.status = 'assigned'
+                tasks_to_update.append(task)
+                notifications.append({
+                    'user_id': assignment.assigned_to_id,
+                    'notification_type': 'system_message',
+                    'title': 'Tarea Requiere Corrección',
+                    'message': f'Tu reporte para la tarea "{task.title}" requiere correcciones. Notas: {review_notes}',
+                    'related_task_id': task.id,
+                })
+            assignments_to_update.append(assignment)
+
+        TaskReport.objects.bulk_update(
+            reports_to_update, ['status', 'reviewed_at', 'reviewed_by', 'review_notes']
+        )
+        TaskAssignment.objects.bulk_update(
+            assignments_to_update, ['status', 'approved_at', 'approved_by']
+        )
+        Task.objects.bulk_update(tasks_to_update, ['status'])
+
+        schedule_counters('tasks_completed', completed_by_worker)
+        record_worker_stats({
+            user_id: {'approved': approved, 'hours_worked': hours_by_worker[user_id]}
+            for user_id, approved in completed_by_worker.items()
+        })
+
+        if notifications:
+            enqueue('task.notify', {'notifications': notifications})
+        for transition, amount in transitions.items():
+            record_transition(transition, amount)
+
+    return results
+
+
+def release_worker_tasks(user, keep=0):
+    """Cancela las asignaciones abiertas del trabajador salvo las ``keep`` más antiguas.
+
+    Las tareas liberadas vuelven a pendiente; devuelve sus ids.
+    """
+    open_assignments = list(
+        TaskAssignment.objects.select_for_update().filter(
+            assigned_to=user,
+            status__in=ACTIVE_ASSIGNMENT_STATUSES
+        ).order_by('assigned_at', 'id').values_list('id', 'task_id')
+    )[keep:]
+    if not open_assignments:
+        return []
+
+    assignment_ids = [assignment_id for assignment_id, _ in open_assignments]
+    task_ids = [task_id for _, task_id in open_assignments]
+    TaskAssignment.objects.filter(id__in=assignment_ids).update(status='cancelled')
+    Task.objects.filter(id__in=task_ids).update(assigned_to=None, status='pending')
+    record_transition('released', len(task_ids))
+    return task_ids
+
+
+def redistribute_tasks(task_ids):
+    """Reparte tareas pendientes entre los trabajadores disponibles de su nivel.
+
+    Se respeta ``max_tasks`` y se elige siempre al trabajador con menos carga,
+    como en la asignación automática, pero con un número fijo de consultas:
+    las asignaciones se crean con ``bulk_create``, las tareas se escriben con
+    ``bulk_update`` y las notificaciones van en un único trabajo. Devuelve
+    ``{'moved': [{'task_id', 'assigned_to'}], 'unassigned': [task_id]}``.
+    """
+    now = timezone.now()
+    report = {'moved': [], 'unassigned': []}
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update()
+            .filter(id__in=task_ids, status='pending')
+            .order_by('-priority', 'created_at', 'id')
+        )
+        if not tasks:
+            return report
+
+        # Montículo por nivel con (carga actual, rechazos, id, límite)
+        candidates = defaultdict(list)
+        workers = User.objects.filter(
+            userprofile__role__in={task.difficulty for task in tasks},
+            userprofile__is_active_worker=True
+        ).annotate(
+            current_tasks=Count(
+                'task_assignments',
+                filter=Q(task_assignments__status__in=ACTIVE_ASSIGNMENT_STATUSES)
+            )
+        ).values_list(
+            'id', 'userprofile__role', 'current_tasks',
+            'userprofile__tasks_rejected', 'userprofile__max_tasks'
+        )
+        for user_id, role, current, rejected, max_tasks in workers:
+            if current < max_tasks:
+                candidates[role].append((current, rejected, user_id, max_tasks))
+        for heap in candidates.values():
+            heapq.heapify(heap)
+
+        # unique_together impide volver a asignar una tarea a quien ya la tuvo
+        previous = set(
+            TaskAssignment.objects.filter(task_id__in=[task.id for task in tasks])
+            .values_list('task_id', 'assigned_to_id')
+        )
+
+        assignments = []
+        assigned_count = Counter()
+        notifications = []
+        for task in tasks:
+            heap = candidates[task.difficulty]
+            skipped = []
+            chosen = None
+            while heap:
+                entry = heapq.heappop(heap)
+                if (task.id, entry[2]) in previous:
+                    skipped.append(entry)
+                    continue
+                chosen = entry
+                break
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+            if chosen is None:
+                report['unassigned'].append(task.id)
+                continue
+
+            current, rejected, user_id, max_tasks = chosen
+            if current + 1 < max_tasks:
+                heapq.heappush(heap, (current + 1, rejected, user_id, max_tasks))
+
+            task.assigned_to_id = user_id
+            task.status = 'assigned'
+            task.assigned_at = now
+            assignments.append(TaskAssignment(
+                task=task, assigned_to_id=user_id,
+                assigned_by_id=task.created_by_id, status='assigned'
+            ))
+            assigned_count[user_id] += 1
+            notifications.append({
+                'user_id': user_id,
+                'notification_type': 'task_assigned',
+                'title': 'Nueva Tarea Asignada',
+                'message': f'Se te ha asignado la tarea: {task.title} (reasignada automáticamente)',
+                'related_task_id': task.id,
+            })
+            report['moved'].append({'task_id': task.id, 'assigned_to': user_id})
+
+        moved = [task for task in tasks if task.status == 'assigned']
+        TaskAssignment.objects.bulk_create(assignments)
+        Task.objects.bulk_update(moved, ['assigned_to', 'status', 'assigned_at'])
+        increment_profile_counters('tasks_assigned', assigned_count)
+        if notifications:
+            enqueue('task.notify', {'notifications': notifications})
+        if moved:
+            record_transition('assigned', len(moved))
+        if report['unassigned']:
+            record_transition('assignment_failed', len(report['unassigned']))
+
+    return report
+
+
+def reassign_released_tasks(task_ids):
+    """Reparte las tareas liberadas en la transacción actual o, si son muchas, en segundo plano"""
+    report = {'released': len(task_ids), 'queued': False, 'moved': [], 'unassigned': []}
+    if not task_ids:
+        return report
+    if len(task_ids) > getattr(settings, 'REBALANCE_SYNC_LIMIT', 25):
+        enqueue('task.rebalance', {'task_ids': task_ids})
+        report['queued'] = True
+        return report
+    report.update(redistribute_tasks(task_ids))
+    return report
@@ -1,3 +1,711 @@
-from django.test import TestCase
+import re
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+from jobs.models import Job
+from jobs.queue import claim_jobs, run_job
+from login.models import UserProfile
+from login.views import AsyncCurrentUserView, CurrentUserView
+from .archiving import archive_tasks
+from .counters import reconcile_counters
+from .idempotency import idempotent
+from .models import (
+    ArchivedTask, ArchivedTaskAssignment, ArchivedTaskReport, CounterReconciliation, IdempotencyKey, Notification,
+    RenderedFragment, StaleCounter, Task, TaskAssignment, TaskReport, WorkerDailyStats, WorkerTotalStats
+)
+from .serializers import TaskCreateSerializer
+from .views import (
+    AsyncDashboardView, AsyncNotificationListView, AsyncStatisticsView, AsyncTaskDetailView,
+    AsyncTaskListView, DashboardView, NotificationListView, StatisticsView, TaskDetailView, TaskListView
+)
+from .services import (
+    assign_task_to_user, auto_assign_task, complete_task, create_task, reject_task, review_report
+)
+from .worker_stats import rebuild_worker_stats
+
+
+def make_user(username, role):
+    user = User.objects.create_user(username=username, password='secreto')
+    UserProfile.objects.filter(user=user).update(role=role)
+    return User.objects.select_related('userprofile').get(pk=user.pk)
+
+
+def drain_jobs():
+    """Ejecuta los trabajos en cola como lo haría ``manage.py run_jobs --once``"""
+    while True:
+        jobs = claim_jobs('tests', 100)
+        if not jobs:
+            return
+        for job in jobs:
+            run_job(job)
+
+
+@override_settings(REQUEST_THROTTLING=False)
+class WorkflowTestCase(TestCase):
+    """Un administrador, un trabajador 'regular' y una tarea asignada a él"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user('admin', 'admin')
+        self.worker = make_user('worker', 'regular')
+        self.task = Task.objects.create(
+            title='Tarea', description='Descripción', difficulty='regular', created_by=self.admin
+        )
+        assign_task_to_user(self.task, self.worker, self.admin)
+        self.assignment = TaskAssignment.objects.get(task=self.task, assigned_to=self.worker)
+        drain_jobs()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def complete(self):
+        return complete_task(self.task, self.assignment, self.worker, {
+            'report_text': 'Hecho', 'hours_worked': 3
+        })
+
+
+class ReportReviewTests(WorkflowTestCase):
+
+    def test_second_approve_changes_no_counters(self):
+        report = self.complete()
+        url = f'/api/tasks/reports/{report.id}/review/'
+
+        first = self.client.post(url, {'action': 'approve'}, format='json')
+        second = self.client.post(url, {'action': 'approve'}, format='json')
+        drain_jobs()
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 409)
+        self.assertEqual(UserProfile.objects.get(user=self.worker).tasks_completed, 1)
+        self.assertEqual(WorkerDailyStats.objects.get(user=self.worker).approved, 1)
+        self.assertEqual(WorkerDailyStats.objects.get(user=self.worker).hours_worked, 3)
+        self.assertFalse(Job.objects.exclude(status='done').exists())
+
+    def test_bulk_review_queues_counters_like_single_review(self):
+        first = self.complete()
+        second_task = Task.objects.create(
+            title='Otra', description='Descripción', difficulty='regular', created_by=self.admin
+        )
+        assign_task_to_user(second_task, self.worker, self.admin)
+        drain_jobs()
+        second = complete_task(
+            second_task, TaskAssignment.objects.get(task=second_task), self.worker,
+            {'report_text': 'Hecho', 'hours_worked': 2}
+        )
+        profile = UserProfile.objects.get(user=self.worker)
+
+        response = self.client.post('/api/tasks/reports/bulk-review/', {'reviews': [
+            {'report_id': first.id, 'action': 'approve'},
+            {'report_id': second.id, 'action': 'approve'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        # El contador va a la cola, igual que en review_report
+        profile.refresh_from_db()
+        self.assertEqual(profile.tasks_completed, 0)
+        self.assertEqual(
+            Job.objects.get(name='task.increment_counter', status='queued').payload,
+            {'field': 'tasks_completed', 'amounts': {str(self.worker.id): 2}}
+        )
+
+        drain_jobs()
+        profile.refresh_from_db()
+        self.assertEqual(profile.tasks_completed, 2)
+
+
+def count_writes(queries):
+    """{'INSERT': n, 'UPDATE': n} de las consultas capturadas"""
+    # executemany se registra como "N times: INSERT ..." y cuenta como una escritura
+    writes = Counter(
+        re.sub(r'^\d+ times: ', '', query['sql']).split(None, 1)[0].upper() for query in queries
+    )
+    return {'INSERT': writes['INSERT'], 'UPDATE': writes['UPDATE']}
+
+
+class _AssertWrites(CaptureQueriesContext):
+    """Compara al salir las escrituras capturadas con las esperadas"""
+
+    def __init__(self, test_case, expected):
+        super().__init__(connection)
+        self.test_case = test_case
+        self.expected = expected
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.test_case.assertEqual(count_writes(self.captured_queries), self.expected)
+
+
+class TransitionWritesTests(WorkflowTestCase):
+    """Escrituras de cada transición; los efectos secundarios van a la cola en un INSERT por trabajo.
+
+    Antes de task/services.py las vistas escribían, por petición (INSERT, UPDATE):
+    crear 3, 2 (con la asignación automática en línea), rechazar 3, 5 (con la
+    reasignación en línea), completar 2, 2 y aprobar 1, 3. Ahora crear y
+    asignar van por separado (2, 0 y 2, 2); rechazar y aprobar suman además
+    las dos filas de WorkerDailyStats/WorkerTotalStats.
+    """
+
+    def assertWrites(self, expected):
+        return _AssertWrites(self, expected)
+
+    def test_create(self):
+        serializer = TaskCreateSerializer(data={
+            'title': 'Nueva', 'description': 'Descripción', 'difficulty': 'regular'
+        })
+        serializer.is_valid(raise_exception=True)
+        # Tarea y trabajo de asignación automática
+        with self.assertWrites({'INSERT': 2, 'UPDATE': 0}):
+            create_task(serializer, self.admin)
+
+    def test_auto_assign(self):
+        task = Task.objects.create(
+            title='Nueva', description='Descripción', difficulty='regular', created_by=self.admin
+        )
+        # Asignación y notificación; tarea y contador del trabajador
+        with self.assertWrites({'INSERT': 2, 'UPDATE': 2}):
+            auto_assign_task(task)
+
+    def test_reject(self):
+        # Asignación y tarea; estadísticas diarias y totales; contador, notificación y reasignación en cola
+        with self.assertWrites({'INSERT': 5, 'UPDATE': 2}):
+            reject_task(self.task, self.assignment, self.worker, 'Sin tiempo')
+
+    def test_complete(self):
+        # Reporte y notificación en cola; asignación y tarea
+        with self.assertWrites({'INSERT': 2, 'UPDATE': 2}):
+            self.complete()
+
+    def test_review(self):
+        report = self.complete()
+        # Reporte y asignación; estadísticas diarias y totales; contador y notificación en cola
+        with self.assertWrites({'INSERT': 4, 'UPDATE': 2}):
+            review_report(report, self.admin, 'approve')
+
+
+class _FailingView(APIView):
+
+    @idempotent
+    def post(self, request):
+        if request.data.get('raise'):
+            raise RuntimeError('fallo')
+        return Response({'error': 'fallo'}, status=503)
+
+
+class IdempotencyTests(WorkflowTestCase):
+    """Idempotency-Key en la creación de tareas"""
+
+    body = {'title': 'Nueva', 'description': 'Descripción', 'difficulty': 'regular'}
+
+    def create(self, body=None, key='clave'):
+        return self.client.post(
+            '/api/tasks/create/', body or self.body, format='json', HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def created_tasks(self):
+        return Task.objects.filter(title='Nueva').count()
+
+    def test_replay_returns_stored_response(self):
+        first = self.create()
+        second = self.create()
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(self.created_tasks(), 1)
+
+    def test_different_body_is_rejected(self):
+        self.create()
+        response = self.create({**self.body, 'title': 'Otra'})
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(Task.objects.filter(title='Otra').exists())
+
+    def test_in_flight_key_conflicts(self):
+        self.create()
+        IdempotencyKey.objects.update(status_code=None, response_body=None)
+        response = self.create()
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(self.created_tasks(), 1)
+
+    @override_settings(IDEMPOTENCY_PENDING_SECONDS=60)
+    def test_abandoned_claim_is_reclaimed(self):
+        self.create()
+        IdempotencyKey.objects.update(
+            status_code=None, response_body=None, created_at=timezone.now() - timedelta(seconds=61)
+        )
+        response = self.create()
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(self.created_tasks(), 2)
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 201)
+
+    def test_expired_key_is_replaced(self):
+        self.create()
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+        response = self.create({**self.body, 'title': 'Otra'})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Task.objects.filter(title='Otra').exists())
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def post_failing(self, data):
+        request = APIRequestFactory().post('/', data, format='json', HTTP_IDEMPOTENCY_KEY='clave')
+        force_authenticate(request, self.admin)
+        return _FailingView.as_view()(request)
+
+    def test_server_error_releases_key(self):
+        self.assertEqual(self.post_failing({}).status_code, 503)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_exception_releases_key(self):
+        with self.assertRaises(RuntimeError):
+            self.post_failing({'raise': True})
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class AsyncViewTests(WorkflowTestCase):
+    """Con ASYNC_READ_VIEWS cada lectura devuelve lo mismo que su vista síncrona"""
+
+    def setUp(self):
+        super().setUp()
+        # Un reporte aprobado para que las clasificaciones no estén vacías
+        review_report(self.complete(), self.admin, 'approve')
+        drain_jobs()
+
+    def assertSamePayload(self, sync_view, async_view, user, path='/', **kwargs):
+        def request():
+            # Cada petición con el usuario recién cargado, como hace la autenticación
+            request = APIRequestFactory().get(path)
+            force_authenticate(request, User.objects.select_related('userprofile').get(pk=user.pk))
+            return request
+
+        sync_response = sync_view.as_view()(request(), **kwargs)
+        async_response = async_to_sync(async_view.as_view())(request(), **kwargs)
+        self.assertEqual(sync_response.status_code, 200)
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.data, sync_response.data)
+
+    def test_task_list(self):
+        for user in (self.admin, self.worker):
+            with self.subTest(user=user.username):
+                self.assertSamePayload(TaskListView, AsyncTaskListView, user)
+
+    def test_task_detail(self):
+        self.assertSamePayload(TaskDetailView, AsyncTaskDetailView, self.worker, task_id=self.task.id)
+
+    def test_notification_list(self):
+        self.assertSamePayload(NotificationListView, AsyncNotificationListView, self.worker)
+
+    def test_statistics(self):
+        self.assertSamePayload(StatisticsView, AsyncStatisticsView, self.admin, '/?window=7')
+
+    def test_dashboard(self):
+        for user in (self.admin, self.worker):
+            with self.subTest(user=user.username):
+                self.assertSamePayload(DashboardView, AsyncDashboardView, user)
+
+    def test_current_user(self):
+        self.assertSamePayload(CurrentUserView, AsyncCurrentUserView, self.worker)
+
+
+class ArchiveTests(WorkflowTestCase):
+    """Borrado lógico, archivo en frío y volcado de las tareas eliminadas"""
+
+    def delete(self, task):
+        response = self.client.delete(f'/api/tasks/{task.id}/delete/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_deleted_task_is_hidden_from_live_views(self):
+        self.delete(self.task)
+
+        self.assertEqual(self.client.get('/api/tasks/').json(), [])
+        self.assertEqual(self.client.get(f'/api/tasks/{self.task.id}/').status_code, 404)
+        self.assertEqual(self.client.get('/api/tasks/statistics/').json()['general']['total_tasks'], 0)
+        # Las filas siguen ahí, con la asignación abierta cancelada
+        self.assertTrue(Task.all_objects.get(pk=self.task.pk).is_archived)
+        self.assertEqual(TaskAssignment.objects.get(pk=self.assignment.pk).status, 'cancelled')
+
+    def test_archive_tasks_moves_finished_and_deleted_tasks(self):
+        review_report(self.complete(), self.admin, 'approve')
+        Task.objects.filter(pk=self.task.pk).update(completed_at=timezone.now() - timedelta(days=31))
+        recent = Task.objects.create(
+            title='Reciente', description='Descripción', difficulty='regular', created_by=self.admin,
+            status='cancelled', completed_at=timezone.now()
+        )
+        deleted = Task.objects.create(
+            title='Eliminada', description='Descripción', difficulty='regular', created_by=self.admin
+        )
+        self.delete(deleted)
+        drain_jobs()
+
+        totals = archive_tasks(older_than_days=30, batch_size=1)
+
+        self.assertEqual(totals, {'tasks': 2, 'assignments': 1, 'reports': 1})
+        self.assertEqual(
+            dict(ArchivedTask.objects.values_list('id', 'reason')),
+            {self.task.id: 'approved', deleted.id: 'deleted'}
+        )
+        self.assertEqual(list(Task.all_objects.values_list('id', flat=True)), [recent.id])
+        self.assertTrue(ArchivedTaskAssignment.objects.filter(pk=self.assignment.pk).exists())
+        self.assertEqual(ArchivedTaskReport.objects.count(), 1)
+        self.assertFalse(TaskReport.objects.exists())
+        self.assertFalse(Notification.objects.filter(related_task_id=self.task.id).exists())
+        self.assertEqual(archive_tasks(older_than_days=30), {'tasks': 0, 'assignments': 0, 'reports': 0})
+
+        response = self.client.get('/api/tasks/archive/?reason=approved')
+        self.assertEqual([task['id'] for task in response.json()['results']], [self.task.id])
+
+    def test_dump_restores_deleted_tasks(self):
+        self.delete(self.task)
+        with tempfile.NamedTemporaryFile('w+', suffix='.json') as dump:
+            call_command('dumpdata', 'task.task', 'task.taskassignment', stdout=dump)
+            dump.flush()
+            TaskAssignment.objects.all().delete()
+            Task.all_objects.all().delete()
+            call_command('loaddata', dump.name, verbosity=0)
+
+        task = Task.all_objects.get(pk=self.task.pk)
+        self.assertTrue(task.is_archived)
+        self.assertEqual(task.assignments.get().pk, self.assignment.pk)
+        self.assertFalse(Task.objects.exists())
+
+
+class RenderingTests(WorkflowTestCase):
+    """Fragmentos de reportes aprobados: se sirven tal cual y se borran al cambiar"""
+
+    def setUp(self):
+        super().setUp()
+        self.report = review_report(self.complete(), self.admin, 'approve')
+        drain_jobs()
+
+    def list_reports(self):
+        response = self.client.get('/api/tasks/reports/?status=approved')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def fragment(self):
+        return RenderedFragment.objects.filter(kind='report', object_id=self.report.id)
+
+    def test_cached_fragment_is_served(self):
+        first, = self.list_reports()
+        self.assertEqual(first['task_title'], 'Tarea')
+        self.assertTrue(self.fragment().exists())
+
+        # Lo que se sirve es el fragmento guardado, no una nueva serialización
+        self.fragment().update(payload=b'{"id":%d,"cached":true}' % self.report.id)
+        self.assertEqual(self.list_reports(), [{'id': self.report.id, 'cached': True}])
+
+    def test_pending_reports_are_not_cached(self):
+        task = Task.objects.create(title='Otra', description='Descripción', difficulty='regular', created_by=self.admin)
+        assign_task_to_user(task, self.worker, self.admin)
+        drain_jobs()
+        pending = complete_task(task, TaskAssignment.objects.get(task=task), self.worker, {
+            'report_text': 'Hecho', 'hours_worked': 1
+        })
+
+        response = self.client.get('/api/tasks/reports/?status=all')
+
+        self.assertEqual([report['id'] for report in response.json()['results']], [pending.id, self.report.id])
+        self.assertEqual(list(RenderedFragment.objects.values_list('object_id', flat=True)), [self.report.id])
+
+    def test_missing_rows_load_in_chunks(self):
+        task = Task.objects.create(title='Otra', description='Descripción', difficulty='regular', created_by=self.admin)
+        assign_task_to_user(task, self.worker, self.admin)
+        drain_jobs()
+        other = review_report(complete_task(task, TaskAssignment.objects.get(task=task), self.worker, {
+            'report_text': 'Hecho', 'hours_worked': 1
+        }), self.admin, 'approve')
+
+        with mock.patch('task.rendering.RENDER_IN_LIMIT', 1):
+            reports = self.list_reports()
+
+        self.assertEqual({report['id'] for report in reports}, {self.report.id, other.id})
+        self.assertEqual(RenderedFragment.objects.count(), 2)
+
+    def assertForgotten(self, change):
+        self.list_reports()
+        self.assertTrue(self.fragment().exists())
+        change()
+        self.assertFalse(self.fragment().exists())
+
+    def test_renamed_worker_is_forgotten(self):
+        def rename():
+            self.worker.first_name = 'Nuevo'
+            self.worker.save(update_fields=['first_name'])
+        self.assertForgotten(rename)
+        self.assertEqual(self.list_reports()[0]['assigned_to_name'], 'Nuevo')
+
+    def test_other_user_changes_keep_fragment(self):
+        self.list_reports()
+        self.worker.save(update_fields=['last_login'])
+        self.assertTrue(self.fragment().exists())
+
+    def test_renamed_task_is_forgotten(self):
+        def retitle():
+            self.task.refresh_from_db()
+            self.task.title = 'Tarea nueva'
+            self.task.save(update_fields=['title'])
+        self.assertForgotten(retitle)
+        self.assertEqual(self.list_reports()[0]['task_title'], 'Tarea nueva')
+
+    def test_reviewed_report_is_forgotten(self):
+        def review():
+            self.report.review_notes = 'Revisado de nuevo'
+            self.report.save(update_fields=['review_notes'])
+        self.assertForgotten(review)
+
+    def test_deleted_reviewer_is_forgotten(self):
+        # El reporte se conserva con el revisor a NULL
+        reviewer = make_user('reviewer', 'admin')
+        TaskReport.objects.filter(pk=self.report.pk).update(reviewed_by=reviewer)
+        self.assertForgotten(reviewer.delete)
+        self.assertIsNone(self.list_reports()[0]['reviewed_by'])
+
+
+class WorkloadTests(WorkflowTestCase):
+    """Matriz de carga: recuentos por trabajador, páginas y caché"""
+
+    def setUp(self):
+        super().setUp()
+        self.trainee = make_user('trainee', 'adiestrado')
+        self.expert = make_user('expert', 'especialista')
+        Task.objects.filter(pk=self.task.pk).update(estimated_hours=4)
+        rejected = Task.objects.create(
+            title='Rechazada', description='Descripción', difficulty='regular', created_by=self.admin
+        )
+        assign_task_to_user(rejected, self.worker, self.admin)
+        reject_task(rejected, TaskAssignment.objects.get(task=rejected, assigned_to=self.worker), self.worker, 'No puedo')
+        drain_jobs()
+
+    def workload(self, query=''):
+        response = self.client.get(f'/api/tasks/workload/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_counts_per_worker(self):
+        rows = {row['username']: row for row in self.workload()['results']}
+
+        # Solo los roles de trabajador, sin los administradores
+        self.assertEqual(set(rows), {'trainee', 'worker', 'expert'})
+        worker = rows['worker']
+        self.assertEqual(worker['assignments']['assigned'], 1)
+        self.assertEqual(worker['assignments']['rejected'], 1)
+        self.assertEqual(worker['active'], 1)
+        self.assertEqual(worker['outstanding_hours'], 4)
+        self.assertEqual(worker['remaining_capacity'], 4)
+        self.assertEqual(worker['rejection_ratio'], 0.5)
+        self.assertEqual(rows['expert']['active'], 0)
+        self.assertEqual(rows['expert']['remaining_capacity'], 5)
+
+    def test_pages_follow_role_order(self):
+        first = self.workload('?page_size=2')
+        second = self.workload('?page_size=2&page=2')
+
+        self.assertTrue(first['has_next'])
+        self.assertEqual([row['username'] for row in first['results']], ['trainee', 'worker'])
+        self.assertFalse(second['has_next'])
+        self.assertEqual([row['username'] for row in second['results']], ['expert'])
+        self.assertEqual([row['username'] for row in self.workload('?role=regular')['results']], ['worker'])
+        self.assertEqual(self.client.get('/api/tasks/workload/?role=admin').status_code, 400)
+
+    def test_matrix_is_cached_per_page(self):
+        first = self.workload()
+        Task.objects.filter(pk=self.task.pk).update(estimated_hours=9)
+
+        # Hasta que caduca se sirve la misma matriz, aunque cambien los datos
+        self.assertEqual(self.workload(), first)
+        # Otra página u otro filtro es otra entrada
+        self.assertEqual(self.workload('?role=regular')['results'][0]['outstanding_hours'], 9)
+
+        cache.clear()
+        refreshed = {row['username']: row for row in self.workload()['results']}
+        self.assertEqual(refreshed['worker']['outstanding_hours'], 9)
+
+    def test_workers_cannot_see_the_matrix(self):
+        self.client.force_authenticate(self.worker)
+        self.assertEqual(self.client.get('/api/tasks/workload/').status_code, 403)
+
+
+class CounterReconciliationTests(WorkflowTestCase):
+    """reconcile_counters frente a contadores desviados de las asignaciones"""
+
+    def counters(self, user):
+        return UserProfile.objects.filter(user=user).values(
+            'tasks_assigned', 'tasks_completed', 'tasks_rejected'
+        ).get()
+
+    def test_drift_is_detected_and_fixed(self):
+        expected = self.counters(self.worker)
+        self.assertEqual(expected['tasks_assigned'], 1)
+        UserProfile.objects.filter(user=self.worker).update(tasks_assigned=7, tasks_rejected=3)
+
+        report = reconcile_counters(dry_run=True)
+        self.assertEqual(report.corrected, 1)
+        self.assertEqual(report.drift['users'], [{
+            'user_id': self.worker.id, 'username': 'worker',
+            'tasks_assigned': {'stored': 7, 'delta': -6}, 'tasks_rejected': {'stored': 3, 'delta': -3},
+        }])
+        self.assertEqual(self.counters(self.worker)['tasks_assigned'], 7)
+        self.assertFalse(CounterReconciliation.objects.exists())
+
+        run = reconcile_counters()
+        self.assertEqual(run.corrected, 1)
+        self.assertEqual(run.drift['fields']['tasks_assigned'], {'users': 1, 'net': -6, 'absolute': 6})
+        self.assertEqual(self.counters(self.worker), expected)
+        self.assertEqual(reconcile_counters().corrected, 0)
+
+    def test_queued_increments_are_not_counted_twice(self):
+        review_report(self.complete(), self.admin, 'approve')
+        self.assertEqual(self.counters(self.worker)['tasks_completed'], 0)
+
+        # El incremento en cola ya cuenta la aprobación
+        self.assertEqual(reconcile_counters().corrected, 0)
+        drain_jobs()
+        self.assertEqual(self.counters(self.worker)['tasks_completed'], 1)
+        self.assertEqual(reconcile_counters().corrected, 0)
+
+    def test_incremental_run_checks_touched_and_stale_users(self):
+        reconcile_counters()
+        UserProfile.objects.filter(user=self.admin).update(tasks_assigned=5)
+        # Borrar al creador de la tarea se lleva la asignación del trabajador
+        creator = make_user('creator', 'admin')
+        Task.objects.filter(pk=self.task.pk).update(created_by=creator)
+        creator.delete()
+        self.assertTrue(StaleCounter.objects.filter(user=self.worker).exists())
+
+        run = reconcile_counters(incremental=True)
+
+        self.assertEqual(run.mode, 'incremental')
+        self.assertEqual(run.checked, 1)
+        self.assertEqual(self.counters(self.worker)['tasks_assigned'], 0)
+        self.assertFalse(StaleCounter.objects.exists())
+        # Sin cambios en sus asignaciones no se revisa hasta la conciliación completa
+        self.assertEqual(self.counters(self.admin)['tasks_assigned'], 5)
+        self.assertEqual(reconcile_counters().corrected, 1)
+        self.assertEqual(self.counters(self.admin)['tasks_assigned'], 0)
+
+
+class WorkerStatsTests(WorkflowTestCase):
+    """Clasificaciones por ventana desde las estadísticas diarias y su reconstrucción"""
+
+    def board(self, window, key='top_completers'):
+        response = self.client.get(f'/api/tasks/statistics/?window={window}')
+        self.assertEqual(response.status_code, 200)
+        return [(entry['username'], entry['total']) for entry in response.json()[key]]
+
+    def stats(self):
+        return (
+            set(WorkerDailyStats.objects.values_list('user_id', 'day', 'approved', 'rejected', 'hours_worked')),
+            set(WorkerTotalStats.objects.values_list('user_id', 'approved', 'rejected', 'hours_worked')),
+        )
+
+    def test_windows_group_daily_rows(self):
+        review_report(self.complete(), self.admin, 'approve')
+        veteran = make_user('veteran', 'regular')
+        WorkerDailyStats.objects.create(
+            user=veteran, day=timezone.localdate() - timedelta(days=10), approved=3, hours_worked=12
+        )
+        WorkerTotalStats.objects.create(user=veteran, approved=3, hours_worked=12)
+
+        self.assertEqual(self.board('7'), [('worker', 1)])
+        self.assertEqual(self.board('7', 'top_hours'), [('worker', 3)])
+        self.assertEqual(self.board('30'), [('veteran', 3), ('worker', 1)])
+        self.assertEqual(self.board('all', 'top_hours'), [('veteran', 12), ('worker', 3)])
+        self.assertEqual(self.board('all', 'top_rejecters'), [])
+        self.assertEqual(self.client.get('/api/tasks/statistics/?window=90').status_code, 400)
+
+    def test_rebuild_matches_raw_assignments(self):
+        review_report(self.complete(), self.admin, 'approve')
+        rejected = Task.objects.create(
+            title='Rechazada', description='Descripción', difficulty='regular', created_by=self.admin
+        )
+        assign_task_to_user(rejected, self.worker, self.admin)
+        reject_task(rejected, TaskAssignment.objects.get(task=rejected, assigned_to=self.worker), self.worker, 'No')
+        drain_jobs()
+
+        # Lo acumulado al revisar coincide con lo recalculado desde las asignaciones
+        recorded = self.stats()
+        self.assertEqual(rebuild_worker_stats(), 1)
+        self.assertEqual(self.stats(), recorded)
+
+        # Y la reconstrucción sigue a las asignaciones, no a las tablas
+        TaskAssignment.objects.filter(pk=self.assignment.pk).update(
+            approved_at=timezone.now() - timedelta(days=40)
+        )
+        WorkerDailyStats.objects.update(approved=9)
+        WorkerTotalStats.objects.all().delete()
+        rebuild_worker_stats()
+
+        today = timezone.localdate()
+        self.assertEqual(self.stats(), (
+            {(self.worker.id, today - timedelta(days=40), 1, 0, 3), (self.worker.id, today, 0, 1, 0)},
+            {(self.worker.id, 1, 1, 3)},
+        ))
+        self.assertEqual(self.board('30'), [])
+        self.assertEqual(self.board('365'), [('worker', 1)])
+
+
+class ReportListTests(WorkflowTestCase):
+    """Listado de revisión: pestañas con sus contadores y páginas"""
+
+    def setUp(self):
+        super().setUp()
+        self.reports = [self.complete()]
+        for number in range(4):
+            task = Task.objects.create(
+                title=f'Tarea {number}', description='Descripción', difficulty='regular', created_by=self.admin
+            )
+            assign_task_to_user(task, self.worker, self.admin)
+            self.reports.append(complete_task(task, TaskAssignment.objects.get(task=task), self.worker, {
+                'report_text': 'Hecho', 'hours_worked': 1
+            }))
+        review_report(self.reports[0], self.admin, 'approve')
+        review_report(self.reports[1], self.admin, 'needs_correction')
+        # Los reportes de una tarea eliminada no se revisan ni se cuentan
+        self.client.delete(f'/api/tasks/{self.reports[4].task_assignment.task_id}/delete/')
+        drain_jobs()
+
+    def list_reports(self, query=''):
+        response = self.client.get(f'/api/tasks/reports/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_counts_cover_every_status(self):
+        expected = {'pending_review': 2, 'approved': 1, 'rejected': 0, 'needs_correction': 1, 'all': 4}
+        # Los mismos contadores en cualquier pestaña
+        for tab in ('', '?status=approved', '?status=all'):
+            with self.subTest(tab):
+                self.assertEqual(self.list_reports(tab)['counts'], expected)
+        self.assertEqual(self.client.get('/api/tasks/reports/?status=archived').status_code, 400)
+
+    def test_pending_is_the_default_tab(self):
+        pending = self.list_reports()['results']
+        self.assertEqual([report['id'] for report in pending], [self.reports[3].id, self.reports[2].id])
+        # Sin los textos largos, que están en el detalle
+        self.assertNotIn('report_text', pending[0])
+
+    def test_pages_are_newest_first(self):
+        first = self.list_reports('?status=all&page_size=3')
+        second = self.list_reports('?status=all&page_size=3&page=2')
+
+        self.assertEqual(
+            {key: first[key] for key in ('page', 'page_size', 'has_next')},
+            {'page': 1, 'page_size': 3, 'has_next': True}
+        )
+        self.assertEqual(
+            [report['id'] for report in first['results'] + second['results']],
+            [report.id for report in reversed(self.reports[:4])]
+        )
+        self.assertFalse(second['has_next'])
+        self.assertEqual(self.list_reports('?page_size=500')['page_size'], 200)
@@ -1,15 +1,21 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     TaskListView, TaskCreateView, TaskDetailView, TaskRejectView, TaskCompleteView,
-    ReportReviewView, NotificationListView, StatisticsView, TaskUpdateView, 
-    TaskDeleteView
+    ReportReviewView, ReportDetailView, NotificationListView, StatisticsView, TaskUpdateView, 
+    TaskDeleteView, BulkReportReviewView, AsyncTaskListView, AsyncTaskDetailView,
+    AsyncNotificationListView, AsyncStatisticsView, ArchivedTaskListView, ArchivedTaskDetailView,
+    WorkloadView
 )
 
+# Con ASYNC_READ_VIEWS las lecturas más frecuentes usan su versión asíncrona
+ASYNC = settings.ASYNC_READ_VIEWS
+
 urlpatterns = [
     # Tareas
-    path('', TaskListView.as_view(), name='task-list'),
+    path('', (AsyncTaskListView if ASYNC else TaskListView).as_view(), name='task-list'),
     path('create/', TaskCreateView.as_view(), name='task-create'),
-    path('<int:task_id>/', TaskDetailView.as_view(), name='task-detail'),
+    path('<int:task_id>/', (AsyncTaskDetailView if ASYNC else TaskDetailView).as_view(), name='task-detail'),
     path('<int:task_id>/update/', TaskUpdateView.as_view(), name='task-update'),
     path('<int:task_id>/delete/', TaskDeleteView.as_view(), name='task-delete'),
     path('<int:task_id>/reject/', TaskRejectView.as_view(), name='task-reject'),
@@ -17,11 +23,18 @@ urlpatterns = [
     
     # Reportes
     path('reports/', ReportReviewView.as_view(), name='report-list'),
+    path('reports/<int:report_id>/', ReportDetailView.as_view(), name='report-detail'),
     path('reports/<int:report_id>/review/', ReportReviewView.as_view(), name='report-review'),
+    path('reports/bulk-review/', BulkReportReviewView.as_view(), name='report-bulk-review'),
+    
+    # Archivo (solo lectura)
+    path('archive/', ArchivedTaskListView.as_view(), name='archived-task-list'),
+    path('archive/<int:task_id>/', ArchivedTaskDetailView.as_view(), name='archived-task-detail'),
     
     # Notificaciones
-    path('notifications/', NotificationListView.as_view(), name='notification-list'),
+    path('notifications/', (AsyncNotificationListView if ASYNC else NotificationListView).as_view(), name='notification-list'),
     
     # Estadísticas
-    path('statistics/', StatisticsView.as_view(), name='statistics'),
+    path('statistics/', (AsyncStatisticsView if ASYNC else StatisticsView).as_view(), name='statistics'),
+    path('workload/', WorkloadView.as_view(), name='workload'),
 ]
\ No newline at end of file
@@ -1,40 +1,74 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Count, F
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, Case, Count, OuterRef, Prefetch, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse
 from django.utils import timezone
 from django.contrib.auth.models import User
-from .models import Task, TaskAssignment, TaskReport, Notification
+from django_crud_api.async_views import AsyncAPIView, aget_profile, alist
+from django_crud_api.pagination import page_params, paginate, positive_int
+from django_crud_api.queries import count_subquery
+from django_crud_api.routers import ReplicaReadMixin
+from login.models import UserProfile
+from login.serializers import UserSerializer
+from .models import Task, TaskAssignment, TaskReport, Notification, ArchivedTask, ArchivedTaskAssignment
+from .idempotency import idempotent
+from .rendering import json_page, render_rows, with_fragments
 from .serializers import (
-    TaskSerializer, TaskAssignmentSerializer, TaskReportSerializer,
+    TaskSerializer, TaskReportSerializer,
     NotificationSerializer, TaskCreateSerializer, TaskRejectionSerializer,
-    TaskCompletionSerializer, UserBasicSerializer
+    TaskCompletionSerializer, UserBasicSerializer, BulkReportReviewSerializer,
+    ArchivedTaskDetailSerializer, with_current_assignment
 )
-from login.models import UserProfile
+from .services import (
+    create_task, update_task, delete_task, reject_task, complete_task,
+    review_report, bulk_review_reports, REVIEW_ACTIONS, ACTIVE_ASSIGNMENT_STATUSES
+)
+from .worker_stats import LEADERBOARD_WINDOWS, leaderboard
 
-class TaskListView(APIView):
+def visible_tasks(user, user_profile):
+    if user_profile.role in ['admin', 'superuser']:
+        # Administradores ven todas las tareas
+        tasks = Task.objects.all()
+    else:
+        # Trabajadores ven solo sus tareas asignadas
+        tasks = Task.objects.filter(
+            Q(assigned_to=user) | 
+            Q(assignments__assigned_to=user)
+        ).distinct()
+    return with_current_assignment(tasks)
+
+class TaskListView(ReplicaReadMixin, APIView):
+    cost_class = 'expensive'
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user_profile = request.user.userprofile
-        
-        if user_profile.role in ['admin', 'superuser']:
-            # Administradores ven todas las tareas
-            tasks = Task.objects.all()
-        else:
-            # Trabajadores ven solo sus tareas asignadas
-            tasks = Task.objects.filter(
-                Q(assigned_to=request.user) | 
-                Q(assignments__assigned_to=request.user)
-            ).distinct()
-        
+        tasks = visible_tasks(request.user, request.user.userprofile)
+        serializer = TaskSerializer(tasks, many=True)
+        return Response(serializer.data)
+
+class AsyncTaskListView(ReplicaReadMixin, AsyncAPIView):
+    cost_class = 'expensive'
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        user_profile = await aget_profile(request.user)
+        tasks = await alist(visible_tasks(request.user, user_profile))
         serializer = TaskSerializer(tasks, many=True)
         return Response(serializer.data)
 
 class TaskCreateView(APIView):
+    cost_class = 'standard'
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         user_profile = request.user.userprofile
         
@@ -47,81 +81,23 @@ class TaskCreateView(APIView):
         
         serializer = TaskCreateSerializer(data=request.data)
         if serializer.is_valid():
-            task = serializer.save(created_by=request.user)
+            # La asignación automática se procesa en segundo plano
+            task = create_task(serializer, request.user)
             
-            # Intentar asignar automáticamente la tarea
-            assigned_user = self.assign_task_automatically(task)
-            
-            if assigned_user:
-                task.assigned_to = assigned_user
-                task.status = 'assigned'
-                task.assigned_at = timezone.now()
-                task.save()
-                
-                # Crear notificación
-                Notification.objects.create(
-                    user=assigned_user,
-                    notification_type='task_assigned',
-                    title='Nueva Tarea Asignada',
-                    message=f'Se te ha asignado la tarea: {task.title}',
-                    related_task=task
-                )
-                
-                return Response(
-                    {'message': 'Tarea creada y asignada automáticamente', 'task': TaskSerializer(task).data},
-                    status=status.HTTP_201_CREATED
-                )
-            else:
-                task.status = 'pending'
-                task.save()
-                return Response(
-                    {'message': 'Tarea creada pero no se pudo asignar automáticamente', 'task': TaskSerializer(task).data},
-                    status=status.HTTP_201_CREATED
-                )
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
-    def assign_task_automatically(self, task):
-        """Asigna automáticamente la tarea a un usuario disponible del nivel correspondiente"""
-        # Buscar usuarios con el rol que coincide con la dificultad de la tarea
-        users = User.objects.filter(
-            userprofile__role=task.difficulty,
-            userprofile__is_active_worker=True
-        ).annotate(
-            current_tasks=Count(
-                'assigned_tasks', 
-                filter=Q(assigned_tasks__status__in=['assigned', 'in_progress'])
+            return Response(
+                {'message': 'Tarea creada, la asignación automática está en proceso', 'task': TaskSerializer(task).data},
+                status=status.HTTP_201_CREATED
             )
-        ).filter(
-            current_tasks__lt=F('userprofile__max_tasks')
-        ).order_by('current_tasks', 'userprofile__tasks_rejected')
-        
-        for user in users:
-            # Verificar manualmente que puede aceptar más tareas (doble verificación)
-            profile = user.userprofile
-            if profile.current_task_count < profile.max_tasks:
-                # Crear la asignación
-                assignment = TaskAssignment.objects.create(
-                    task=task,
-                    assigned_to=user,
-                    assigned_by=task.created_by,
-                    status='assigned'
-                )
-                
-                # Actualizar contadores
-                profile.tasks_assigned += 1
-                profile.save()
-                
-                return user
         
-        return None
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class TaskDetailView(APIView):
+    cost_class = 'cheap'
     permission_classes = [IsAuthenticated]
 
     def get(self, request, task_id):
         try:
-            task = Task.objects.get(id=task_id)
+            task = with_current_assignment(Task.objects.all()).get(id=task_id)
         except Task.DoesNotExist:
             return Response(
                 {'error': 'Tarea no encontrada'}, 
@@ -130,7 +106,34 @@ class TaskDetailView(APIView):
         
         # Verificar permisos
         user_profile = request.user.userprofile
-        if user_profile.role not in ['admin', 'superuser'] and task.assigned_to != request.user:
+        if user_profile.role not in ['admin', 'superuser'] and task.assigned_to_id != request.user.id:
+            return Response(
+                {'error': 'No tienes permisos para ver esta tarea'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = TaskSerializer(task)
+        return Response(serializer.data)
+
+class AsyncTaskDetailView(AsyncAPIView):
+    cost_class = 'cheap'
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, task_id):
+        # Perfil y tarea son independientes: se piden a la vez
+        try:
+            user_profile, task = await asyncio.gather(
+                aget_profile(request.user),
+                with_current_assignment(Task.objects.all()).aget(id=task_id)
+            )
+        except Task.DoesNotExist:
+            return Response(
+                {'error': 'Tarea no encontrada'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        # Verificar permisos
+        if user_profile.role not in ['admin', 'superuser'] and task.assigned_to_id != request.user.id:
             return Response(
                 {'error': 'No tienes permisos para ver esta tarea'}, 
                 status=status.HTTP_403_FORBIDDEN
@@ -140,6 +143,7 @@ class TaskDetailView(APIView):
         return Response(serializer.data)
 
 class TaskUpdateView(APIView):
+    cost_class = 'standard'
     permission_classes = [IsAuthenticated]
 
     def put(self, request, task_id):
@@ -162,94 +166,52 @@ class TaskUpdateView(APIView):
 
         serializer = TaskCreateSerializer(task, data=request.data, partial=True)
         if serializer.is_valid():
-            updated_task = serializer.save()
-            
             # Si se cambió la dificultad o se reasignó manualmente, actualizar asignación
-            if 'difficulty' in request.data or 'assigned_to' in request.data:
-                # Cancelar asignaciones existentes
-                TaskAssignment.objects.filter(
-                    task=task, 
-                    status__in=['assigned', 'in_progress']
-                ).update(status='cancelled')
+            reassign = 'difficulty' in request.data or 'assigned_to' in request.data
+            assigned_user = None
+            
+            # Si se asignó manualmente a un usuario
+            if 'assigned_to' in request.data and request.data['assigned_to']:
+                try:
+                    assigned_user = User.objects.select_related('userprofile').get(
+                        id=request.data['assigned_to']
+                    )
+                except User.DoesNotExist:
+                    return Response(
+                        {'error': 'Usuario asignado no encontrado'}, 
+                        status=status.HTTP_404_NOT_FOUND
+                    )
                 
-                # Si se asignó manualmente a un usuario
-                if 'assigned_to' in request.data and request.data['assigned_to']:
-                    assigned_to_id = request.data['assigned_to']
-                    try:
-                        assigned_user = User.objects.get(id=assigned_to_id)
-                        
-                        # Verificar que el usuario puede aceptar la tarea
-                        if (assigned_user.userprofile.role == updated_task.difficulty and 
-                            assigned_user.userprofile.can_accept_more_tasks):
-                            
-                            # Crear nueva asignación
-                            assignment = TaskAssignment.objects.create(
-                                task=updated_task,
-                                assigned_to=assigned_user,
-                                assigned_by=request.user,
-                                status='assigned'
-                            )
-                            
-                            updated_task.assigned_to = assigned_user
-                            updated_task.status = 'assigned'
-                            updated_task.assigned_at = timezone.now()
-                            updated_task.save()
-                            
-                            # Actualizar contadores
-                            profile = assigned_user.userprofile
-                            profile.tasks_assigned += 1
-                            profile.save()
-                            
-                            # Notificar al usuario
-                            Notification.objects.create(
-                                user=assigned_user,
-                                notification_type='task_assigned',
-                                title='Tarea Reasignada',
-                                message=f'Se te ha reasignado la tarea: {updated_task.title}',
-                                related_task=updated_task
-                            )
-                            
-                            return Response({
-                                'message': 'Tarea actualizada y reasignada manualmente',
-                                'task': TaskSerializer(updated_task).data
-                            })
-                        else:
-                            return Response(
-                                {'error': 'El usuario seleccionado no puede aceptar esta tarea'}, 
-                                status=status.HTTP_400_BAD_REQUEST
-                            )
-                            
-                    except User.DoesNotExist:
-                        return Response(
-                            {'error': 'Usuario asignado no encontrado'}, 
-                            status=status.HTTP_404_NOT_FOUND
-                        )
-                else:
-                    # Si no se asignó manualmente, intentar asignación automática
-                    task_creator = TaskCreateView()
-                    new_assignee = task_creator.assign_task_automatically(updated_task)
-                    
-                    if new_assignee:
-                        return Response({
-                            'message': 'Tarea actualizada y reasignada automáticamente',
-                            'task': TaskSerializer(updated_task).data
-                        })
-                    else:
-                        updated_task.status = 'pending'
-                        updated_task.save()
-                        return Response({
-                            'message': 'Tarea actualizada pero no se pudo reasignar automáticamente',
-                            'task': TaskSerializer(updated_task).data
-                        })
+                # Verificar que el usuario puede aceptar la tarea
+                difficulty = serializer.validated_data.get('difficulty', task.difficulty)
+                if (assigned_user.userprofile.role != difficulty or 
+                    not assigned_user.userprofile.can_accept_more_tasks):
+                    return Response(
+                        {'error': 'El usuario seleccionado no puede aceptar esta tarea'}, 
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+            
+            updated_task = update_task(
+                task, serializer.validated_data,
+                reassign=reassign, assigned_user=assigned_user, assigned_by=request.user
+            )
+            
+            if assigned_user:
+                message = 'Tarea actualizada y reasignada manualmente'
+            elif reassign:
+                message = 'Tarea actualizada, la reasignación automática está en proceso'
+            else:
+                message = 'Tarea actualizada correctamente'
             
             return Response({
-                'message': 'Tarea actualizada correctamente',
+                'message': message,
                 'task': TaskSerializer(updated_task).data
             })
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class TaskDeleteView(APIView):
+    cost_class = 'standard'
     permission_classes = [IsAuthenticated]
 
     def delete(self, request, task_id):
@@ -270,20 +232,19 @@ class TaskDeleteView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Guardar información para el mensaje
-        task_title = task.title
-        
-        # Eliminar la tarea (esto eliminará en cascada las asignaciones y reportes)
-        task.delete()
+        # Borrado lógico; archive_tasks la moverá al archivo con su historial
+        delete_task(task)
         
         return Response(
-            {'message': f'Tarea "{task_title}" eliminada correctamente'}, 
+            {'message': f'Tarea "{task.title}" eliminada correctamente'}, 
             status=status.HTTP_200_OK
         )
 
 class TaskRejectView(APIView):
+    cost_class = 'standard'
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request, task_id):
         try:
             task = Task.objects.get(id=task_id, assigned_to=request.user)
@@ -296,103 +257,21 @@ class TaskRejectView(APIView):
         
         serializer = TaskRejectionSerializer(data=request.data)
         if serializer.is_valid():
-            reason = serializer.validated_data['reason']
-            
-            # Rechazar la tarea
-            assignment.status = 'rejected'
-            assignment.rejected_at = timezone.now()
-            assignment.rejected_reason = reason
-            assignment.save()
-            
-            # Actualizar contadores del usuario
-            profile = request.user.userprofile
-            profile.tasks_rejected += 1
-            profile.save()
+            # Rechazar; la reasignación automática se procesa en segundo plano
+            reject_task(task, assignment, request.user, serializer.validated_data['reason'])
             
-            # Resetear la tarea para reasignación
-            task.assigned_to = None
-            task.status = 'pending'
-            task.save()
-            
-            # Notificar al administrador
-            Notification.objects.create(
-                user=task.created_by,
-                notification_type='task_rejected',
-                title='Tarea Rechazada',
-                message=f'{request.user.get_full_name()} rechazó la tarea: {task.title}. Razón: {reason}',
-                related_task=task
+            return Response(
+                {'message': 'Tarea rechazada, la reasignación automática está en proceso'}, 
+                status=status.HTTP_200_OK
             )
-            
-            # REASIGNAR INMEDIATAMENTE usando el mismo algoritmo
-            new_assignee = self.assign_task_automatically(task)
-            
-            if new_assignee:
-                # Actualizar la tarea con el nuevo asignado
-                task.assigned_to = new_assignee
-                task.status = 'assigned'
-                task.assigned_at = timezone.now()
-                task.save()
-                
-                # Notificar al nuevo usuario
-                Notification.objects.create(
-                    user=new_assignee,
-                    notification_type='task_assigned',
-                    title='Nueva Tarea Asignada',
-                    message=f'Se te ha asignado la tarea: {task.title} (reasignada automáticamente)',
-                    related_task=task
-                )
-                
-                return Response(
-                    {'message': 'Tarea rechazada y reasignada automáticamente a otro usuario'}, 
-                    status=status.HTTP_200_OK
-                )
-            else:
-                # Si no se pudo reasignar, dejar en estado pending
-                return Response(
-                    {'message': 'Tarea rechazada pero no se pudo reasignar automáticamente (no hay usuarios disponibles)'}, 
-                    status=status.HTTP_200_OK
-                )
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
-    def assign_task_automatically(self, task):
-        """Mismo algoritmo de asignación automática que TaskCreateView"""
-        # Buscar usuarios con el rol que coincide con la dificultad de la tarea
-        users = User.objects.filter(
-            userprofile__role=task.difficulty,
-            userprofile__is_active_worker=True
-        ).annotate(
-            current_tasks=Count(
-                'assigned_tasks', 
-                filter=Q(assigned_tasks__status__in=['assigned', 'in_progress'])
-            )
-        ).filter(
-            current_tasks__lt=F('userprofile__max_tasks')
-        ).order_by('current_tasks', 'userprofile__tasks_rejected')
-        
-        for user in users:
-            # Verificar manualmente que puede aceptar más tareas (doble verificación)
-            profile = user.userprofile
-            if profile.current_task_count < profile.max_tasks:
-                # Crear la asignación
-                assignment = TaskAssignment.objects.create(
-                    task=task,
-                    assigned_to=user,
-                    assigned_by=task.created_by,  # Mantener al creador original
-                    status='assigned'
-                )
-                
-                # Actualizar contadores
-                profile.tasks_assigned += 1
-                profile.save()
-                
-                return user
-        
-        return None
 
 class TaskCompleteView(APIView):
+    cost_class = 'standard'
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request, task_id):
         try:
             task = Task.objects.get(id=task_id, assigned_to=request.user)
@@ -405,33 +284,7 @@ class TaskCompleteView(APIView):
         
         serializer = TaskCompletionSerializer(data=request.data)
         if serializer.is_valid():
-            # Crear reporte
-            report = TaskReport.objects.create(
-                task_assignment=assignment,
-                report_text=serializer.validated_data['report_text'],
-                hours_worked=serializer.validated_data['hours_worked'],
-                challenges_faced=serializer.validated_data.get('challenges_faced', ''),
-                solutions_applied=serializer.validated_data.get('solutions_applied', '')
-            )
-            
-            # Actualizar asignación
-            assignment.status = 'completed'
-            assignment.completed_at = timezone.now()
-            assignment.save()
-            
-            # Actualizar tarea
-            task.status = 'completed'
-            task.completed_at = timezone.now()
-            task.save()
-            
-            # Notificar al administrador
-            Notification.objects.create(
-                user=task.created_by,
-                notification_type='report_submitted',
-                title='Reporte de Tarea Enviado',
-                message=f'{request.user.get_full_name()} completó la tarea: {task.title}',
-                related_task=task
-            )
+            report = complete_task(task, assignment, request.user, serializer.validated_data)
             
             return Response(
                 {'message': 'Tarea completada y reporte enviado para revisión', 'report': TaskReportSerializer(report).data},
@@ -440,7 +293,16 @@ class TaskCompleteView(APIView):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class ReportReviewView(APIView):
+REPORT_PAGE_SIZE = 50
+REPORT_MAX_PAGE_SIZE = 200
+# Los contadores de las pestañas de revisión en una sola pasada por los reportes
+REPORT_STATUS_COUNTS = {
+    **{value: Count('id', filter=Q(status=value)) for value, _ in TaskReport.REPORT_STATUS},
+    'all': Count('id'),
+}
+
+class ReportReviewView(ReplicaReadMixin, APIView):
+    cost_class = 'standard'
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -452,24 +314,31 @@ class ReportReviewView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Obtener todos los reportes, no solo los pendientes
+        # Por defecto, mostrar pendientes
         status_filter = request.GET.get('status', 'pending_review')
+        if status_filter not in REPORT_STATUS_COUNTS:
+            return Response(
+                {'error': 'Estado no válido. Use "pending_review", "approved", "rejected", "needs_correction" o "all"'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        if status_filter == 'all':
-            reports = TaskReport.objects.all()
-        elif status_filter == 'approved':
-            reports = TaskReport.objects.filter(status='approved')
-        elif status_filter == 'rejected':
-            reports = TaskReport.objects.filter(status='rejected')
-        elif status_filter == 'needs_correction':
-            reports = TaskReport.objects.filter(status='needs_correction')
-        else:
-            # Por defecto, mostrar pendientes
-            reports = TaskReport.objects.filter(status='pending_review')
-        
-        serializer = TaskReportSerializer(reports, many=True)
-        return Response(serializer.data)
+        # Los reportes de tareas eliminadas ya no se revisan
+        reports = TaskReport.objects.filter(task_assignment__task__is_archived=False)
+        counts = reports.aggregate(**REPORT_STATUS_COUNTS)
+        if status_filter != 'all':
+            reports = reports.filter(status=status_filter)
+        reports = reports.order_by('-submitted_at', '-id')
+        
+        page, page_size, offset = page_params(request, REPORT_PAGE_SIZE, REPORT_MAX_PAGE_SIZE)
+        rows = list(with_fragments(reports, 'report')[offset:offset + page_size + 1])
+        # Sin los textos largos (ver ReportDetailView); los aprobados salen ya
+        # codificados de la caché de representación
+        fragments = render_rows(rows[:page_size], reports, 'report')
+        return HttpResponse(json_page({
+            'counts': counts, 'page': page, 'page_size': page_size, 'has_next': len(rows) > page_size
+        }, fragments), content_type='application/json')
     
+    @idempotent
     def post(self, request, report_id):
         user_profile = request.user.userprofile
         
@@ -480,7 +349,9 @@ class ReportReviewView(APIView):
             )
         
         try:
-            report = TaskReport.objects.get(id=report_id)
+            report = TaskReport.objects.select_related(
+                'task_assignment__task'
+            ).get(id=report_id, task_assignment__task__is_archived=False)
         except TaskReport.DoesNotExist:
             return Response(
                 {'error': 'Reporte no encontrado'}, 
@@ -490,83 +361,156 @@ class ReportReviewView(APIView):
         action = request.data.get('action')
         review_notes = request.data.get('review_notes', '')
         
-        if action == 'approve':
-            report.status = 'approved'
-            report.reviewed_at = timezone.now()
-            report.reviewed_by = request.user
-            report.review_notes = review_notes
-            report.save()
-            
-            # Actualizar asignación
-            assignment = report.task_assignment
-            assignment.status = 'approved'
-            assignment.approved_at = timezone.now()
-            assignment.approved_by = request.user
-            assignment.save()
-            
-            # Actualizar contadores del usuario
-            user_profile = assignment.assigned_to.userprofile
-            user_profile.tasks_completed += 1
-            user_profile.save()
-            
-            # Notificar al trabajador
-            Notification.objects.create(
-                user=assignment.assigned_to,
-                notification_type='task_approved',
-                title='Tarea Aprobada',
-                message=f'Tu tarea "{assignment.task.title}" ha sido aprobada',
-                related_task=assignment.task
+        if action not in REVIEW_ACTIONS:
+            return Response(
+                {'error': 'Acción no válida. Use "approve", "reject" o "needs_correction"'}, 
+                status=status.HTTP_400_BAD_REQUEST
             )
-            
-            return Response({'message': 'Reporte aprobado exitosamente'})
-        
-        elif action == 'reject':
-            report.status = 'rejected'
-            report.reviewed_at = timezone.now()
-            report.reviewed_by = request.user
-            report.review_notes = review_notes
-            report.save()
-            
-            # Resetear la tarea para corrección
-            assignment = report.task_assignment
-            assignment.status = 'assigned'  # Volver a asignada para corrección
-            assignment.save()
-            
-            task = assignment.task
-            task.status = 'assigned'
-            task.save()
-            
-            # Notificar al trabajador
-            Notification.objects.create(
-                user=assignment.assigned_to,
-                notification_type='system_message',
-                title='Tarea Requiere Corrección',
-                message=f'Tu reporte para la tarea "{task.title}" requiere correcciones. Notas: {review_notes}',
-                related_task=task
+        
+        if review_report(report, request.user, action, review_notes) is None:
+            return Response(
+                {'error': 'El reporte ya fue revisado'}, 
+                status=status.HTTP_409_CONFLICT
             )
-            
-            return Response({'message': 'Reporte rechazado, se requiere corrección'})
-        
-        elif action == 'needs_correction':
-            report.status = 'needs_correction'
-            report.reviewed_at = timezone.now()
-            report.reviewed_by = request.user
-            report.review_notes = review_notes
-            report.save()
-            
-            return Response({'message': 'Reporte marcado como necesita corrección'})
         
+        return Response({'message': {
+            'approve': 'Reporte aprobado exitosamente',
+            'reject': 'Reporte rechazado, se requiere corrección',
+            'needs_correction': 'Reporte marcado como necesita corrección',
+        }[action]})
+
+class ReportDetailView(ReplicaReadMixin, APIView):
+    """Un reporte completo, con los textos largos que el listado no devuelve"""
+    cost_class = 'cheap'
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, report_id):
+        user_profile = request.user.userprofile
+        
+        if user_profile.role not in ['admin', 'superuser']:
+            return Response(
+                {'error': 'No tienes permisos para revisar reportes'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            report = TaskReport.objects.select_related(
+                'task_assignment__task', 'task_assignment__assigned_to', 'reviewed_by'
+            ).get(id=report_id, task_assignment__task__is_archived=False)
+        except TaskReport.DoesNotExist:
+            return Response(
+                {'error': 'Reporte no encontrado'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        return Response(TaskReportSerializer(report).data)
+
+class BulkReportReviewView(APIView):
+    cost_class = 'expensive'
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        user_profile = request.user.userprofile
+        
+        if user_profile.role not in ['admin', 'superuser']:
+            return Response(
+                {'error': 'No tienes permisos para aprobar reportes'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = BulkReportReviewSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Los elementos no válidos se informan sin impedir el resto
+        results = bulk_review_reports(request.user, serializer.validated_data['reviews'])
+        reviewed = sum(result['success'] for result in results)
+        
+        return Response({
+            'message': f'{reviewed} de {len(results)} reportes revisados',
+            'reviewed': reviewed,
+            'failed': len(results) - reviewed,
+            'results': results
+        })
+
+ARCHIVE_PAGE_SIZE = 50
+ARCHIVE_MAX_PAGE_SIZE = 200
+
+class ArchivedTaskListView(ReplicaReadMixin, APIView):
+    """Consulta de solo lectura del archivo, paginada (el archivo solo crece)"""
+    cost_class = 'standard'
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user_profile = request.user.userprofile
+        
+        if user_profile.role in ['admin', 'superuser']:
+            tasks = ArchivedTask.objects.all()
         else:
+            # Trabajadores ven solo las tareas en las que participaron
+            tasks = ArchivedTask.objects.filter(
+                Q(assigned_to=request.user) | 
+                Q(assignments__assigned_to=request.user)
+            ).distinct()
+        
+        reason = request.GET.get('reason')
+        if reason:
+            if reason not in dict(ArchivedTask.ARCHIVE_REASONS):
+                return Response(
+                    {'error': 'Motivo no válido. Use "approved", "cancelled" o "deleted"'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            tasks = tasks.filter(reason=reason)
+        if request.GET.get('assigned_to'):
+            tasks = tasks.filter(assignments__assigned_to=positive_int(request.GET['assigned_to'], 0)).distinct()
+        
+        page, page_size, offset = page_params(request, ARCHIVE_PAGE_SIZE, ARCHIVE_MAX_PAGE_SIZE)
+        # Se pide una fila de más para saber si hay otra página sin contar el archivo
+        rows = list(with_fragments(tasks, 'archived_task')[offset:offset + page_size + 1])
+        fragments = render_rows(rows[:page_size], tasks, 'archived_task')
+        
+        # Las tareas archivadas salen ya codificadas de la caché de representación
+        return HttpResponse(json_page({
+            'page': page, 'page_size': page_size, 'has_next': len(rows) > page_size
+        }, fragments), content_type='application/json')
+
+class ArchivedTaskDetailView(ReplicaReadMixin, APIView):
+    cost_class = 'cheap'
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, task_id):
+        try:
+            task = ArchivedTask.objects.select_related('created_by', 'assigned_to').prefetch_related(
+                Prefetch('assignments', queryset=ArchivedTaskAssignment.objects.select_related(
+                    'assigned_to', 'assigned_by', 'approved_by', 'report__reviewed_by'
+                ))
+            ).get(id=task_id)
+        except ArchivedTask.DoesNotExist:
             return Response(
-                {'error': 'Acción no válida. Use "approve", "reject" o "needs_correction"'}, 
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': 'Tarea archivada no encontrada'}, 
+                status=status.HTTP_404_NOT_FOUND
             )
+        
+        # Verificar permisos
+        user_profile = request.user.userprofile
+        if user_profile.role not in ['admin', 'superuser'] and not any(
+            assignment.assigned_to_id == request.user.id for assignment in task.assignments.all()
+        ):
+            return Response(
+                {'error': 'No tienes permisos para ver esta tarea'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        return Response(ArchivedTaskDetailSerializer(task).data)
 
-class NotificationListView(APIView):
+class NotificationListView(ReplicaReadMixin, APIView):
+    cost_class = 'cheap'
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
+        notifications = Notification.objects.filter(
+            user=request.user
+        ).select_related('related_task').order_by('-created_at')
         unread_count = notifications.filter(is_read=False).count()
         
         serializer = NotificationSerializer(notifications, many=True)
@@ -586,7 +530,92 @@ class NotificationListView(APIView):
         
         return Response({'message': 'Notificaciones marcadas como leídas'})
 
-class StatisticsView(APIView):
+class AsyncNotificationListView(ReplicaReadMixin, AsyncAPIView):
+    cost_class = 'cheap'
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        notifications = Notification.objects.filter(
+            user=request.user
+        ).select_related('related_task').order_by('-created_at')
+        notifications, unread_count = await asyncio.gather(
+            alist(notifications),
+            notifications.filter(is_read=False).acount()
+        )
+        
+        serializer = NotificationSerializer(notifications, many=True)
+        return Response({
+            'notifications': serializer.data,
+            'unread_count': unread_count
+        })
+    
+    async def post(self, request):
+        # Marcar notificaciones como leídas
+        notification_ids = request.data.get('notification_ids', [])
+        if notification_ids:
+            await Notification.objects.filter(
+                id__in=notification_ids, 
+                user=request.user
+            ).aupdate(is_read=True)
+        
+        return Response({'message': 'Notificaciones marcadas como leídas'})
+
+# Los cuatro contadores generales en una sola pasada por la tabla de tareas
+TASK_STATUS_COUNTS = {
+    'total_tasks': Count('id'),
+    'completed_tasks': Count('id', filter=Q(status='completed')),
+    'pending_tasks': Count('id', filter=Q(status='pending')),
+    'assigned_tasks': Count('id', filter=Q(status='assigned')),
+}
+
+# Clasificación de cada métrica de WorkerTotalStats/WorkerDailyStats
+LEADERBOARDS = {
+    'top_completers': 'approved',
+    'top_rejecters': 'rejected',
+    'top_hours': 'hours_worked',
+}
+
+def leaderboards(days):
+    # Las clasificaciones de la ventana, con sus usuarios cargados en una consulta
+    boards = {key: leaderboard(metric, days) for key, metric in LEADERBOARDS.items()}
+    users = User.objects.select_related('userprofile').annotate(
+        open_task_count=count_subquery(TaskAssignment.objects.filter(
+            assigned_to=OuterRef('pk'), status__in=ACTIVE_ASSIGNMENT_STATUSES
+        ))
+    ).in_bulk({user_id for board in boards.values() for user_id, _ in board})
+    for user in users.values():
+        user.userprofile.open_task_count = user.open_task_count
+    return {
+        key: [
+            {**UserBasicSerializer(users[user_id]).data, 'total': total}
+            for user_id, total in board if user_id in users
+        ]
+        for key, board in boards.items()
+    }
+
+def general_statistics(counts):
+    total_tasks = counts['total_tasks']
+    return {
+        **counts,
+        'completion_rate': (counts['completed_tasks'] / total_tasks * 100) if total_tasks > 0 else 0
+    }
+
+def statistics_payload(counts, window, boards):
+    return {
+        'general': general_statistics(counts),
+        'window': window,
+        **boards
+    }
+
+def statistics_window(request):
+    # ?window=7|30|365|all, por defecto desde siempre
+    window = request.GET.get('window', 'all')
+    return window if window in LEADERBOARD_WINDOWS else None
+
+INVALID_WINDOW_ERROR = {'error': 'Ventana no válida. Use "7", "30", "365" o "all"'}
+
+class StatisticsView(ReplicaReadMixin, APIView):
+    cost_class = 'expensive'
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -598,30 +627,204 @@ class StatisticsView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        window = statistics_window(request)
+        if window is None:
+            return Response(INVALID_WINDOW_ERROR, status=status.HTTP_400_BAD_REQUEST)
+        
         # Estadísticas generales
-        total_tasks = Task.objects.count()
-        completed_tasks = Task.objects.filter(status='completed').count()
-        pending_tasks = Task.objects.filter(status='pending').count()
-        assigned_tasks = Task.objects.filter(status='assigned').count()
+        counts = Task.objects.aggregate(**TASK_STATUS_COUNTS)
+        boards = leaderboards(LEADERBOARD_WINDOWS[window])
+        return Response(statistics_payload(counts, window, boards))
+
+class AsyncStatisticsView(ReplicaReadMixin, AsyncAPIView):
+    cost_class = 'expensive'
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        user_profile = await aget_profile(request.user)
         
-        # Usuarios con más tareas completadas
-        top_completers = User.objects.annotate(
-            completed_count=Count('assigned_tasks', filter=Q(assigned_tasks__status='approved'))
-        ).order_by('-completed_count')[:5]
+        if user_profile.role not in ['admin', 'superuser']:
+            return Response(
+                {'error': 'No tienes permisos para ver estadísticas'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
         
-        # Usuarios con más tareas rechazadas
-        top_rejecters = User.objects.annotate(
-            rejected_count=Count('assigned_tasks', filter=Q(assigned_tasks__status='rejected'))
-        ).order_by('-rejected_count')[:5]
+        window = statistics_window(request)
+        if window is None:
+            return Response(INVALID_WINDOW_ERROR, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
-            'general': {
-                'total_tasks': total_tasks,
-                'completed_tasks': completed_tasks,
-                'pending_tasks': pending_tasks,
-                'assigned_tasks': assigned_tasks,
-                'completion_rate': (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-            },
-            'top_completers': UserBasicSerializer(top_completers, many=True).data,
-            'top_rejecters': UserBasicSerializer(top_rejecters, many=True).data
-        })
\ No newline at end of file
+        # Los contadores y las clasificaciones son independientes
+        counts, boards = await asyncio.gather(
+            Task.objects.aaggregate(**TASK_STATUS_COUNTS),
+            sync_to_async(leaderboards)(LEADERBOARD_WINDOWS[window])
+        )
+        return Response(statistics_payload(counts, window, boards))
+
+# -- Carga de trabajo ------------------------------------------------------
+# Matriz de carga por trabajador para decidir la capacidad sin abrir cada
+# usuario: un GROUP BY de los perfiles con sus asignaciones, por páginas y
+# guardado WORKLOAD_CACHE_SECONDS en la caché.
+
+WORKLOAD_PAGE_SIZE = 50
+WORKLOAD_MAX_PAGE_SIZE = 200
+WORKER_ROLES = [role for role, _ in Task.DIFFICULTY_LEVELS]
+# Estados de TaskAssignment, más el que escriben las cancelaciones
+WORKLOAD_STATUSES = [value for value, _ in TaskAssignment.ASSIGNMENT_STATUS] + ['cancelled']
+
+def workload_rows(role=None):
+    """Recuentos por estado y horas pendientes de cada trabajador en una consulta"""
+    live = Q(user__task_assignments__task__is_archived=False)
+    counts = {
+        value: Count('user__task_assignments', filter=live & Q(user__task_assignments__status=value))
+        for value in WORKLOAD_STATUSES
+    }
+    # Desde el perfil (LEFT JOIN) para que salgan también los trabajadores sin asignaciones
+    return UserProfile.objects.filter(
+        role__in=[role] if role else WORKER_ROLES
+    ).values(
+        'user_id', 'user__username', 'role', 'max_tasks', 'is_active_worker'
+    ).annotate(
+        **counts,
+        outstanding_hours=Coalesce(Sum(
+            'user__task_assignments__task__estimated_hours',
+            filter=live & Q(user__task_assignments__status__in=ACTIVE_ASSIGNMENT_STATUSES)
+        ), 0)
+    ).order_by(
+        Case(*[When(role=value, then=Value(rank)) for rank, value in enumerate(WORKER_ROLES)]),
+        'user__username', 'user_id'
+    )
+
+def workload_payload(row):
+    active = sum(row[value] for value in ACTIVE_ASSIGNMENT_STATUSES)
+    received = sum(row[value] for value in WORKLOAD_STATUSES)
+    return {
+        'user_id': row['user_id'],
+        'username': row['user__username'],
+        'role': row['role'],
+        'is_active_worker': row['is_active_worker'],
+        'max_tasks': row['max_tasks'],
+        'assignments': {value: row[value] for value in WORKLOAD_STATUSES},
+        'active': active,
+        'outstanding_hours': row['outstanding_hours'],
+        'remaining_capacity': max(row['max_tasks'] - active, 0),
+        'rejection_ratio': round(row['rejected'] / received, 3) if received else 0,
+    }
+
+class WorkloadView(ReplicaReadMixin, APIView):
+    """Carga de cada trabajador, ordenada por rol (adiestrado, regular, especialista)"""
+    cost_class = 'expensive'
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user_profile = request.user.userprofile
+        
+        if user_profile.role not in ['admin', 'superuser']:
+            return Response(
+                {'error': 'No tienes permisos para ver la carga de trabajo'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        role = request.GET.get('role')
+        if role and role not in WORKER_ROLES:
+            return Response(
+                {'error': 'Rol no válido. Use "adiestrado", "regular" o "especialista"'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        page, page_size, _ = page_params(request, WORKLOAD_PAGE_SIZE, WORKLOAD_MAX_PAGE_SIZE)
+        key = f'workload:{role or "all"}:{page}:{page_size}'
+        payload = cache.get(key)
+        if payload is None:
+            rows, envelope = paginate(workload_rows(role), request, WORKLOAD_PAGE_SIZE, WORKLOAD_MAX_PAGE_SIZE)
+            payload = {
+                **envelope,
+                'generated_at': timezone.now(),
+                'results': [workload_payload(row) for row in rows],
+            }
+            cache.set(key, payload, settings.WORKLOAD_CACHE_SECONDS)
+        return Response(payload)
+
+# -- Panel de control ------------------------------------------------------
+# Todo lo que el panel pedía al arrancar en varias peticiones: usuario,
+# primeras tareas, notificaciones sin leer y, para administradores,
+# reportes pendientes y estadísticas generales.
+
+DASHBOARD_TASKS = 5
+
+def recent_tasks(user, user_profile):
+    return visible_tasks(user, user_profile).order_by('-created_at')[:DASHBOARD_TASKS]
+
+def dashboard_counts(user, is_admin):
+    """Todos los contadores del panel en una sola consulta"""
+    if is_admin:
+        tasks = Task.objects.all()
+    else:
+        tasks = Task.objects.filter(
+            Q(assigned_to=user) |
+            Q(id__in=TaskAssignment.objects.filter(assigned_to=user).values('task_id'))
+        )
+    counts = {
+        'total_tasks': count_subquery(tasks),
+        'unread_notifications': count_subquery(Notification.objects.filter(user=user, is_read=False)),
+        'open_tasks': count_subquery(
+            TaskAssignment.objects.filter(assigned_to=user, status__in=['assigned', 'in_progress'])
+        ),
+    }
+    if is_admin:
+        counts.update(
+            completed_tasks=count_subquery(tasks.filter(status='completed')),
+            pending_tasks=count_subquery(tasks.filter(status='pending')),
+            assigned_tasks=count_subquery(tasks.filter(status='assigned')),
+            pending_reports=count_subquery(
+                TaskReport.objects.filter(status='pending_review', task_assignment__task__is_archived=False)
+            ),
+        )
+    return UserProfile.objects.filter(user=user).values(**counts)
+
+def dashboard_payload(user, user_profile, counts, tasks):
+    # El perfil ya viene con su carga actual: UserSerializer no vuelve a contarla
+    user_profile.open_task_count = counts.pop('open_tasks')
+    user.userprofile = user_profile
+    payload = {
+        'user': UserSerializer(user).data,
+        'tasks': {'count': counts['total_tasks'], 'results': TaskSerializer(tasks, many=True).data},
+        'unread_notifications': counts.pop('unread_notifications'),
+    }
+    if 'pending_reports' in counts:
+        payload['pending_reports'] = counts.pop('pending_reports')
+        payload['stats'] = general_statistics(counts)
+    else:
+        payload['stats'] = {
+            'tasks_assigned': user_profile.tasks_assigned,
+            'tasks_completed': user_profile.tasks_completed,
+            'tasks_rejected': user_profile.tasks_rejected,
+            'current_task_count': user_profile.open_task_count,
+        }
+    return payload
+
+class DashboardView(ReplicaReadMixin, APIView):
+    cost_class = 'standard'
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user_profile = request.user.userprofile
+        is_admin = user_profile.role in ['admin', 'superuser']
+        
+        counts = dashboard_counts(request.user, is_admin).get()
+        tasks = list(recent_tasks(request.user, user_profile))
+        return Response(dashboard_payload(request.user, user_profile, counts, tasks))
+
+class AsyncDashboardView(ReplicaReadMixin, AsyncAPIView):
+    cost_class = 'standard'
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        user_profile = await aget_profile(request.user)
+        is_admin = user_profile.role in ['admin', 'superuser']
+        
+        # Contadores y tareas son independientes
+        counts, tasks = await asyncio.gather(
+            dashboard_counts(request.user, is_admin).aget(),
+            alist(recent_tasks(request.user, user_profile))
+        )
+        return Response(dashboard_payload(request.user, user_profile, counts, tasks))
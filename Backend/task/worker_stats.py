@@ -0,0 +1,116 @@
+"""Estadísticas por trabajador y clasificaciones por ventana de tiempo.
+
+Las clasificaciones contaban en cada petición las tareas de cada usuario
+con un estado que Task nunca tiene ('approved'), así que salían vacías y
+cada vez recorrían todas las tareas. Ahora cada aprobación o rechazo suma a
+dos tablas en la misma transacción:
+
+- WorkerDailyStats: una fila por trabajador y día; las ventanas de 7, 30 y
+  365 días agrupan solo las filas de esos días
+- WorkerTotalStats: los totales de siempre, con un índice por métrica para
+  leer el top directamente
+
+Las sumas son un ``INSERT ... ON CONFLICT DO UPDATE`` que acumula sobre la
+fila, así dos transacciones a la vez no se pisan. ``rebuild_worker_stats``
+las recalcula desde las asignaciones, activas y archivadas.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.apps import apps as global_apps
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from .models import WorkerDailyStats, WorkerTotalStats
+
+STAT_FIELDS = ('approved', 'rejected', 'hours_worked')
+# Días de cada ventana de ``?window=``; None es desde siempre
+LEADERBOARD_WINDOWS = {'7': 7, '30': 30, '365': 365, 'all': None}
+LEADERBOARD_SIZE = 5
+REBUILD_BATCH_SIZE = 1000
+
+
+def _upsert(model, key_columns, rows):
+    """Suma ``rows`` (tuplas clave + STAT_FIELDS) a las filas de ``model``, creándolas si faltan"""
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    columns = [*key_columns, *STAT_FIELDS]
+    placeholders = ', '.join(['%s'] * len(columns))
+    increments = ', '.join(f'{qn(field)} = {table}.{qn(field)} + excluded.{qn(field)}' for field in STAT_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} ({", ".join(qn(column) for column in columns)}) VALUES ({placeholders}) '
+            f'ON CONFLICT ({", ".join(qn(column) for column in key_columns)}) DO UPDATE SET {increments}',
+            rows,
+        )
+
+
+def record_worker_stats(changes):
+    """Suma ``changes`` ({user_id: {'approved', 'rejected', 'hours_worked'}}) a hoy y a los totales"""
+    totals = [
+        (user_id, *(change.get(field, 0) for field in STAT_FIELDS))
+        for user_id, change in changes.items() if any(change.values())
+    ]
+    if not totals:
+        return
+    today = timezone.localdate()
+    _upsert(WorkerDailyStats, ['user_id', 'day'], [(user_id, today, *stats) for user_id, *stats in totals])
+    _upsert(WorkerTotalStats, ['user_id'], totals)
+
+
+def leaderboard(metric, days=None, size=LEADERBOARD_SIZE):
+    """[(user_id, total)] de los ``size`` trabajadores con más ``metric`` en los últimos ``days`` días"""
+    if days is None:
+        rows = WorkerTotalStats.objects.filter(**{f'{metric}__gt': 0}).order_by(
+            f'-{metric}', 'user_id'
+        ).values_list('user_id', metric)
+    else:
+        # La ventana incluye hoy
+        since = timezone.localdate() - timedelta(days=days - 1)
+        rows = WorkerDailyStats.objects.filter(day__gte=since).values('user_id').annotate(
+            total=Sum(metric)
+        ).filter(total__gt=0).order_by('-total', 'user_id').values_list('user_id', 'total')
+    return list(rows[:size])
+
+
+def daily_stats(apps=global_apps):
+    """{(user_id, día): Counter de STAT_FIELDS} calculado desde las asignaciones"""
+    daily = defaultdict(Counter)
+    for model_name in ('TaskAssignment', 'ArchivedTaskAssignment'):
+        assignments = apps.get_model('task', model_name).objects.filter(assigned_to__isnull=False)
+        approved = assignments.filter(status='approved', approved_at__isnull=False).values(
+            'assigned_to_id', day=TruncDate('approved_at')
+        ).annotate(approved=Count('id'), hours_worked=Coalesce(Sum('report__hours_worked'), 0))
+        rejected = assignments.filter(status='rejected', rejected_at__isnull=False).values(
+            'assigned_to_id', day=TruncDate('rejected_at')
+        ).annotate(rejected=Count('id'))
+        for rows in (approved, rejected):
+            for row in rows:
+                stats = daily[row.pop('assigned_to_id'), row.pop('day')]
+                stats.update(row)
+    return daily
+
+
+def rebuild_worker_stats(apps=global_apps):
+    """Recalcula las dos tablas desde las asignaciones; devuelve cuántos trabajadores tienen estadísticas.
+
+    ``apps`` permite llamarla desde una migración con los modelos históricos.
+    """
+    DailyStats = apps.get_model('task', 'WorkerDailyStats')
+    TotalStats = apps.get_model('task', 'WorkerTotalStats')
+    daily = daily_stats(apps)
+    totals = defaultdict(Counter)
+    for (user_id, day), stats in daily.items():
+        totals[user_id].update(stats)
+
+    with transaction.atomic():
+        DailyStats.objects.all().delete()
+        TotalStats.objects.all().delete()
+        DailyStats.objects.bulk_create([
+            DailyStats(user_id=user_id, day=day, **stats) for (user_id, day), stats in daily.items()
+        ], batch_size=REBUILD_BATCH_SIZE)
+        TotalStats.objects.bulk_create([
+            TotalStats(user_id=user_id, **stats) for user_id, stats in totals.items()
+        ], batch_size=REBUILD_BATCH_SIZE)
+    return len(totals)
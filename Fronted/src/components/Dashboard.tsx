@@ -32,7 +32,7 @@ const DIFFICULTY_CLASSES: { [key: string]: string } = {
 const Dashboard: React.FC = () => {
   const { user } = useAuth();
   const [recentTasks, setRecentTasks] = useState<Task[]>([]);
-  const [statistics, setStatistics] = useState<Statistics | null>(null);
+  const [statistics, setStatistics] = useState<Statistics['general'] | null>(null);
   const [isLoading, setIsLoading] = useState<boolean>(true);
 
   const isAdminUser = useMemo(() => 
@@ -44,17 +44,11 @@ const Dashboard: React.FC = () => {
     try {
       setIsLoading(true);
       
-      const [tasksData, statsData] = await Promise.all([
-        taskAPI.getTasks(),
-        isAdminUser ? taskAPI.getStatistics() : Promise.resolve(null),
-      ]);
+      // Una sola petición con las últimas tareas y las estadísticas del rol
+      const dashboard = await taskAPI.getDashboard();
 
-      const sortedRecentTasks = tasksData
-        .sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime())
-        .slice(0, 5);
-
-      setRecentTasks(sortedRecentTasks);
-      setStatistics(statsData);
+      setRecentTasks(dashboard.tasks.results);
+      setStatistics(isAdminUser ? dashboard.stats as Statistics['general'] : null);
     } catch (error) {
       console.error('Error loading dashboard data:', error);
     } finally {
@@ -69,28 +63,28 @@ const Dashboard: React.FC = () => {
   const stats: StatCard[] = useMemo(() => [
     {
       title: 'Tareas Totales',
-      value: statistics?.general.total_tasks.toString() || '0',
+      value: statistics?.total_tasks.toString() || '0',
       icon: 'bi-list-task',
       color: 'primary',
       border: 'border-left-primary',
     },
     {
       title: 'Completadas',
-      value: statistics?.general.completed_tasks.toString() || '0',
+      value: statistics?.completed_tasks.toString() || '0',
       icon: 'bi-check-circle',
       color: 'success',
       border: 'border-left-success',
     },
     {
       title: 'Pendientes',
-      value: statistics?.general.pending_tasks.toString() || '0',
+      value: statistics?.pending_tasks.toString() || '0',
       icon: 'bi-clock',
       color: 'warning',
       border: 'border-left-warning',
     },
     {
       title: 'Eficiencia',
-      value: statistics ? `${statistics.general.completion_rate.toFixed(1)}%` : '0%',
+      value: statistics ? `${statistics.completion_rate.toFixed(1)}%` : '0%',
       icon: 'bi-graph-up',
       color: 'info',
       border: 'border-left-info',
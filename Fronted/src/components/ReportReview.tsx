@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useCallback, useMemo } from 'react';
 import { taskAPI } from '../services/task';
-import type { TaskReport } from '../services/task';
+import type { TaskReport, TaskReportSummary, ReportPage, ReportStatusFilter } from '../services/task';
 import Swal from 'sweetalert2';
 
 interface StatusConfig {
@@ -55,6 +55,8 @@ const REVIEW_ACTIONS: ReviewAction[] = [
   },
 ];
 
+const REPORTS_PAGE_SIZE = 50;
+
 const FILTER_BUTTONS = [
   { key: 'pending_review', label: 'Pendientes', variant: 'primary' },
   { key: 'approved', label: 'Aprobados', variant: 'success' },
@@ -64,22 +66,27 @@ const FILTER_BUTTONS = [
 ] as const;
 
 const ReportReview: React.FC = () => {
-  const [reports, setReports] = useState<TaskReport[]>([]);
+  const [reports, setReports] = useState<TaskReportSummary[]>([]);
+  const [counts, setCounts] = useState<ReportPage['counts'] | null>(null);
+  const [page, setPage] = useState<number>(1);
+  const [hasNext, setHasNext] = useState<boolean>(false);
   const [isLoading, setIsLoading] = useState<boolean>(true);
   const [selectedReport, setSelectedReport] = useState<TaskReport | null>(null);
   const [showReviewModal, setShowReviewModal] = useState<boolean>(false);
   const [reviewNotes, setReviewNotes] = useState<string>('');
-  const [statusFilter, setStatusFilter] = useState<string>('pending_review');
+  const [statusFilter, setStatusFilter] = useState<ReportStatusFilter>('pending_review');
 
   useEffect(() => {
     loadReports();
-  }, [statusFilter]);
+  }, [statusFilter, page]);
 
   const loadReports = useCallback(async (): Promise<void> => {
     try {
       setIsLoading(true);
-      const reportsData = await taskAPI.getReports(statusFilter);
-      setReports(reportsData);
+      const reportPage = await taskAPI.getReports({ status: statusFilter, page, page_size: REPORTS_PAGE_SIZE });
+      setReports(reportPage.results);
+      setCounts(reportPage.counts);
+      setHasNext(reportPage.has_next);
     } catch (error) {
       await Swal.fire({
         icon: 'error',
@@ -91,12 +98,23 @@ const ReportReview: React.FC = () => {
     } finally {
       setIsLoading(false);
     }
-  }, [statusFilter]);
+  }, [statusFilter, page]);
 
-  const handleReview = useCallback((report: TaskReport): void => {
-    setSelectedReport(report);
-    setReviewNotes('');
-    setShowReviewModal(true);
+  const handleReview = useCallback(async (report: TaskReportSummary): Promise<void> => {
+    try {
+      // El listado no trae los textos del reporte
+      setSelectedReport(await taskAPI.getReport(report.id));
+      setReviewNotes('');
+      setShowReviewModal(true);
+    } catch (error) {
+      await Swal.fire({
+        icon: 'error',
+        title: 'Error',
+        text: 'No se pudo cargar el reporte.',
+        background: 'var(--surface-color)',
+        color: 'var(--text-primary)',
+      });
+    }
   }, []);
 
   const closeModal = useCallback((): void => {
@@ -173,7 +191,7 @@ const ReportReview: React.FC = () => {
     </div>
   );
 
-  const ReportCard: React.FC<{ report: TaskReport }> = ({ report }) => (
+  const ReportCard: React.FC<{ report: TaskReportSummary }> = ({ report }) => (
     <div className="col-12 mb-4">
       <div className="card shadow-custom">
         <div className="card-header d-flex justify-content-between align-items-center">
@@ -203,51 +221,24 @@ const ReportReview: React.FC = () => {
     </div>
   );
 
-  const ReportDetails: React.FC<{ report: TaskReport }> = ({ report }) => (
-    <>
-      <div className="row">
-        <div className="col-md-6">
-          <p><strong>Trabajador:</strong> <span className="text-primary">{report.assigned_to_name}</span></p>
-          <p><strong>Horas trabajadas:</strong> <span className="text-info">{report.hours_worked}</span></p>
-          <p><strong>Fecha de envío:</strong> {formatDate(report.submitted_at)}</p>
-          {report.reviewed_by_name && (
-            <p><strong>Revisado por:</strong> <span className="text-success">{report.reviewed_by_name}</span></p>
-          )}
-        </div>
-        <div className="col-md-6">
-          <p><strong>Desafíos enfrentados:</strong></p>
-          <p className="text-muted">{report.challenges_faced || 'No se reportaron desafíos'}</p>
-        </div>
+  const ReportDetails: React.FC<{ report: TaskReportSummary }> = ({ report }) => (
+    <div className="row">
+      <div className="col-md-6">
+        <p><strong>Trabajador:</strong> <span className="text-primary">{report.assigned_to_name}</span></p>
+        <p><strong>Horas trabajadas:</strong> <span className="text-info">{report.hours_worked}</span></p>
       </div>
-      
-      <div className="row mt-3">
-        <div className="col-12">
-          <p><strong>Soluciones aplicadas:</strong></p>
-          <p className="text-muted">{report.solutions_applied || 'No se reportaron soluciones'}</p>
-        </div>
-      </div>
-      
-      <div className="mt-3">
-        <p><strong>Reporte de trabajo:</strong></p>
-        <div className="bg-light p-3 rounded">
-          <p className="mb-0">{report.report_text}</p>
-        </div>
+      <div className="col-md-6">
+        <p><strong>Fecha de envío:</strong> {formatDate(report.submitted_at)}</p>
+        {report.reviewed_by_name && (
+          <p><strong>Revisado por:</strong> <span className="text-success">{report.reviewed_by_name}</span></p>
+        )}
       </div>
-      
-      {report.review_notes && (
-        <div className="mt-3">
-          <p><strong>Notas de revisión:</strong></p>
-          <div className="bg-warning bg-opacity-10 p-3 rounded">
-            <p className="mb-0">{report.review_notes}</p>
-          </div>
-        </div>
-      )}
-    </>
+    </div>
   );
 
   const ReportActions: React.FC<{ 
-    report: TaskReport; 
-    onReview: (report: TaskReport) => void;
+    report: TaskReportSummary; 
+    onReview: (report: TaskReportSummary) => void;
     getStatusBadge: (status: string) => JSX.Element;
   }> = ({ report, onReview, getStatusBadge }) => {
     if (report.status === 'pending_review') {
@@ -461,9 +452,12 @@ const ReportReview: React.FC = () => {
                     key={filter.key}
                     type="button"
                     className={`btn ${statusFilter === filter.key ? `btn-${filter.variant}` : `btn-outline-${filter.variant}`}`}
-                    onClick={() => setStatusFilter(filter.key)}
+                    onClick={() => { setStatusFilter(filter.key); setPage(1); }}
                   >
                     {filter.label}
+                    {counts && (
+                      <span className="badge bg-light text-dark ms-2">{counts[filter.key]}</span>
+                    )}
                   </button>
                 ))}
               </div>
@@ -483,6 +477,25 @@ const ReportReview: React.FC = () => {
         )}
       </div>
 
+      {/* Pagination */}
+      <div className="d-flex justify-content-between align-items-center mt-3">
+        <button
+          className="btn btn-outline-secondary"
+          onClick={() => setPage(prev => prev - 1)}
+          disabled={isLoading || page === 1}
+        >
+          Anterior
+        </button>
+        <span>Página {page}</span>
+        <button
+          className="btn btn-outline-secondary"
+          onClick={() => setPage(prev => prev + 1)}
+          disabled={isLoading || !hasNext}
+        >
+          Siguiente
+        </button>
+      </div>
+
       {/* Review Modal */}
       <ReviewModal />
     </div>
@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useCallback, useMemo } from 'react';
 import { taskAPI } from '../services/task';
-import type { Statistics as StatisticsData } from '../services/task';
+import type { Statistics as StatisticsData, LeaderboardEntry, LeaderboardWindow } from '../services/task';
 import Swal from 'sweetalert2';
 
 interface StatCardProps {
@@ -11,21 +11,9 @@ interface StatCardProps {
   border: string;
 }
 
-interface TopUser {
-  id: number;
-  first_name: string;
-  last_name: string;
-  username: string;
-  profile: {
-    role: string;
-    tasks_completed: number;
-    tasks_rejected: number;
-  };
-}
-
 interface UserListProps {
-  users: TopUser[];
-  type: 'completers' | 'rejecters';
+  users: LeaderboardEntry[];
+  type: 'completers' | 'rejecters' | 'hours';
   title: string;
   icon: string;
 }
@@ -57,6 +45,19 @@ const STAT_CARDS_CONFIG: Omit<StatCardProps, 'value'>[] = [
   },
 ];
 
+const WINDOW_OPTIONS: { value: LeaderboardWindow; label: string }[] = [
+  { value: '7', label: 'Últimos 7 días' },
+  { value: '30', label: 'Últimos 30 días' },
+  { value: '365', label: 'Último año' },
+  { value: 'all', label: 'Desde siempre' },
+];
+
+const BADGE_CONFIG: Record<UserListProps['type'], { className: string; unit: string }> = {
+  completers: { className: 'bg-success', unit: 'tareas' },
+  rejecters: { className: 'bg-danger', unit: 'rechazos' },
+  hours: { className: 'bg-info', unit: 'horas' },
+};
+
 const ALERT_CONFIG = {
   error: {
     icon: 'error' as const,
@@ -71,20 +72,21 @@ const Statistics: React.FC = () => {
   const [statistics, setStatistics] = useState<StatisticsData | null>(null);
   const [isLoading, setIsLoading] = useState<boolean>(true);
   const [isRefreshing, setIsRefreshing] = useState<boolean>(false);
+  const [leaderboardWindow, setLeaderboardWindow] = useState<LeaderboardWindow>('all');
 
   const loadStatistics = useCallback(async (): Promise<void> => {
     const loadingState = isLoading ? setIsLoading : setIsRefreshing;
     
     try {
       loadingState(true);
-      const stats = await taskAPI.getStatistics();
+      const stats = await taskAPI.getStatistics(leaderboardWindow);
       setStatistics(stats);
     } catch (error) {
       await Swal.fire(ALERT_CONFIG.error);
     } finally {
       loadingState(false);
     }
-  }, [isLoading]);
+  }, [isLoading, leaderboardWindow]);
 
   useEffect(() => {
     loadStatistics();
@@ -112,6 +114,7 @@ const Statistics: React.FC = () => {
     const workerIds = new Set([
       ...statistics.top_completers.map(user => user.id),
       ...statistics.top_rejecters.map(user => user.id),
+      ...statistics.top_hours.map(user => user.id),
     ]);
     
     return workerIds.size;
@@ -180,7 +183,7 @@ const Statistics: React.FC = () => {
   );
 
   const UserList: React.FC<UserListProps> = ({ users, type, title, icon }) => (
-    <div className="col-lg-6">
+    <div className="col-lg-4">
       <div className="card shadow-custom mb-4">
         <div className="card-header">
           <h6 className="m-0 font-weight-bold text-primary">
@@ -223,15 +226,8 @@ const Statistics: React.FC = () => {
                       {user.profile.role}
                     </small>
                   </div>
-                  <span 
-                    className={`badge rounded-pill ${
-                      type === 'completers' ? 'bg-success' : 'bg-danger'
-                    }`}
-                  >
-                    {type === 'completers' 
-                      ? `${user.profile.tasks_completed} tareas`
-                      : `${user.profile.tasks_rejected} rechazos`
-                    }
+                  <span className={`badge rounded-pill ${BADGE_CONFIG[type].className}`}>
+                    {`${user.total} ${BADGE_CONFIG[type].unit}`}
                   </span>
                 </div>
               ))}
@@ -301,18 +297,30 @@ const Statistics: React.FC = () => {
             Métricas y análisis del rendimiento del sistema
           </p>
         </div>
-        <button 
-          className="btn btn-outline-primary btn-sm" 
-          onClick={() => loadStatistics()}
-          disabled={isRefreshing}
-          aria-label="Actualizar estadísticas"
-        >
-          <i 
-            className={`bi bi-arrow-clockwise me-1 ${isRefreshing ? 'spinning' : ''}`}
-            aria-hidden="true"
-          ></i>
-          {isRefreshing ? 'Actualizando...' : 'Actualizar'}
-        </button>
+        <div className="d-flex gap-2">
+          <select
+            className="form-select form-select-sm"
+            value={leaderboardWindow}
+            onChange={(event) => setLeaderboardWindow(event.target.value as LeaderboardWindow)}
+            aria-label="Periodo de las clasificaciones"
+          >
+            {WINDOW_OPTIONS.map(option => (
+              <option key={option.value} value={option.value}>{option.label}</option>
+            ))}
+          </select>
+          <button 
+            className="btn btn-outline-primary btn-sm" 
+            onClick={() => loadStatistics()}
+            disabled={isRefreshing}
+            aria-label="Actualizar estadísticas"
+          >
+            <i 
+              className={`bi bi-arrow-clockwise me-1 ${isRefreshing ? 'spinning' : ''}`}
+              aria-hidden="true"
+            ></i>
+            {isRefreshing ? 'Actualizando...' : 'Actualizar'}
+          </button>
+        </div>
       </div>
 
       {/* Statistics Cards */}
@@ -339,6 +347,12 @@ const Statistics: React.FC = () => {
           title="Top 5 - Más Tareas Rechazadas"
           icon="bi-exclamation-triangle"
         />
+        <UserList
+          users={statistics.top_hours}
+          type="hours"
+          title="Top 5 - Más Horas Trabajadas"
+          icon="bi-stopwatch"
+        />
       </div>
 
       {/* System Summary */}
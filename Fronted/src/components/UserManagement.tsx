@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useCallback, useMemo } from 'react';
 import { useAuth } from '../context/AuthContext';
-import type { User, CreateUserData, UpdateUserData } from '../services/auth';
+import type { User, CreateUserData, UpdateUserData, UserRole } from '../services/auth';
 import { authAPI } from '../services/auth';
 import Swal from 'sweetalert2';
 
@@ -97,6 +97,8 @@ const ALERT_CONFIG = {
   },
 };
 
+const USERS_PAGE_SIZE = 50;
+
 const DEFAULT_USER_DATA: UserFormData = {
   username: '',
   email: '',
@@ -108,6 +110,10 @@ const DEFAULT_USER_DATA: UserFormData = {
 
 const UserManagement: React.FC = () => {
   const [users, setUsers] = useState<User[]>([]);
+  const [page, setPage] = useState<number>(1);
+  const [hasNext, setHasNext] = useState<boolean>(false);
+  const [roleFilter, setRoleFilter] = useState<UserRole | ''>('');
+  const [availableFilter, setAvailableFilter] = useState<'' | 'true' | 'false'>('');
   const [isLoading, setIsLoading] = useState<boolean>(false);
   const [isCreating, setIsCreating] = useState<boolean>(false);
   const [isSubmitting, setIsSubmitting] = useState<boolean>(false);
@@ -129,15 +135,18 @@ const UserManagement: React.FC = () => {
     [canEditRole]
   );
 
-  useEffect(() => {
-    loadUsers();
-  }, []);
-
+  // La lista se pide por páginas y con los filtros aplicados en el servidor
   const loadUsers = useCallback(async (): Promise<void> => {
     setIsLoading(true);
     try {
-      const usersData = await authAPI.getUsers();
-      setUsers(usersData);
+      const usersPage = await authAPI.getUsers({
+        role: roleFilter || undefined,
+        available: availableFilter ? availableFilter === 'true' : undefined,
+        page,
+        page_size: USERS_PAGE_SIZE,
+      });
+      setUsers(usersPage.results);
+      setHasNext(usersPage.has_next);
     } catch (error: any) {
       await Swal.fire({
         ...ALERT_CONFIG.error,
@@ -146,7 +155,11 @@ const UserManagement: React.FC = () => {
     } finally {
       setIsLoading(false);
     }
-  }, []);
+  }, [roleFilter, availableFilter, page]);
+
+  useEffect(() => {
+    loadUsers();
+  }, [loadUsers]);
 
   const handleCreateUser = useCallback(async (e: React.FormEvent): Promise<void> => {
     e.preventDefault();
@@ -191,11 +204,19 @@ const UserManagement: React.FC = () => {
         role: editingUser.profile.role,
       };
 
-      await authAPI.updateUser(editingUser.id, updatedUserData);
+      const { rebalance } = await authAPI.updateUser(editingUser.id, updatedUserData);
+      
+      // Al cambiar el rol, sus tareas abiertas se reparten entre otros trabajadores
+      let text = 'Usuario actualizado correctamente';
+      if (rebalance?.queued) {
+        text += `. ${rebalance.released} tareas abiertas se están reasignando`;
+      } else if (rebalance && rebalance.released > 0) {
+        text += `. ${rebalance.moved.length} de ${rebalance.released} tareas abiertas reasignadas`;
+      }
       
       await Swal.fire({
         ...ALERT_CONFIG.success,
-        text: 'Usuario actualizado correctamente',
+        text,
       });
       
       setShowEditModal(false);
@@ -219,12 +240,14 @@ const UserManagement: React.FC = () => {
 
     if (result.isConfirmed) {
       try {
-        await authAPI.deleteUser(user.id);
+        const response = await authAPI.deleteUser(user.id);
         
         await Swal.fire({
           icon: 'success',
-          title: 'Eliminado!',
-          text: 'El usuario ha sido eliminado.',
+          title: response?.deletion ? 'Eliminando...' : 'Eliminado!',
+          text: response?.deletion
+            ? `El usuario tiene mucho historial y se está eliminando en segundo plano (${response.deletion.total_rows} registros).`
+            : 'El usuario ha sido eliminado.',
           background: 'var(--surface-color)',
           color: 'var(--text-primary)',
         });
@@ -679,6 +702,31 @@ const UserManagement: React.FC = () => {
       {/* Create User Form */}
       <UserForm />
 
+      {/* Filters */}
+      <div className="d-flex flex-wrap gap-2 mb-3">
+        <select
+          className="form-select w-auto"
+          aria-label="Filtrar por rol"
+          value={roleFilter}
+          onChange={(e) => { setRoleFilter(e.target.value as UserRole | ''); setPage(1); }}
+        >
+          <option value="">Todos los roles</option>
+          {ROLE_OPTIONS.map(option => (
+            <option key={option.value} value={option.value}>{option.label}</option>
+          ))}
+        </select>
+        <select
+          className="form-select w-auto"
+          aria-label="Filtrar por disponibilidad"
+          value={availableFilter}
+          onChange={(e) => { setAvailableFilter(e.target.value as '' | 'true' | 'false'); setPage(1); }}
+        >
+          <option value="">Cualquier disponibilidad</option>
+          <option value="true">Pueden aceptar tareas</option>
+          <option value="false">Sin capacidad</option>
+        </select>
+      </div>
+
       {/* Users Table */}
       {isLoading ? (
         <LoadingSpinner />
@@ -692,6 +740,25 @@ const UserManagement: React.FC = () => {
         />
       )}
 
+      {/* Pagination */}
+      <div className="d-flex justify-content-between align-items-center mt-3">
+        <button
+          className="btn btn-outline-secondary"
+          onClick={() => setPage(prev => prev - 1)}
+          disabled={isLoading || page === 1}
+        >
+          Anterior
+        </button>
+        <span>Página {page}</span>
+        <button
+          className="btn btn-outline-secondary"
+          onClick={() => setPage(prev => prev + 1)}
+          disabled={isLoading || !hasNext}
+        >
+          Siguiente
+        </button>
+      </div>
+
       {/* Edit User Modal */}
       <UserModal
         user={editingUser}
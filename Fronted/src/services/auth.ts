@@ -18,6 +18,22 @@ export interface User {
     };
 }
 
+export type UserRole = User['profile']['role'];
+
+export interface UserListParams {
+    role?: UserRole;
+    available?: boolean;
+    page?: number;
+    page_size?: number;
+}
+
+export interface UserPage {
+    page: number;
+    page_size: number;
+    has_next: boolean;
+    results: User[];
+}
+
 export interface LoginData {
     username: string;
     password: string;
@@ -48,12 +64,40 @@ export interface UpdateUserData {
     max_tasks?: number;
 }
 
+export interface RebalanceReport {
+    released: number;
+    queued: boolean;
+    moved: Array<{ task_id: number; assigned_to: number }>;
+    unassigned: number[];
+}
+
+export interface UserDeletion {
+    id: number;
+    user_id: number;
+    username: string;
+    status: 'queued' | 'running' | 'done';
+    total_rows: number;
+    processed: Record<string, number>;
+    progress: number;
+    created_at: string;
+    finished_at: string | null;
+}
+
+export interface DeleteUserResponse {
+    message: string;
+    rebalance?: RebalanceReport;
+    deletion?: UserDeletion;
+}
+
+// Cada fetch lleva credentials: 'include' para enviar la cookie read_primary,
+// que fija las lecturas al primario tras una escritura propia
 const API_BASE_URL = 'http://localhost:8000';
 
 const api = {
     get: async (url: string) => {
         const token = localStorage.getItem('access_token');
         const response = await fetch(`${API_BASE_URL}${url}`, {
+            credentials: 'include',
             headers: {
                 'Authorization': `Bearer ${token}`,
                 'Content-Type': 'application/json',
@@ -68,6 +112,7 @@ const api = {
     post: async (url: string, data?: any) => {
         const token = localStorage.getItem('access_token');
         const response = await fetch(`${API_BASE_URL}${url}`, {
+            credentials: 'include',
             method: 'POST',
             headers: {
                 'Authorization': `Bearer ${token}`,
@@ -84,6 +129,7 @@ const api = {
     put: async (url: string, data: any) => {
         const token = localStorage.getItem('access_token');
         const response = await fetch(`${API_BASE_URL}${url}`, {
+            credentials: 'include',
             method: 'PUT',
             headers: {
                 'Authorization': `Bearer ${token}`,
@@ -100,6 +146,7 @@ const api = {
     delete: async (url: string) => {
         const token = localStorage.getItem('access_token');
         const response = await fetch(`${API_BASE_URL}${url}`, {
+            credentials: 'include',
             method: 'DELETE',
             headers: {
                 'Authorization': `Bearer ${token}`,
@@ -134,19 +181,28 @@ export const authAPI = {
         return api.get('/api/auth/me/');
     },
 
-    getUsers: async (): Promise<User[]> => {
-        return api.get('/api/auth/users/');
+    getUsers: async (params?: UserListParams): Promise<UserPage> => {
+        const query = new URLSearchParams(
+            Object.entries(params || {}).filter(([, value]) => value !== undefined).map(([key, value]) => [key, String(value)])
+        ).toString();
+        return api.get(query ? `/api/auth/users/?${query}` : '/api/auth/users/');
     },
 
     createUser: async (userData: CreateUserData): Promise<User> => {
         return api.post('/api/auth/users/create/', userData);
     },
 
-    updateUser: async (userId: number, userData: UpdateUserData): Promise<User> => {
+    updateUser: async (userId: number, userData: UpdateUserData): Promise<User & { rebalance?: RebalanceReport }> => {
         return api.put(`/api/auth/users/update/${userId}/`, userData);
     },
 
-    deleteUser: async (userId: number): Promise<void> => {
+    // 200 si se borró al momento; con historial grande se borra en segundo
+    // plano (202) y se devuelve además el progreso en ``deletion``
+    deleteUser: async (userId: number): Promise<DeleteUserResponse> => {
         return api.delete(`/api/auth/users/delete/${userId}/`);
     },
+
+    getUserDeletion: async (deletionId: number): Promise<UserDeletion> => {
+        return api.get(`/api/auth/users/deletions/${deletionId}/`);
+    },
 };
\ No newline at end of file
@@ -0,0 +1,44 @@
+// Varias llamadas a la API en una sola petición (/api/batch/)
+
+export interface BatchRequest {
+    method: 'GET' | 'POST' | 'PUT' | 'PATCH' | 'DELETE';
+    path: string;
+    body?: any;
+    headers?: Record<string, string>;
+}
+
+export interface BatchResponse<T = any> {
+    status: number;
+    body: T;
+    headers: Record<string, string>;
+}
+
+export interface BatchResult {
+    responses: BatchResponse[];
+    // Solo con atomic: true
+    rolled_back?: boolean;
+}
+
+// Cada fetch lleva credentials: 'include' para enviar la cookie read_primary,
+// que fija las lecturas al primario tras una escritura propia
+const API_BASE_URL = 'http://localhost:8000';
+
+export const batchAPI = {
+    // Con atomic, el primer error deshace todo el lote y el resto no se ejecuta (424)
+    run: async (requests: BatchRequest[], atomic: boolean = false): Promise<BatchResult> => {
+        const token = localStorage.getItem('access_token');
+        const response = await fetch(`${API_BASE_URL}/api/batch/`, {
+            credentials: 'include',
+            method: 'POST',
+            headers: {
+                'Authorization': `Bearer ${token}`,
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ requests, atomic }),
+        });
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return response.json();
+    },
+};
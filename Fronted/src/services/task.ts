@@ -1,3 +1,5 @@
+import type { User } from './auth';
+
 export interface Task {
     id: number;
     title: string;
@@ -12,6 +14,8 @@ export interface Task {
     deadline: string | null;
     estimated_hours: number;
     priority: number;
+    is_archived: boolean;
+    archived_at: string | null;
     created_by_name?: string;
     assigned_to_name?: string;
     current_assignment?: TaskAssignment;
@@ -54,6 +58,57 @@ export interface TaskReport {
     reviewed_by_name?: string;
 }
 
+// El listado de revisión no trae los textos largos; están en getReport
+export type TaskReportSummary = Omit<TaskReport, 'report_text' | 'challenges_faced' | 'solutions_applied' | 'review_notes'>;
+
+export type ReportStatusFilter = TaskReport['status'] | 'all';
+
+export interface ReportPage {
+    counts: Record<ReportStatusFilter, number>;
+    page: number;
+    page_size: number;
+    has_next: boolean;
+    results: TaskReportSummary[];
+}
+
+export interface ReportReviewItem {
+    report_id: number;
+    action: 'approve' | 'reject' | 'needs_correction';
+    review_notes?: string;
+}
+
+export interface BulkReviewResult {
+    message: string;
+    reviewed: number;
+    failed: number;
+    results: Array<{
+        report_id: number;
+        success: boolean;
+        status?: TaskReport['status'];
+        error?: string;
+    }>;
+}
+
+export interface ArchivedTask extends Omit<Task, 'is_archived' | 'current_assignment'> {
+    reason: 'approved' | 'cancelled' | 'deleted';
+    archived_at: string;
+}
+
+export interface ArchivedTaskAssignment extends Omit<TaskAssignment, 'task' | 'task_title' | 'task_difficulty'> {
+    report: Omit<TaskReport, 'task_assignment' | 'task_title' | 'assigned_to_name'> | null;
+}
+
+export interface ArchivedTaskDetail extends ArchivedTask {
+    assignments: ArchivedTaskAssignment[];
+}
+
+export interface ArchivePage {
+    page: number;
+    page_size: number;
+    has_next: boolean;
+    results: ArchivedTask[];
+}
+
 export interface Notification {
     id: number;
     user: number;
@@ -86,6 +141,26 @@ export interface TaskCompletionData {
     solutions_applied?: string;
 }
 
+// Días de las clasificaciones de estadísticas; 'all' es desde siempre
+export type LeaderboardWindow = '7' | '30' | '365' | 'all';
+
+export interface LeaderboardEntry {
+    id: number;
+    username: string;
+    first_name: string;
+    last_name: string;
+    email: string;
+    profile: {
+        role: string;
+        tasks_completed: number;
+        tasks_rejected: number;
+        current_task_count: number;
+        can_accept_more_tasks: boolean;
+    };
+    // Aprobadas, rechazadas u horas trabajadas en la ventana
+    total: number;
+}
+
 export interface Statistics {
     general: {
         total_tasks: number;
@@ -94,56 +169,97 @@ export interface Statistics {
         assigned_tasks: number;
         completion_rate: number;
     };
-    top_completers: Array<{
-        id: number;
-        username: string;
-        first_name: string;
-        last_name: string;
-        email: string;
-        profile: {
-            role: string;
-            tasks_completed: number;
-            tasks_rejected: number;
-            current_task_count: number;
-            can_accept_more_tasks: boolean;
-        };
-    }>;
-    top_rejecters: Array<{
-        id: number;
-        username: string;
-        first_name: string;
-        last_name: string;
-        email: string;
-        profile: {
-            role: string;
-            tasks_completed: number;
-            tasks_rejected: number;
-            current_task_count: number;
-            can_accept_more_tasks: boolean;
-        };
-    }>;
+    window: LeaderboardWindow;
+    top_completers: LeaderboardEntry[];
+    top_rejecters: LeaderboardEntry[];
+    top_hours: LeaderboardEntry[];
+}
+
+export interface WorkerStats {
+    tasks_assigned: number;
+    tasks_completed: number;
+    tasks_rejected: number;
+    current_task_count: number;
+}
+
+// Todo lo que necesita el panel al arrancar, en una sola petición
+export interface Dashboard {
+    user: User;
+    tasks: { count: number; results: Task[] };
+    unread_notifications: number;
+    // Solo administradores
+    pending_reports?: number;
+    stats: Statistics['general'] | WorkerStats;
+}
+
+export type AssignmentStatus = TaskAssignment['status'] | 'cancelled';
+
+// Carga de un trabajador en la matriz de /api/tasks/workload/ (solo administradores)
+export interface WorkloadRow {
+    user_id: number;
+    username: string;
+    role: Task['difficulty'];
+    is_active_worker: boolean;
+    max_tasks: number;
+    assignments: Record<AssignmentStatus, number>;
+    active: number;
+    outstanding_hours: number;
+    remaining_capacity: number;
+    rejection_ratio: number;
 }
 
+export interface WorkloadPage {
+    page: number;
+    page_size: number;
+    has_next: boolean;
+    // La matriz se guarda unos segundos en la caché del servidor
+    generated_at: string;
+    results: WorkloadRow[];
+}
+
+// Cada fetch lleva credentials: 'include' para enviar la cookie read_primary,
+// que fija las lecturas al primario tras una escritura propia
 const API_BASE_URL = 'http://localhost:8000';
 
+// Los POST del flujo de trabajo se reintentan con la misma Idempotency-Key:
+// si la primera petición llegó, el servidor devuelve su respuesta sin repetirla
+const IDEMPOTENT_RETRIES = 3;
+const RETRY_DELAY_MS = 500;
+
+// 429/503: el servidor limita las consultas caras; una lectura se reintenta
+// una vez tras el Retry-After si no hay que esperar más que esto
+const THROTTLED_RETRY_MAX_SECONDS = 5;
+
+const wait = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
 const api = {
     get: async (url: string) => {
         const token = localStorage.getItem('access_token');
-        const response = await fetch(`${API_BASE_URL}${url}`, {
-            headers: {
-                'Authorization': `Bearer ${token}`,
-                'Content-Type': 'application/json',
-            },
-        });
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
+        for (let attempt = 0; ; attempt++) {
+            const response = await fetch(`${API_BASE_URL}${url}`, {
+                credentials: 'include',
+                headers: {
+                    'Authorization': `Bearer ${token}`,
+                    'Content-Type': 'application/json',
+                },
+            });
+            const retryAfter = Number(response.headers.get('Retry-After') ?? NaN);
+            if ((response.status === 429 || response.status === 503) && attempt === 0
+                && retryAfter <= THROTTLED_RETRY_MAX_SECONDS) {
+                await wait(retryAfter * 1000);
+                continue;
+            }
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            return response.json();
         }
-        return response.json();
     },
 
     post: async (url: string, data?: any) => {
         const token = localStorage.getItem('access_token');
         const response = await fetch(`${API_BASE_URL}${url}`, {
+            credentials: 'include',
             method: 'POST',
             headers: {
                 'Authorization': `Bearer ${token}`,
@@ -157,9 +273,44 @@ const api = {
         return response.json();
     },
 
+    postIdempotent: async (url: string, data?: any) => {
+        const token = localStorage.getItem('access_token');
+        const idempotencyKey = crypto.randomUUID();
+        for (let attempt = 0; ; attempt++) {
+            let response: Response;
+            try {
+                response = await fetch(`${API_BASE_URL}${url}`, {
+                    credentials: 'include',
+                    method: 'POST',
+                    headers: {
+                        'Authorization': `Bearer ${token}`,
+                        'Content-Type': 'application/json',
+                        'Idempotency-Key': idempotencyKey,
+                    },
+                    body: data ? JSON.stringify(data) : undefined,
+                });
+            } catch (error) {
+                // Fallo de red: no se sabe si la petición llegó
+                if (attempt >= IDEMPOTENT_RETRIES) throw error;
+                await wait(RETRY_DELAY_MS * 2 ** attempt);
+                continue;
+            }
+            // 409: la primera petición aún se está procesando
+            if ((response.status >= 500 || response.status === 409) && attempt < IDEMPOTENT_RETRIES) {
+                await wait(RETRY_DELAY_MS * 2 ** attempt);
+                continue;
+            }
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            return response.json();
+        }
+    },
+
     put: async (url: string, data: any) => {
         const token = localStorage.getItem('access_token');
         const response = await fetch(`${API_BASE_URL}${url}`, {
+            credentials: 'include',
             method: 'PUT',
             headers: {
                 'Authorization': `Bearer ${token}`,
@@ -176,6 +327,7 @@ const api = {
     delete: async (url: string) => {
         const token = localStorage.getItem('access_token');
         const response = await fetch(`${API_BASE_URL}${url}`, {
+            credentials: 'include',
             method: 'DELETE',
             headers: {
                 'Authorization': `Bearer ${token}`,
@@ -196,7 +348,7 @@ export const taskAPI = {
     },
 
     createTask: async (taskData: CreateTaskData): Promise<{message: string, task: Task}> => {
-        return api.post('/api/tasks/create/', taskData);
+        return api.postIdempotent('/api/tasks/create/', taskData);
     },
 
     getTask: async (taskId: number): Promise<Task> => {
@@ -211,20 +363,41 @@ export const taskAPI = {
     },
 
     rejectTask: async (taskId: number, rejectionData: TaskRejectionData): Promise<void> => {
-        return api.post(`/api/tasks/${taskId}/reject/`, rejectionData);
+        return api.postIdempotent(`/api/tasks/${taskId}/reject/`, rejectionData);
     },
 
     completeTask: async (taskId: number, completionData: TaskCompletionData): Promise<{message: string, report: TaskReport}> => {
-        return api.post(`/api/tasks/${taskId}/complete/`, completionData);
+        return api.postIdempotent(`/api/tasks/${taskId}/complete/`, completionData);
     },
 
-    getReports: async (status?: string): Promise<TaskReport[]> => {
-        const url = status ? `/api/tasks/reports/?status=${status}` : '/api/tasks/reports/';
-        return api.get(url);
+    getReports: async (params?: { status?: ReportStatusFilter; page?: number; page_size?: number }): Promise<ReportPage> => {
+        const query = new URLSearchParams(
+            Object.entries(params || {}).filter(([, value]) => value !== undefined).map(([key, value]) => [key, String(value)])
+        ).toString();
+        return api.get(query ? `/api/tasks/reports/?${query}` : '/api/tasks/reports/');
+    },
+
+    getReport: async (reportId: number): Promise<TaskReport> => {
+        return api.get(`/api/tasks/reports/${reportId}/`);
     },
 
     reviewReport: async (reportId: number, action: 'approve' | 'reject' | 'needs_correction', reviewNotes?: string): Promise<void> => {
-        return api.post(`/api/tasks/reports/${reportId}/review/`, { action, review_notes: reviewNotes });
+        return api.postIdempotent(`/api/tasks/reports/${reportId}/review/`, { action, review_notes: reviewNotes });
+    },
+
+    bulkReviewReports: async (reviews: ReportReviewItem[]): Promise<BulkReviewResult> => {
+        return api.post('/api/tasks/reports/bulk-review/', { reviews });
+    },
+
+    getArchivedTasks: async (params?: { reason?: ArchivedTask['reason']; assigned_to?: number; page?: number; page_size?: number }): Promise<ArchivePage> => {
+        const query = new URLSearchParams(
+            Object.entries(params || {}).filter(([, value]) => value !== undefined).map(([key, value]) => [key, String(value)])
+        ).toString();
+        return api.get(query ? `/api/tasks/archive/?${query}` : '/api/tasks/archive/');
+    },
+
+    getArchivedTask: async (taskId: number): Promise<ArchivedTaskDetail> => {
+        return api.get(`/api/tasks/archive/${taskId}/`);
     },
 
     getNotifications: async (): Promise<{ notifications: Notification[]; unread_count: number }> => {
@@ -235,7 +408,18 @@ export const taskAPI = {
         return api.post('/api/tasks/notifications/', { notification_ids: notificationIds });
     },
 
-    getStatistics: async (): Promise<Statistics> => {
-        return api.get('/api/tasks/statistics/');
+    getStatistics: async (window: LeaderboardWindow = 'all'): Promise<Statistics> => {
+        return api.get(`/api/tasks/statistics/?window=${window}`);
+    },
+
+    getDashboard: async (): Promise<Dashboard> => {
+        return api.get('/api/dashboard/');
+    },
+
+    getWorkload: async (params?: { role?: Task['difficulty']; page?: number; page_size?: number }): Promise<WorkloadPage> => {
+        const query = new URLSearchParams(
+            Object.entries(params || {}).filter(([, value]) => value !== undefined).map(([key, value]) => [key, String(value)])
+        ).toString();
+        return api.get(query ? `/api/tasks/workload/?${query}` : '/api/tasks/workload/');
     },
 };
\ No newline at end of file